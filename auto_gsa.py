@@ -1,57 +1,19 @@
 import os
+import sys
+import time
 
-import customtkinter as ctk
-
-from ui import MainPanel, Styles
-
-if os.name != 'nt':
-    print("Running in non-Windows OS, some eyecandy won't be visible!")
-
-
-class App(ctk.CTk):
-    """
-    The application.
-    """
-    def __init__(self, title:str="AutoGSA", size:tuple[int,int]=(800,600)) -> None:
-        super().__init__()
-        #This is a hard coded value; trail&error driven.
-        position: tuple[int,int] = (
-            self.winfo_screenwidth()//6,
-            self.winfo_screenheight()//6)
-        
-        self.title(title)
-        self.resizable(False, False)
-        self.iconbitmap("assets/icon.ico")
-        self.geometry(f"{size[0]}x{size[1]}+{position[0]}+{position[1]}")
-        self.wm_protocol("WM_DELETE_WINDOW", self.on_closing)
-
-        Styles().apply_styles()
-
-        self.main_panel: MainPanel = MainPanel(self)
-        self.main_panel.pack(expand=1, fill='both')
-        
-        self.on_open()
-
-    def on_open(self) -> None:
-        """
-        Triggered on application launch.
-        """
-        self.main_panel.on_open()
+# the gui is imported under the main guard only, worker processes spawned from it re-run this module as [__mp_main__], they need none of it.
+if __name__ == '__main__':
+    # any argument is the headless command line, dispatched before the gui imports, see [services.cli].
+    if len(sys.argv) > 1:
+        _started: float = time.perf_counter()
+        from services.cli import main
+        sys.exit(main(started=_started))
 
-    def on_closing(self) -> None:
-        """
-        Triggered on application closure.
-        """
-        self.quit()
-        self.main_panel.on_close()
-        self.destroy()
+    from ui import App
 
-    def run(self) -> None:
-        """
-        Run the application.
-        """
-        self.mainloop()
+    if os.name != 'nt':
+        print("Running in non-Windows OS, some eyecandy won't be visible!")
 
-if __name__ == '__main__':
     app = App()
-    app.run()
\ No newline at end of file
+    app.run()
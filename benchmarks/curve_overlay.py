@@ -0,0 +1,107 @@
+"""
+Benchmarks overlaying the cumulative curves of a large selection, on a shared, decimated phi grid, against plotting every full curve.
+- usage: python -m benchmarks.curve_overlay [samples dir] [-n samples] [--points n] [--size w h]
+- full curves: a line per sample, [Analyzer.get_plot_data], the inverted curve, thousands of points each; timed on a slice, then scaled up to [n].
+- overlay: [CurveOverlay], the curves evaluated on one grid of [--points], drawn by [CanPlot.cp_plot_overlay] as one collection, with and without the envelopes.
+- the samples are cycled to reach [n], an analyzer each, as a selection would have.
+"""
+import argparse
+import glob
+import os
+import time
+from typing import Final
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from mixins import CanPlot
+from models import Analyzer, CurveOverlay, Sample
+from models.overlay import OVERLAY_POINTS
+from typedefs import GraphType
+
+# Constants:
+DEFAULT_N: Final[int] = 5000
+DEFAULT_SIZE: Final[tuple[int, int]] = (640, 480)
+FULL_CURVES_SLICE: Final[int] = 50
+DPI: Final[int] = 100
+COLOR: Final[str] = '#1f77b4'
+
+
+def _new_figure(size: tuple[int, int]) -> Figure:
+    _fig = Figure(figsize=(size[0]/DPI, size[1]/DPI), dpi=DPI, layout='constrained')
+    FigureCanvasAgg(_fig)
+    return _fig
+
+
+def _time_full_curves(analyzers: list[Analyzer], size: tuple[int, int]) -> tuple[float, int]:
+    """
+    Plots every full curve, a line each, then draws.
+    - -> (wall seconds, points drawn)
+    """
+    _fig = _new_figure(size)
+    _ax = _fig.add_subplot()
+    _start: float = time.perf_counter()
+    _points: int = 0
+    for _ana in analyzers:
+        _x, _y, _, _ = _ana.get_plot_data(GraphType.CUM)
+        _ax.plot(_x, _y, color=COLOR, alpha=.05)
+        _points += len(_x)
+    _fig.canvas.draw()
+
+    return (time.perf_counter()-_start, _points)
+
+
+def _time_overlay(overlay: CurveOverlay, n_points: int, size: tuple[int, int], envelopes: bool) -> float:
+    """
+    Resamples, then plots the [overlay] as [GraphPanel] renders it, a fresh grid every time.
+    """
+    _fig = _new_figure(size)
+    _ax = _fig.add_subplot()
+    _start: float = time.perf_counter()
+    overlay._resampled = None
+    _grid, _curves = overlay.resample(n_points)
+    CanPlot().cp_plot_overlay(_grid, _curves, _ax, COLOR, overlay.get_envelopes(n_points) if envelopes else None)
+    _fig.canvas.draw()
+
+    return time.perf_counter()-_start
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv/.xlsx samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples overlaid.')
+    _parser.add_argument('--points', type=int, default=OVERLAY_POINTS, help='the shared grid points.')
+    _parser.add_argument('--size', type=int, nargs=2, default=list(DEFAULT_SIZE), help='the graph size, in pixels.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv'))+
+                               glob.glob(os.path.join(_args.samples_dir, '*.xlsx')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+
+    _data = [Sample(path).get_data() for path in _paths]
+    _start: float = time.perf_counter()
+    _analyzers: list[Analyzer] = [Analyzer(_data[ind % len(_data)]) for ind in range(_args.n)]
+    print(f'{_args.n} samples analyzed in {time.perf_counter()-_start:.2f}s, no curve inverted')
+
+    _size: tuple[int, int] = tuple(_args.size) #type: ignore
+    _slice: int = min(FULL_CURVES_SLICE, _args.n)
+    _elapsed, _points = _time_full_curves(_analyzers[:_slice], _size)
+    print(f'  full curves  {_slice:5} samples {_elapsed:8.2f}s, {_points/_slice:8.0f} points/curve, '
+          f'~{_elapsed/_slice*_args.n:.0f}s for {_args.n}')
+
+    _overlay = CurveOverlay(_analyzers)
+    for _envelopes in (False, True):
+        _elapsed = _time_overlay(_overlay, _args.points, _size, _envelopes)
+        _label: str = 'overlay+env' if _envelopes else 'overlay'
+        print(f'  {_label:<12} {len(_overlay):5} samples {_elapsed:8.2f}s, {_args.points:8} points/curve')
+
+    _grid, _curves = _overlay.resample(_args.points)
+    _full_x, _full_y, _, _ = _analyzers[0].get_plot_data(GraphType.CUM)
+    _error: float = float(np.nanmax(np.abs(np.interp(_grid, _full_x, _full_y, left=np.nan, right=np.nan)-_curves[0])))
+    print(f'  overlay against the full curve, max difference {_error:.4f} cum.wt%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmarks rendering the sample graphs on fresh figures against the pooled figure templates.
+- usage: python -m benchmarks.figure_render [samples dir] [-n samples] [--dpi dpi]
+- fresh: a new figure, axes and artists per graph per sample, as before the templates.
+- template: [CanPlot.cp_get_template], the artists of one figure per graph type and size updated per sample.
+- both build the graph, then save it as a png into memory, the setup alone is timed as well.
+"""
+import argparse
+import glob
+import io
+import os
+import time
+from collections.abc import Callable
+from typing import Final
+
+from matplotlib.figure import Figure
+
+from mixins import CanSave
+from mixins.saver import EDGE_PADDING, GRAPH_TITLES
+from models import Analyzer, Sample
+from typedefs import GraphType, PlotData
+
+# Constants:
+DEFAULT_N: Final[int] = 200
+DEFAULT_DPI: Final[int] = 100
+COLOR: Final[str] = '#1f77b4'
+
+type Prepared = list[tuple[str, dict[GraphType, PlotData]]]
+
+
+def _prepare(paths: list[str], n: int) -> Prepared:
+    """
+    Analyzes the samples at [paths] once, cycled up to [n] samples, the curves are solved upfront so only the rendering is timed.
+    """
+    _analyzed: list[tuple[str, dict[GraphType, PlotData]]] = []
+    for _path in paths:
+        _sample = Sample(_path)
+        _ana = Analyzer(_sample.get_data())
+        _analyzed.append((_sample.get_name(), {type_: _ana.get_plot_data(type_) for type_ in GraphType}))
+
+    return [_analyzed[ind % len(_analyzed)] for ind in range(n)]
+
+
+def _render_fresh(saver: CanSave, name: str, graph_type: GraphType, plot_data: PlotData) -> Figure:
+    """
+    A figure built from scratch, the rendering before the templates.
+    """
+    _x, _y, _points, _method = plot_data
+    _fig = Figure(figsize=saver._get_graph_size(graph_type, len(_x)), layout='constrained')
+    _ax = _fig.add_subplot()
+    _fig.get_layout_engine().set(h_pad=EDGE_PADDING, w_pad=EDGE_PADDING*2) #type: ignore
+
+    saver.cp_plot(_x, _y, _points, _method, _ax, graph_type, COLOR)
+    _ax.set_title(f'{GRAPH_TITLES[graph_type]}\n{name}')
+
+    return _fig
+
+
+def _render_template(saver: CanSave, name: str, graph_type: GraphType, plot_data: PlotData) -> Figure:
+    """
+    The pooled template of the graph type and size, updated, as [CanSave] renders.
+    """
+    _size: tuple[float, float] = saver._get_graph_size(graph_type, len(plot_data[0]))
+    _template = saver.cp_get_template(graph_type, _size, (EDGE_PADDING, EDGE_PADDING*2))
+
+    return _template.update(plot_data, f'{GRAPH_TITLES[graph_type]}\n{name}', COLOR)
+
+
+def _time(prepared: Prepared, render: Callable[[CanSave, str, GraphType, PlotData], Figure],
+          dpi: int, save: bool) -> float:
+    """
+    Renders every graph of the [prepared] samples.
+    - save: also save every figure as a png into memory.
+    - -> wall seconds.
+    """
+    _saver = CanSave()
+    _start: float = time.perf_counter()
+    for _name, _plot_data in prepared:
+        for _type, _data in _plot_data.items():
+            _fig: Figure = render(_saver, _name, _type, _data)
+            if save:
+                _fig.savefig(io.BytesIO(), dpi=dpi, format='png')
+
+    return time.perf_counter()-_start
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv/.xlsx samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples.')
+    _parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='the png resolution.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv'))+
+                               glob.glob(os.path.join(_args.samples_dir, '*.xlsx')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+
+    _prepared: Prepared = _prepare(_paths, _args.n)
+    # warm up, fonts and the first template.
+    _time(_prepared[:2], _render_template, _args.dpi, True)
+
+    print(f'{_args.n} samples, {len(GraphType)} graphs each, {_args.dpi} dpi:')
+    for _save in (False, True):
+        _label: str = 'setup + png' if _save else 'setup only'
+        for _render_label, _render in (('fresh', _render_fresh), ('template', _render_template)):
+            _elapsed: float = _time(_prepared, _render, _args.dpi, _save)
+            print(f'  {_label:<12} {_render_label:<9} {_elapsed:8.2f}s {_elapsed/_args.n*1000:8.2f}ms/sample')
+
+
+if __name__ == '__main__':
+    main()
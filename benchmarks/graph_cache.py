@@ -0,0 +1,94 @@
+"""
+Benchmarks browsing many samples through the graph panel cache, the rendered graphs kept as pngs in a bounded [Cache].
+- usage: python -m benchmarks.graph_cache [samples dir] [-n samples] [--size w h] [--limit entries]
+- every sample renders its graphs off screen, as [GraphPanel] does, into the two reused templates, then caches them as pngs.
+- the memory held is sampled along the way, it should level off once the cache is full, the second pass is served from the cache.
+- the samples are cycled, each visit gets its own cache id, as if every sample was a new one.
+"""
+import argparse
+import glob
+import io
+import os
+import time
+import tracemalloc
+from typing import Final
+
+from PIL import Image
+
+from mixins.plotter import FigureTemplate
+from models import Analyzer, Sample
+from models.cache import Cache
+from typedefs import GraphType, PlotData
+
+# Constants:
+# as [ui.widgets.analysis_panel] sets them, no ui import, no display needed.
+GRAPH_DPI: Final[int] = 100
+GRAPHS_CACHE_LIMIT: Final[int] = 200
+PNG_COMPRESS_LEVEL: Final[int] = 1
+
+DEFAULT_N: Final[int] = 1000
+DEFAULT_SIZE: Final[tuple[int, int]] = (520, 390)
+CHECKPOINTS: Final[int] = 5
+COLOR: Final[str] = '#1f77b4'
+
+
+def _browse(cache: Cache, templates: dict[GraphType, FigureTemplate],
+            samples: list[tuple[str, dict[GraphType, PlotData]]], start: int, n: int, size: tuple[int, int]) -> None:
+    """
+    Shows [n] samples, from the [start]th visit on, the graphs from the [cache], otherwise rendered and cached, as [GraphPanel._get_image] does.
+    """
+    _every: int = max(1, n//CHECKPOINTS)
+    for _ind in range(start, start+n):
+        _name, _plot_data = samples[_ind % len(samples)]
+        for _type, _data in _plot_data.items():
+            _id: str = f'{_ind}|{_name}|{_type.name}|{COLOR}|{size[0]}x{size[1]}'
+            if cache.check(_id):
+                Image.open(io.BytesIO(cache.get(_id))).load()
+                continue
+            templates[_type].update(_data, _name, COLOR)
+            _buffer = io.BytesIO()
+            templates[_type].render_image(size, GRAPH_DPI).save(_buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+            cache.add(_id, _buffer.getvalue())
+
+        if (_ind-start+1) % _every == 0:
+            _stats = cache.stats()
+            print(f'    {_ind-start+1:6} samples {_stats.entries:5} entries {_stats.est_bytes/2**20:8.2f}MB cached '
+                  f'{tracemalloc.get_traced_memory()[0]/2**20:8.2f}MB traced')
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv/.xlsx samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples browsed.')
+    _parser.add_argument('--size', type=int, nargs=2, default=list(DEFAULT_SIZE), help='a graph size, in pixels.')
+    _parser.add_argument('--limit', type=int, default=GRAPHS_CACHE_LIMIT, help='the cache size, in graphs.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv'))+
+                               glob.glob(os.path.join(_args.samples_dir, '*.xlsx')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+
+    _samples: list[tuple[str, dict[GraphType, PlotData]]] = []
+    for _path in _paths:
+        _sample = Sample(_path)
+        _ana = Analyzer(_sample.get_data())
+        _samples.append((_sample.get_name(), {type_: _ana.get_plot_data(type_) for type_ in GraphType}))
+
+    _size: tuple[int, int] = tuple(_args.size) #type: ignore
+    _templates: dict[GraphType, FigureTemplate] = {type_: FigureTemplate(type_) for type_ in GraphType}
+    _cache = Cache(_args.limit, name='graphs')
+
+    tracemalloc.start()
+    for _pass in ('first pass, rendered', 'second pass, last ones cached'):
+        _n: int = _args.n if _pass.startswith('first') else min(_args.n, _args.limit//len(GraphType))
+        print(f'{_pass}, {_n} samples, {_size[0]}x{_size[1]} pixels:')
+        _start: float = time.perf_counter()
+        _browse(_cache, _templates, _samples, _args.n-_n if _pass.startswith('second') else 0, _n, _size)
+        _elapsed: float = time.perf_counter()-_start
+        print(f'  {_elapsed:8.2f}s {_elapsed/_n*1000:8.2f}ms/sample, '
+              f'{tracemalloc.get_traced_memory()[1]/2**20:.2f}MB traced peak')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmarks streaming the cumulative curves of many samples into group envelopes, a quantile sketch per group, against the full curves matrix.
+- usage: python -m benchmarks.group_envelopes [samples dir] [-n curves] [--groups n]
+- the samples are cycled, each curve shifted along phi at random, as if every one was a new sample, and dealt round robin into the groups.
+- the memory held by the sketches is traced, the full matrix a percentile needs is printed for comparison, so is the largest error of the sketch against it.
+"""
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+from typing import Final
+
+import numpy as np
+
+from models import Analyzer, Sample
+from models.envelopes import GroupEnvelopes
+from models.overlay import ENVELOPE_PERCENTILES
+
+# Constants:
+DEFAULT_N: Final[int] = 100_000
+DEFAULT_GROUPS: Final[int] = 4
+PHI_SHIFT: Final[float] = 1.0
+SEED: Final[int] = 0
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv/.xlsx samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of curves.')
+    _parser.add_argument('--groups', type=int, default=DEFAULT_GROUPS, help='the number of groups.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv'))+
+                               glob.glob(os.path.join(_args.samples_dir, '*.xlsx')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+    _analyzers: list[Analyzer] = [Analyzer(Sample(path).get_data()) for path in _paths]
+
+    _envelopes = GroupEnvelopes()
+    _shifts: np.ndarray = np.random.default_rng(SEED).uniform(-PHI_SHIFT, PHI_SHIFT, _args.n)
+    # the first group is kept whole too, to check the sketch against.
+    _checked: list[np.ndarray] = []
+
+    tracemalloc.start()
+    _start: float = time.perf_counter()
+    for _ind in range(_args.n):
+        _curve: np.ndarray = _analyzers[_ind % len(_analyzers)].get_curve_at(_envelopes.grid-_shifts[_ind], fill=True)
+        _envelopes.add(f'group {_ind % _args.groups}', _curve)
+        if _ind % _args.groups == 0:
+            tracemalloc.stop()
+            _checked.append(_curve)
+            tracemalloc.start()
+    _result: dict[str, np.ndarray] = _envelopes.get_envelopes()
+    _elapsed: float = time.perf_counter()-_start
+    _traced: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    _full_bytes: int = _args.n*_envelopes.grid.size*8
+    print(f'{_args.n} curves, {_args.groups} groups, {_envelopes.grid.size} grid points:')
+    print(f'  {_elapsed:8.2f}s {_elapsed/_args.n*1e6:8.2f}us/curve, evaluating the curves included')
+    print(f'  sketches {_traced/2**20:8.2f}MB traced peak, the full matrix {_full_bytes/2**20:8.2f}MB')
+
+    _exact: np.ndarray = np.percentile(np.stack(_checked), ENVELOPE_PERCENTILES, axis=0)
+    print(f'  largest error against the full matrix, {len(_checked)} curves: '
+          f'{np.nanmax(np.abs(_result['group 0']-_exact)):.3f} cum.wt%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Load tests the http analysis service on localhost, many concurrent clients posting samples.
+- usage: python -m benchmarks.http_load [samples dir] [-n requests] [-c clients] [--spawn]
+- --spawn starts a service of its own, on a free port, stopped at the end, otherwise the one at [--url] is tested.
+- the clients keep their connections alive and honor the 503 backpressure, waiting [Retry-After] then retrying, the refusals are counted.
+- --unique perturbs every sample a little, so none is served from the cache.
+"""
+import argparse
+import glob
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Final
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Constants:
+DEFAULT_URL: Final[str] = 'http://127.0.0.1:8765'
+DEFAULT_N: Final[int] = 500
+DEFAULT_CLIENTS: Final[int] = 16
+SPAWN_TIMEOUT_S: Final[float] = 60.0
+SEED: Final[int] = 0
+
+
+def _spawn_server(workers: int) -> tuple[subprocess.Popen, str]:
+    """
+    Starts a service on a free port, -> (its process, its url).
+    """
+    _process = subprocess.Popen([sys.executable, 'auto_gsa.py', 'serve', '--port', '0', '--workers', str(workers)],
+                                stdout=subprocess.PIPE, text=True)
+    _deadline: float = time.perf_counter()+SPAWN_TIMEOUT_S
+    while time.perf_counter() < _deadline:
+        _line: str = _process.stdout.readline() if _process.stdout else ''
+        if _line.startswith('serving on '):
+            return (_process, _line.split()[2].rstrip(','))
+        if _process.poll() is not None:
+            break
+    _process.kill()
+    raise SystemExit('the service didn\'t start')
+
+
+def _get_json(url: str, path: str) -> dict:
+    _parts = urlsplit(url)
+    _connection = http.client.HTTPConnection(_parts.hostname, _parts.port)
+    _connection.request('GET', path)
+    return json.loads(_connection.getresponse().read())
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of requests.')
+    _parser.add_argument('-c', '--clients', type=int, default=DEFAULT_CLIENTS, help='the number of concurrent clients.')
+    _parser.add_argument('--per-request', type=int, default=1, help='samples per request, a json batch if over 1.')
+    _parser.add_argument('--graphs', default='', help='graphs to render, e.g. histogram,cumulative_curve.')
+    _parser.add_argument('--unique', action='store_true', help='perturb every sample, defeating the cache.')
+    _parser.add_argument('--url', default=DEFAULT_URL, help='the service to test.')
+    _parser.add_argument('--spawn', action='store_true', help='start a service of its own.')
+    _parser.add_argument('--workers', type=int, default=0, help='the spawned service workers, 0 uses every core.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+    _samples: list[tuple[str, np.ndarray]] = [(os.path.basename(path), np.genfromtxt(path, delimiter=',', skip_header=1))
+                                              for path in _paths]
+
+    _process: subprocess.Popen|None = None
+    _url: str = _args.url
+    if _args.spawn:
+        _process, _url = _spawn_server(_args.workers)
+    _parts = urlsplit(_url)
+
+    _rng = np.random.default_rng(SEED)
+    _bodies: list[bytes] = []
+    for _ind in range(_args.n):
+        _batch = [_samples[(_ind*_args.per_request+k) % len(_samples)] for k in range(_args.per_request)]
+        _batch = [(name, data*[1, 1+_rng.uniform(0, 1e-3)] if _args.unique else data) for name, data in _batch]
+        _bodies.append(json.dumps({'samples': [{'name': name, 'data': data.tolist()} for name, data in _batch],
+                                   'graphs': [graph for graph in _args.graphs.split(',') if graph]}).encode())
+
+    _latencies: list[float] = []
+    _counts: dict[str, int] = {'ok': 0, 'refused': 0, 'failed': 0}
+    _lock = threading.Lock()
+    _next = iter(range(_args.n))
+
+    def _client() -> None:
+        _connection = http.client.HTTPConnection(_parts.hostname, _parts.port, timeout=300)
+        while True:
+            with _lock:
+                _ind: int|None = next(_next, None)
+            if _ind is None:
+                return
+            _start: float = time.perf_counter()
+            while True:
+                _connection.request('POST', '/analyze', _bodies[_ind], {'Content-Type': 'application/json'})
+                _response = _connection.getresponse()
+                _response.read()
+                if _response.status != 503:
+                    break
+                with _lock:
+                    _counts['refused'] += 1
+                time.sleep(float(_response.getheader('Retry-After', '1')))
+            with _lock:
+                _counts['ok' if _response.status == 200 else 'failed'] += 1
+                _latencies.append(time.perf_counter()-_start)
+
+    try:
+        _threads = [threading.Thread(target=_client) for _ in range(_args.clients)]
+        _start: float = time.perf_counter()
+        for _thread in _threads:
+            _thread.start()
+        for _thread in _threads:
+            _thread.join()
+        _elapsed: float = time.perf_counter()-_start
+        _health: dict = _get_json(_url, '/health')
+    finally:
+        if _process:
+            _process.terminate()
+            _process.wait()
+
+    _ms: np.ndarray = np.array(_latencies)*1000
+    print(f'{_args.n} requests, {_args.per_request} samples each, {_args.clients} clients, {_health['workers']} workers, '
+          f'{'unique' if _args.unique else 'repeated'} samples:')
+    print(f'  {_elapsed:8.2f}s {_args.n/_elapsed:8.1f} req/s {_args.n*_args.per_request/_elapsed:8.1f} samples/s')
+    print(f'  latency p50 {np.percentile(_ms, 50):.1f}ms p95 {np.percentile(_ms, 95):.1f}ms p99 {np.percentile(_ms, 99):.1f}ms'
+          f' max {_ms.max():.1f}ms')
+    print(f'  ok {_counts['ok']}, failed {_counts['failed']}, refused {_counts['refused']} (retried)')
+    print(f'  {_health['batches']} batches, {_health['analyzed']} analyzed, cache hit rate {_health['cache']['hit_rate']:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmarks drawing the pseudo bins and percentile guides as an artist each against one collection, for wide samples.
+- usage: python -m benchmarks.plot_artists [--bins 10 50 200] [-r repeats] [--dpi dpi]
+- per artist: a Line2D per bin and two per percentile point, as [CanPlot.cp_plot] drew before.
+- collections: [CanPlot.cp_plot], a LineCollection for the bins and one for the guides.
+- template: [CanPlot.cp_get_template], the collections updated in place.
+- the samples are synthetic, log-normal like laser diffraction ones, drawn as graphical, so the guides are drawn too.
+"""
+import argparse
+import io
+import time
+from collections.abc import Callable
+from typing import Final
+
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+
+from mixins import CanSave
+from mixins.saver import EDGE_PADDING
+from models import Analyzer
+from typedefs import AnalysisMethod, GraphType, PlotData
+
+# Constants:
+DEFAULT_BINS: Final[tuple[int,...]] = (10, 50, 200)
+DEFAULT_REPEATS: Final[int] = 20
+DEFAULT_DPI: Final[int] = 100
+PHI_STEP: Final[float] = .1
+COLOR: Final[str] = '#1f77b4'
+
+type Render = Callable[[CanSave, GraphType, PlotData], Figure]
+
+
+def _make_sample(n_bins: int) -> pd.DataFrame:
+    """
+    A synthetic sample of [n_bins] sieves, a log-normal like weight distribution, in the [Sample] columns.
+    """
+    _phi: np.ndarray = np.round(-1+PHI_STEP*np.arange(n_bins), 2)
+    _wht: np.ndarray = np.exp(-.5*((_phi-_phi.mean())/(_phi.std() or 1))**2)+.01
+    _wht_pct: np.ndarray = np.round(_wht/_wht.sum()*100, 2)
+
+    return pd.DataFrame({'phi': _phi, 'wht': np.round(_wht, 3), 'wht%': _wht_pct,
+                         'cum.wht%': np.cumsum(_wht_pct).round(2)})
+
+
+def _plot_per_artist(ax: Axes, graph_type: GraphType, plot_data: PlotData) -> None:
+    """
+    The pseudo bins and guides as an artist each, the drawing before the collections.
+    """
+    _x, _y, _points, _ = plot_data
+    match graph_type:
+        case GraphType.HIST:
+            _interval_x: float = pd.Series(_x).diff().mode()[0]
+            _edges: np.ndarray = np.concatenate([_x[:1]-_interval_x, _x])
+            ax.stairs(values=_y, edges=_edges, fill=True, color=COLOR, zorder=2, linewidth=1.5, edgecolor='k')
+            ax.grid(True, axis='y', zorder=1)
+            for _x_bin, _y_bin in zip(_x[:-1], _y[:-1]):
+                ax.plot((_x_bin, _x_bin), (0, _y_bin), '-k')
+            ax.set_xticks(_edges)
+            ax.set_xticklabels(_edges)
+            ax.set_xlabel("phi (Ø)")
+            ax.set_ylabel("weight %")
+        case GraphType.CUM:
+            ax.set_xlim(_x.min()-.35/5, _x.max()+.35/5)
+            ax.set_ylim(0-.35*10, 100+.35*10)
+            for _y_cord, _x_cord in _points:
+                ax.plot([ax.get_xlim()[0], _x_cord, _x_cord], [_y_cord, _y_cord, ax.get_ylim()[0]],
+                        '--k', alpha=.25, zorder=2)
+                ax.plot(_x_cord, _y_cord, '--.k', alpha=.25, zorder=1)
+            ax.plot(_x, _y, color=COLOR)
+            ax.set_xlabel("phi (Ø)")
+            ax.set_ylabel("cumulative weight %")
+
+
+def _new_figure(saver: CanSave, graph_type: GraphType, plot_data: PlotData) -> tuple[Figure, Axes]:
+    """
+    A figure sized as [CanSave] sizes it.
+    """
+    _fig = Figure(figsize=saver._get_graph_size(graph_type, len(plot_data[0])), layout='constrained')
+    _fig.get_layout_engine().set(h_pad=EDGE_PADDING, w_pad=EDGE_PADDING*2) #type: ignore
+    return (_fig, _fig.add_subplot())
+
+
+def _render_per_artist(saver: CanSave, graph_type: GraphType, plot_data: PlotData) -> Figure:
+    _fig, _ax = _new_figure(saver, graph_type, plot_data)
+    _plot_per_artist(_ax, graph_type, plot_data)
+    return _fig
+
+
+def _render_collections(saver: CanSave, graph_type: GraphType, plot_data: PlotData) -> Figure:
+    _fig, _ax = _new_figure(saver, graph_type, plot_data)
+    saver.cp_plot(*plot_data, _ax, graph_type, COLOR)
+    return _fig
+
+
+def _render_template(saver: CanSave, graph_type: GraphType, plot_data: PlotData) -> Figure:
+    _size: tuple[float, float] = saver._get_graph_size(graph_type, len(plot_data[0]))
+    return saver.cp_get_template(graph_type, _size, (EDGE_PADDING, EDGE_PADDING*2)).update(plot_data, '', COLOR)
+
+
+def _to_png(fig: Figure, dpi: int) -> bytes:
+    _buffer = io.BytesIO()
+    fig.savefig(_buffer, dpi=dpi, format='png')
+    return _buffer.getvalue()
+
+
+def _count_artists(fig: Figure) -> int:
+    """
+    The artists on the axes, lines and collections.
+    """
+    _ax: Axes = fig.axes[0]
+    return len(_ax.lines)+len(_ax.collections)
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('--bins', type=int, nargs='+', default=list(DEFAULT_BINS), help='the sample sizes, in bins.')
+    _parser.add_argument('-r', '--repeats', type=int, default=DEFAULT_REPEATS, help='renders per sample size.')
+    _parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='the png resolution.')
+    _args = _parser.parse_args()
+
+    _saver = CanSave()
+    _renders: dict[str, Render] = {'per artist': _render_per_artist,
+                                   'collections': _render_collections,
+                                   'template': _render_template}
+
+    for _n_bins in _args.bins:
+        _ana = Analyzer(_make_sample(_n_bins))
+        print(f'{_n_bins} bins, {_args.repeats} renders, {_args.dpi} dpi:')
+
+        for _type in GraphType:
+            _x, _y, _points, _ = _ana.get_plot_data(_type)
+            _plot_data: PlotData = (np.asarray(_x), np.asarray(_y), _points, AnalysisMethod.GRAPHICAL)
+            _pngs: dict[str, bytes] = {}
+
+            for _label, _render in _renders.items():
+                _pngs[_label] = _to_png(_render(_saver, _type, _plot_data), _args.dpi) # warm up, and the output.
+                _start: float = time.perf_counter()
+                for _ in range(_args.repeats):
+                    _fig: Figure = _render(_saver, _type, _plot_data)
+                    _to_png(_fig, _args.dpi)
+                _elapsed: float = (time.perf_counter()-_start)/_args.repeats
+
+                _reference: np.ndarray = imread(io.BytesIO(_pngs['per artist']))
+                _same: bool = np.array_equal(_reference, imread(io.BytesIO(_pngs[_label])))
+                print(f'  {_type.name.lower():<5} {_label:<12} {_elapsed*1000:8.2f}ms/graph '
+                      f'{_count_artists(_fig):5} artists  {'same pixels' if _same else 'pixels differ'}')
+
+
+if __name__ == '__main__':
+    main()
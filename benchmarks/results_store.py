@@ -0,0 +1,92 @@
+"""
+Benchmarks the results store, bulk inserting synthetic samples, then timing indexed queries over them.
+- usage: python -m benchmarks.results_store [-n samples] [--db path]
+- the samples are random, stats spread as natural ones are, the data a small phi/wht frame each; the store is created from scratch, in a temporary dir unless [--db] is given.
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Final
+
+import numpy as np
+import pandas as pd
+
+from models.results_store import ResultsStore, StoredSample
+
+# Constants:
+DEFAULT_N: Final[int] = 1_000_000
+BATCH_SIZE: Final[int] = 10_000
+REPEATS: Final[int] = 5
+SEED: Final[int] = 0
+SORTING: Final[tuple[str,...]] = ('very well sorted', 'well sorted', 'moderately sorted', 'poorly sorted', 'very poorly sorted')
+
+
+def _get_samples(rng: np.random.Generator, start: int, n: int) -> list[StoredSample]:
+    _mean = rng.normal(1.5, 1.2, n)
+    _std = rng.gamma(4, .25, n)
+    _skewness = rng.normal(0, .3, n)
+    _kurtosis = rng.gamma(5, .2, n)
+    _sand = rng.uniform(0, 100, n)
+    _phi = np.arange(-1, 4.5, .5)
+    _data = pd.DataFrame({'phi': _phi, 'wht': np.ones_like(_phi)})
+
+    return [(f'/data/s{start+ind}.csv', _data,
+             {'sample': f's{start+ind}', 'method': 'Method of Moments',
+              'mean': _mean[ind], 'std': _std[ind], 'skewness': _skewness[ind], 'kurtosis': _kurtosis[ind],
+              'gravel': 0.0, 'sand': _sand[ind], 'silt': 100-_sand[ind], 'clay': 0.0,
+              'sorting': SORTING[min(int(_std[ind]/.5), len(SORTING)-1)], 'skewness_interpretation': '',
+              'kurtosis_interpretation': '', 'folk_class': '', 'shepard_class': ''},
+             f'{start+ind:032x}')
+            for ind in range(n)]
+
+
+def _time(label: str, func: Callable[[], pd.DataFrame]) -> None:
+    _best: float = float('inf')
+    for _ in range(REPEATS):
+        _start: float = time.perf_counter()
+        _found: pd.DataFrame = func()
+        _best = min(_best, time.perf_counter()-_start)
+    print(f'  {label:<48} {len(_found):>8} samples {_best*1000:8.1f}ms')
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples.')
+    _parser.add_argument('--db', default='', help='the store file, replaced, a temporary one otherwise.')
+    _args = _parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _path: str = _args.db or os.path.join(tmp_dir, 'results.sqlite3')
+        for _suffix in ('', '-wal', '-shm'):
+            if os.path.exists(_path+_suffix):
+                os.remove(_path+_suffix)
+
+        _store = ResultsStore(_path)
+        _rng = np.random.default_rng(SEED)
+        _elapsed: float = 0.0
+        for _start in range(0, _args.n, BATCH_SIZE):
+            _samples: list[StoredSample] = _get_samples(_rng, _start, min(BATCH_SIZE, _args.n-_start))
+            _tick: float = time.perf_counter()
+            _store.add_many(_samples, 'benchmark', {'seed': SEED})
+            _elapsed += time.perf_counter()-_tick
+        _store.close()
+        print(f'{_args.n} samples stored in {_elapsed:.2f}s, {_args.n/_elapsed:.0f} samples/s, '
+              f'{os.path.getsize(_path)/2**20:.0f}MB, r*tree {'on' if ResultsStore(_path).has_boxes else 'off'}')
+
+        _store = ResultsStore(_path)
+        print('queries, best of', REPEATS)
+        _time('find std <= .5, 1 <= mean <= 2', lambda: _store.find(std=(None, .5), mean=(1, 2)))
+        _time('query std < .5 and mean between 1 and 2', lambda: _store.query('std < .5 AND mean BETWEEN 1 AND 2'))
+        _time('find std <= .3, 1 <= mean <= 1.1', lambda: _store.find(std=(None, .3), mean=(1, 1.1)))
+        _time('find skewness >= .9, kurtosis <= .5', lambda: _store.find(skewness=(.9, None), kurtosis=(None, .5)))
+        _time('find 2 <= mean <= 2.01, sorting', lambda: _store.find(mean=(2, 2.01), sorting='poorly sorted'))
+        _time('find sand >= 99.9', lambda: _store.find(sand=(99.9, None)))
+        _time('query top 100 by kurtosis', lambda: _store.query(order_by='-kurtosis', limit=100))
+        _time('data of 1000 samples', lambda: pd.DataFrame(index=list(_store.get_data(range(1, 1001)))))
+        _store.close()
+
+
+if __name__ == '__main__':
+    main()
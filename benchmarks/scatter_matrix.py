@@ -0,0 +1,74 @@
+"""
+Benchmarks the dataset diagrams over a large stats table, synthetic samples appended one by one, then the scatter matrix rendered and saved.
+- usage: python -m benchmarks.scatter_matrix [-n samples] [--out dir]
+- the rows are random, as [models.batch.summarize] shapes them, the classes drawn from a fixed few.
+- the png and svg sizes are printed, the points are rasterized, the svg shouldn't grow with the samples.
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Final
+
+import numpy as np
+
+from mixins.diagrams import CanDiagram
+from models.batch import SummaryRow
+from models.stats_table import StatsTable
+
+# Constants:
+DEFAULT_N: Final[int] = 100_000
+SEED: Final[int] = 0
+SORTING_CLASSES: Final[tuple[str,...]] = ('very well sorted', 'well sorted', 'moderately sorted',
+                                          'poorly sorted', 'very poorly sorted')
+SKEWNESS_CLASSES: Final[tuple[str,...]] = ('very fine skewed', 'fine skewed', 'near symmetrical',
+                                           'coarse skewed', 'very coarse skewed')
+KURTOSIS_CLASSES: Final[tuple[str,...]] = ('platykurtic', 'mesokurtic', 'leptokurtic')
+
+
+def _get_rows(n: int) -> list[SummaryRow]:
+    """
+    [n] random summary rows, the classes loosely following the stats.
+    """
+    _rng = np.random.default_rng(SEED)
+    _std: np.ndarray = _rng.gamma(4, .3, n)
+    _mean: np.ndarray = _rng.normal(2, 1, n)+_std*.3
+    _skew: np.ndarray = np.clip(_rng.normal(0, .2, n), -1, 1)
+    _kurt: np.ndarray = _rng.lognormal(0, .25, n)
+
+    return [{'sample': f'sample {ind}', 'method': 'synthetic',
+             'mean': _mean[ind], 'std': _std[ind], 'skewness': _skew[ind], 'kurtosis': _kurt[ind],
+             'sorting': SORTING_CLASSES[min(len(SORTING_CLASSES)-1, int(_std[ind]/.5))],
+             'skewness_interpretation': SKEWNESS_CLASSES[int(np.digitize(_skew[ind], (-.3, -.1, .1, .3)))],
+             'kurtosis_interpretation': KURTOSIS_CLASSES[int(np.digitize(_kurt[ind], (.9, 1.11)))]}
+            for ind in range(n)]
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples.')
+    _parser.add_argument('--out', default='', help='a dir to keep the diagrams in, a temporary one otherwise.')
+    _args = _parser.parse_args()
+
+    _rows: list[SummaryRow] = _get_rows(_args.n)
+    _table = StatsTable()
+    _start: float = time.perf_counter()
+    _table.extend(_rows)
+    _elapsed: float = time.perf_counter()-_start
+    print(f'appended {len(_table)} rows {_elapsed:8.2f}s {_elapsed/len(_table)*1e6:8.2f}us/row')
+
+    _start = time.perf_counter()
+    _fig = CanDiagram().cd_plot_scatter_matrix(_table, 'sorting', 'synthetic')
+    print(f'plotted  {time.perf_counter()-_start:8.2f}s')
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        _dir: str = _args.out or _tmp
+        for _ext in ('png', 'svg'):
+            _path: str = os.path.join(_dir, f'scatter_matrix.{_ext}')
+            _start = time.perf_counter()
+            _fig.savefig(_path)
+            print(f'{_ext}      {time.perf_counter()-_start:8.2f}s {os.path.getsize(_path)/2**10:10.1f}KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmarks the project workbook against the per sample spreadsheets.
+- usage: python -m benchmarks.workbook_export [samples dir] [-n samples] [--end-to-end]
+- writers: the samples are analyzed once, then only the writing is timed, per sample [pd.ExcelWriter] workbooks vs one [StreamingWorkbook].
+- end to end: [CanExport.ce_export] in every mode, analysis and graphs included.
+"""
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Final
+
+import pandas as pd
+
+from mixins import CanExport
+from models import Analyzer, Sample, StreamingWorkbook
+from models.batch import SUMMARY_COLUMNS, summarize
+from models.workbook import OPENPYXL, XLSXWRITER, get_engine
+from typedefs import ExportMode, SaveObject
+
+# Constants:
+DEFAULT_N: Final[int] = 500
+ROUNDING: Final[int] = 3
+
+type Prepared = list[tuple[str, pd.DataFrame, Analyzer]]
+
+
+def _measure(func: Callable[[], object]) -> tuple[float, float]:
+    """
+    Runs [func] once.
+    - -> (wall seconds, peak traced memory in MB)
+    """
+    tracemalloc.start()
+    _start: float = time.perf_counter()
+    func()
+    _elapsed: float = time.perf_counter()-_start
+    _peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return (_elapsed, _peak/2**20)
+
+
+def _prepare(paths: list[str], n: int) -> Prepared:
+    """
+    Analyzes the samples at [paths] once, cycled up to [n] samples.
+    """
+    _samples: list[Sample] = [Sample(path) for path in paths]
+    _analyzed: Prepared = [(sample.get_name().lower(), sample.get_data(), Analyzer(sample.get_data()))
+                           for sample in _samples]
+    _prepared: Prepared = []
+    for _ind in range(n):
+        _name, _data, _ana = _analyzed[_ind % len(_analyzed)]
+        _prepared.append((f'{_name}_{_ind}', _data, _ana))
+
+    return _prepared
+
+
+def _write_per_sample(prepared: Prepared, out_dir: str) -> None:
+    """
+    The per sample path, as in [CanSave.cs_save_results].
+    """
+    for _name, _data, _ana in prepared:
+        _method = pd.DataFrame({'0': ['Analysis method:'], '1': [_ana.get_method().value]})
+        _stats = _ana.get_stats().to_frame()
+        _interp = _ana.get_interpretation().to_frame()
+        with pd.ExcelWriter(os.path.join(out_dir, f'{_name}.xlsx'), engine='openpyxl', mode='w') as writer:
+            _data.to_excel(writer, index=False, sheet_name='data')
+            _method.to_excel(writer, index=False, header=False, sheet_name='stats')
+            _stats.to_excel(writer, index=False, float_format=f'%.{ROUNDING}f',
+                            merge_cells=False, startrow=_method.shape[0]+1, sheet_name='stats')
+            _interp.to_excel(writer, index=False,
+                            merge_cells=False, startrow=_method.shape[0]+_stats.shape[0]+3,
+                            sheet_name='stats')
+
+
+def _write_workbook(prepared: Prepared, path: str, engine: str, long_format: bool) -> None:
+    """
+    The project workbook path, as in [CanExport.ce_export_workbook].
+    """
+    with StreamingWorkbook(path, engine) as book:
+        _summary: str = book.add_sheet('summary', SUMMARY_COLUMNS)
+        _data_sheet: str = ''
+        for _name, _data, _ana in prepared:
+            book.append(_summary, summarize(_name, _ana, ROUNDING).values())
+            if long_format:
+                _data_sheet = _data_sheet or book.add_sheet('data', ['sample', *_data.columns])
+                book.append_frame(_data_sheet, _data, leading=(_name,))
+            else:
+                book.append_frame(book.add_sheet(_name, list(_data.columns)), _data)
+
+
+def bench_writers(paths: list[str], n: int, out_dir: str) -> None:
+    """
+    Times the writers alone.
+    """
+    _prepared: Prepared = _prepare(paths, n)
+    _engines: list[str] = [XLSXWRITER, OPENPYXL] if get_engine() == XLSXWRITER else [OPENPYXL]
+
+    _runs: dict[str, Callable[[], object]] = {'per sample (openpyxl)': lambda: _write_per_sample(_prepared, out_dir)}
+    for _engine in _engines:
+        for _long in (True, False):
+            _layout: str = 'long' if _long else 'sheets'
+            _runs[f'workbook, {_layout} ({_engine})'] = \
+                lambda e=_engine, l=_long: _write_workbook(_prepared, os.path.join(out_dir, f'p_{e}_{l}.xlsx'), e, l)
+
+    print(f'writers, {n} samples:')
+    for _label, _run in _runs.items():
+        _elapsed, _peak = _measure(_run)
+        print(f'  {_label:<32} {_elapsed:8.2f}s {n/_elapsed:8.1f} samples/s  peak {_peak:7.1f}MB')
+
+
+def bench_end_to_end(paths: list[str], n: int, out_dir: str, workers: int) -> None:
+    """
+    Times [CanExport.ce_export] in every mode, the samples are copied to reach [n].
+    """
+    _files_dir: str = os.path.join(out_dir, 'samples')
+    os.makedirs(_files_dir, exist_ok=True)
+    _paths: list[str] = []
+    for _ind in range(n):
+        _src: str = paths[_ind % len(paths)]
+        _dst: str = os.path.join(_files_dir, f'{_ind}_{os.path.basename(_src)}')
+        shutil.copyfile(_src, _dst)
+        _paths.append(_dst)
+
+    print(f'end to end, {n} samples, {workers or os.cpu_count()} workers:')
+    for _mode in ExportMode:
+        _save_obj = SaveObject(prefix='', files_path=_files_dir, results_path=out_dir,
+                               results_dir_name=f'results_{_mode.name.lower()}', raw_results_dir_name='raw_files',
+                               color='#1f77b4', dpi=100, workers=workers, export_mode=_mode.value)
+        _elapsed, _peak = _measure(lambda: CanExport().ce_export(_paths, _save_obj))
+        print(f'  {_mode.value:<32} {_elapsed:8.2f}s {n/_elapsed:8.1f} samples/s  peak {_peak:7.1f}MB')
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument('samples_dir', help='a dir of .csv/.xlsx samples, cycled to reach [-n].')
+    _parser.add_argument('-n', type=int, default=DEFAULT_N, help='the number of samples.')
+    _parser.add_argument('--end-to-end', action='store_true', help='also time the whole export in every mode.')
+    _parser.add_argument('--workers', type=int, default=0, help='end to end worker processes, 0 uses every core.')
+    _args = _parser.parse_args()
+
+    _paths: list[str] = sorted(glob.glob(os.path.join(_args.samples_dir, '*.csv'))+
+                               glob.glob(os.path.join(_args.samples_dir, '*.xlsx')))
+    if not _paths:
+        raise SystemExit(f'no samples in [{_args.samples_dir}]')
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        bench_writers(_paths, _args.n, out_dir)
+        if _args.end_to_end:
+            bench_end_to_end(_paths, _args.n, out_dir, _args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,34 @@
 """
 Functionality wrapping mixin classes.
+- the mixins are loaded on first use, so the headless ones never pull in tkinter through the gui ones.
 """
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .defaults import Defaults
-from .observer import Observer
-from .plotter import CanPlot
-from .saver import CanSave
-from .tooltip import HasToolTip
-from .validator import Validator
+if TYPE_CHECKING:
+    from .defaults import Defaults
+    from .diagrams import CanDiagram
+    from .exporter import CanExport, ExportWorker
+    from .observer import Observer
+    from .plotter import CanPlot
+    from .reporter import CanReport
+    from .saver import CanSave
+    from .tooltip import HasToolTip
+    from .validator import Validator
+
+_MIXINS: dict[str, str] = {'Defaults': 'defaults',
+                           'CanDiagram': 'diagrams',
+                           'CanExport': 'exporter',
+                           'ExportWorker': 'exporter',
+                           'Observer': 'observer',
+                           'CanPlot': 'plotter',
+                           'CanReport': 'reporter',
+                           'CanSave': 'saver',
+                           'HasToolTip': 'tooltip',
+                           'Validator': 'validator'}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MIXINS:
+        return getattr(import_module(f'.{_MIXINS[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
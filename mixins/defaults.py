@@ -20,9 +20,15 @@ T = TypeVar('T', bound=DefaultObj)
 _objs: dict = {}
 _cnfg_dir: str = 'auto_gsa'
 _defaults_file_name: str = 'defaults.json'
-_app_data_path: str = os.environ.get('LOCALAPPDATA') #type: ignore
+# LOCALAPPDATA is windows only, elsewhere the config goes where XDG puts it.
+_app_data_path: str = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CONFIG_HOME')
+                       or os.path.join(os.path.expanduser('~'), '.config'))
 _cnfg_dir_path: str = os.path.join(_app_data_path, _cnfg_dir)
 _cnfg_file_path: str = os.path.join(_cnfg_dir_path, _defaults_file_name)
+# the persistent job queue, shared by the gui and the command line.
+JOBS_DB_PATH: Final[str] = os.path.join(_cnfg_dir_path, 'jobs.sqlite3')
+# the results store, every project's.
+RESULTS_DB_PATH: Final[str] = os.path.join(_cnfg_dir_path, 'results.sqlite3')
 
 class Defaults():
     """
@@ -59,7 +65,14 @@ class Defaults():
                 dpi = 300,
                 save_raw_files = False,
                 interval = (0,[]),
-                transparent = False)
+                transparent = False,
+                workers = 0,
+                chunk_size = 0,
+                ordered = True,
+                export_mode = 'per sample',
+                table_format = 'csv',
+                columnar_format = 'parquet',
+                group_by = 'subfolder')
 
         return cast(T, _data)
 
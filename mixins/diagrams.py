@@ -0,0 +1,206 @@
+"""
+Dataset diagrams, the stats of many samples plotted against each other, as a scatter matrix, and their texture, as a sand-silt-clay ternary diagram.
+"""
+from typing import Final
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from models.stats_table import STAT_COLUMNS, StatsTable
+from models.texture import (SAND_LIMITS, SHEPARD_MAJOR, SHEPARD_MINOR,
+                            SILT_CLAY_RATIOS)
+
+from .plotter import CanPlot
+
+# Constants:
+# figure, in inches.
+MATRIX_SIZE: Final[tuple[float, float]] = (11, 10)
+STAT_LABELS: Final[dict[str, str]] = {'mean': 'mean (Ø)', 'std': 'sorting, std (Ø)',
+                                      'skewness': 'skewness', 'kurtosis': 'kurtosis'}
+
+# points, smaller the more there are, always rasterized, a vector file of 100k points is unusable.
+POINT_SIZE_RANGE: Final[tuple[float, float]] = (.5, 12)
+POINT_SIZE_SCALE: Final[float] = 2_000
+POINT_ALPHA: Final[float] = .6
+CLASS_COLORMAP: Final[str] = 'tab10'
+MANY_CLASSES_COLORMAP: Final[str] = 'tab20' # Folk's 21 classes.
+DRAW_ORDER_SEED: Final[int] = 0
+
+# histograms
+HIST_BINS: Final[int] = 40
+HIST_COLOR: Final[str] = '0.6'
+
+# ternary, sand on top, clay to the left, silt to the right.
+TERNARY_SIZE: Final[tuple[float, float]] = (9, 7.5)
+TERNARY_CORNERS: Final[tuple[str, str, str]] = ('sand', 'silt', 'clay')
+FIELD_LINE_COLOR: Final[str] = '0.5'
+FIELD_LINE_WIDTH: Final[float] = .8
+# the classes fields are drawn as segments between (sand, silt, clay) % points.
+type TernaryPoint = tuple[float, float, float]
+
+
+def _get_point_size(n_points: int) -> float:
+    """
+    The markers area, in points^2, within [POINT_SIZE_RANGE].
+    """
+    return float(np.clip(POINT_SIZE_SCALE/max(1, n_points), *POINT_SIZE_RANGE))
+
+
+def _get_folk_fields() -> list[tuple[TernaryPoint, TernaryPoint]]:
+    """
+    The Folk (1954) sand-silt-clay fields, the sand limits across, the silt:clay ratios from the base up to the first sand limit.
+    """
+    _top: float = 100-SAND_LIMITS[0]
+    _fields: list[tuple[TernaryPoint, TernaryPoint]] = [((limit, 0, 100-limit), (limit, 100-limit, 0)) for limit in SAND_LIMITS]
+    for _ratio in SILT_CLAY_RATIOS:
+        _fields.append(((SAND_LIMITS[0], _top*_ratio/(1+_ratio), _top/(1+_ratio)), (0, 100*_ratio/(1+_ratio), 100/(1+_ratio))))
+
+    return _fields
+
+
+def _get_shepard_fields() -> list[tuple[TernaryPoint, TernaryPoint]]:
+    """
+    The Shepard (1954) fields, a line cutting each corner off, the central triangle and the lines parting its sides from the triangle's.
+    """
+    _rest: float = 100-SHEPARD_MAJOR
+    _center: float = 100-2*SHEPARD_MINOR
+    _half: float = (100-SHEPARD_MINOR)/2
+    _corners: list[tuple[TernaryPoint, TernaryPoint]] = [((SHEPARD_MAJOR, _rest, 0), (SHEPARD_MAJOR, 0, _rest)),
+                                                         ((_rest, SHEPARD_MAJOR, 0), (0, SHEPARD_MAJOR, _rest)),
+                                                         ((_rest, 0, SHEPARD_MAJOR), (0, _rest, SHEPARD_MAJOR))]
+    _triangle: list[TernaryPoint] = [(_center, SHEPARD_MINOR, SHEPARD_MINOR), (SHEPARD_MINOR, _center, SHEPARD_MINOR),
+                                     (SHEPARD_MINOR, SHEPARD_MINOR, _center)]
+    _sides: list[tuple[TernaryPoint, TernaryPoint]] = [((50, 50, 0), (_half, _half, SHEPARD_MINOR)),
+                                                       ((50, 0, 50), (_half, SHEPARD_MINOR, _half)),
+                                                       ((0, 50, 50), (SHEPARD_MINOR, _half, _half))]
+
+    return _corners+[(_triangle[ind-1], _triangle[ind]) for ind in range(3)]+_sides
+
+
+def _get_palette(n_classes: int) -> np.ndarray:
+    """
+    A color per class, [CLASS_COLORMAP] if it has enough, [MANY_CLASSES_COLORMAP] otherwise, cycled past it.
+    """
+    _cmap = colormaps[CLASS_COLORMAP if n_classes <= colormaps[CLASS_COLORMAP].N else MANY_CLASSES_COLORMAP]
+    return _cmap(np.arange(max(1, n_classes)) % _cmap.N)
+
+
+def _to_ternary(sand: np.ndarray, silt: np.ndarray, clay: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The (x, y) of (sand, silt, clay) % points in the ternary diagram, a unit sided triangle, clay at the origin.
+    """
+    _total: np.ndarray = np.asarray(sand)+np.asarray(silt)+np.asarray(clay)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((np.asarray(silt)+np.asarray(sand)/2)/_total, np.asarray(sand)*(3**.5/2)/_total)
+
+
+def _get_limits(values: np.ndarray) -> tuple[float, float]:
+    """
+    The axis limits of [values], padded, NaNs ignored, (0, 1) if there are none.
+    """
+    _finite: np.ndarray = values[np.isfinite(values)]
+    if not _finite.size:
+        return (0.0, 1.0)
+    _min, _max = float(_finite.min()), float(_finite.max())
+    _pad: float = (_max-_min)*.05 or .5
+
+    return (_min-_pad, _max+_pad)
+
+
+class CanDiagram(CanPlot):
+    """
+    A mixin plotting the dataset diagrams.
+    - functions:
+    - `cd_plot_scatter_matrix`: the stats against each other, colored by an interpretation.
+    - `cd_plot_ternary`: the texture in a sand-silt-clay triangle, colored by its classes.
+    """
+    def cd_plot_scatter_matrix(self, table: StatsTable, color_by: str = 'sorting', title: str = '') -> Figure:
+        """
+        Part of the CanDiagram mixin.
+        Plots every stat in [STAT_COLUMNS] against every other, mean vs sorting and skewness vs sorting among them, the points colored by the [color_by] classes; a histogram of each stat on the diagonal.
+        - color_by: one of [CLASS_COLUMNS].
+        - the points are drawn as one rasterized collection per axes, in a fixed shuffled order, so no class hides another.
+        """
+        _stats: np.ndarray = table.get_stats()
+        _codes, _classes = table.get_classes(color_by)
+        _n_stats: int = len(STAT_COLUMNS)
+
+        _palette: np.ndarray = _get_palette(len(_classes))
+        _order: np.ndarray = np.random.default_rng(DRAW_ORDER_SEED).permutation(len(table))
+        _colors: np.ndarray = _palette[_codes[_order]]
+        _size: float = _get_point_size(len(table))
+        _limits: list[tuple[float, float]] = [_get_limits(_stats[:, col]) for col in range(_n_stats)]
+
+        # no pyplot, the diagrams are rendered off the main thread too.
+        _fig = Figure(figsize=MATRIX_SIZE, layout='constrained')
+        _axes: np.ndarray = _fig.subplots(_n_stats, _n_stats, sharex='col', squeeze=False)
+
+        for _row in range(_n_stats):
+            # the diagonal has no y scale, the row's scale is labeled on its first scatter.
+            _label_col: int = 1 if _row == 0 else 0
+            for _col in range(_n_stats):
+                _ax: Axes = _axes[_row, _col]
+                if _row == _col:
+                    _values: np.ndarray = _stats[:, _col]
+                    _ax.hist(_values[np.isfinite(_values)], bins=HIST_BINS, range=_limits[_col], color=HIST_COLOR)
+                    _ax.tick_params(labelleft=False, left=False)
+                else:
+                    _ax.scatter(_stats[_order, _col], _stats[_order, _row], s=_size, c=_colors,
+                                alpha=POINT_ALPHA, linewidths=0, rasterized=True)
+                    _ax.set_ylim(_limits[_row])
+                    if _col == _label_col:
+                        _ax.set_ylabel(STAT_LABELS[STAT_COLUMNS[_row]])
+                    else:
+                        _ax.tick_params(labelleft=False)
+
+                _ax.set_xlim(_limits[_col])
+                if _row == _n_stats-1:
+                    _ax.set_xlabel(STAT_LABELS[STAT_COLUMNS[_col]])
+
+        _handles: list[Line2D] = [Line2D([], [], linestyle='', marker='o', color=_palette[ind], label=label)
+                                  for ind, label in enumerate(_classes)]
+        _fig.legend(handles=_handles, loc='outside right upper', title=color_by.replace('_', ' '))
+        _fig.suptitle(f'{title}{' - ' if title else ''}{len(table)} samples', fontweight='bold')
+
+        return _fig
+
+    def cd_plot_ternary(self, table: StatsTable, classification: str = 'folk_class', title: str = '') -> Figure:
+        """
+        Part of the CanDiagram mixin.
+        Plots the gravel free texture of every sample, its sand, silt and clay %, in a ternary diagram, over the fields of the [classification]; the points colored by the samples classes, as in [cd_plot_scatter_matrix].
+        - classification: 'folk_class', Folk (1954), or 'shepard_class', Shepard (1954).
+        - the gravel is left out, the gravelly classes show in the colors only.
+        """
+        _fractions: np.ndarray = table.get_fractions()
+        _codes, _classes = table.get_classes(classification)
+
+        _palette: np.ndarray = _get_palette(len(_classes))
+        _order: np.ndarray = np.random.default_rng(DRAW_ORDER_SEED).permutation(len(table))
+        _x, _y = _to_ternary(*_fractions[_order, 1:].T)
+
+        _fig = Figure(figsize=TERNARY_SIZE, layout='constrained')
+        _ax: Axes = _fig.add_subplot()
+        _ax.set_aspect('equal')
+        _ax.axis('off')
+
+        _corners_x, _corners_y = _to_ternary(*np.eye(3)[[0, 1, 2, 0]].T)
+        _ax.plot(_corners_x, _corners_y, color='k', linewidth=FIELD_LINE_WIDTH*1.5)
+        _fields = _get_folk_fields() if classification == 'folk_class' else _get_shepard_fields()
+        for _start, _end in _fields:
+            _ax.plot(*_to_ternary(*np.array([_start, _end]).T), color=FIELD_LINE_COLOR, linewidth=FIELD_LINE_WIDTH)
+        for _label, _x_corner, _y_corner, _align in zip(TERNARY_CORNERS, _corners_x, _corners_y, ('center', 'left', 'right')):
+            _ax.annotate(_label, (_x_corner, _y_corner), xytext=(0, 8 if _align == 'center' else -14),
+                         textcoords='offset points', ha=_align, fontweight='bold')
+
+        _ax.scatter(_x, _y, s=_get_point_size(len(table))*2, c=_palette[_codes[_order]],
+                    alpha=POINT_ALPHA, linewidths=0, rasterized=True, zorder=3)
+
+        _handles: list[Line2D] = [Line2D([], [], linestyle='', marker='o', color=_palette[ind], label=label or 'empty')
+                                  for ind, label in enumerate(_classes)]
+        _fig.legend(handles=_handles, loc='outside right upper', title=classification.replace('_', ' '))
+        _fig.suptitle(f'{title}{' - ' if title else ''}{len(table)} samples', fontweight='bold')
+
+        return _fig
@@ -0,0 +1,729 @@
+"""
+Exporting many samples at once over a pool of worker processes.
+"""
+import io
+import os
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any, Final
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from models import (Analyzer, ColumnarWriter, ExportManifest, Sample,
+                    StreamingWorkbook, get_export_settings, get_partial_path)
+from models.batch import (SUMMARY_COLUMNS, AnalyzedSample, ResampledSample,
+                          SummarizedSample, SummaryRow, analyze_path,
+                          get_pool, get_pool_params, get_sample_data,
+                          resample_path, summarize,
+                          summarize_path, write_table)
+from models.envelopes import GroupEnvelopes, get_group
+from models.manifest import ManifestEntry
+from models.stats_table import StatsTable
+from typedefs import (ColumnarFormat, ExportEvent, ExportGate, ExportMode,
+                      ExportPlan, ExportProgress, GroupBy, LogMsgType,
+                      SaveObject, TableFormat)
+
+from .diagrams import CanDiagram
+from .reporter import CanReport
+from .saver import CanSave, _atomic_path
+
+# Constants:
+# pool, sized as [models.batch.get_pool_params] says.
+IN_FLIGHT_CHUNKS_PER_WORKER: Final[int] = 2
+
+# manifest
+MANIFEST_FLUSH_EVERY: Final[int] = 25
+
+# workbook
+WORKBOOK_SUFFIX: Final[str] = '_project.xlsx'
+SUMMARY_SHEET: Final[str] = 'summary'
+DATA_SHEET: Final[str] = 'data'
+
+# stats table
+STATS_SUFFIX: Final[str] = '_stats'
+
+# columnar
+COLUMNAR_SUFFIX: Final[str] = '_columnar'
+
+# report
+REPORT_SUFFIX: Final[str] = '_report.pdf'
+
+# diagrams
+SCATTER_MATRIX_SUFFIX: Final[str] = '_scatter_matrix'
+DIAGRAMS_COLOR_BY: Final[str] = 'sorting'
+# a ternary diagram per classification, named by it.
+TERNARY_SUFFIXES: Final[dict[str, str]] = {'folk_class': '_folk_ternary', 'shepard_class': '_shepard_ternary'}
+
+# group envelopes
+ENVELOPES_SUFFIX: Final[str] = '_envelopes'
+ENVELOPES_FIGURE_SIZE: Final[tuple[float, float]] = (9, 6)
+
+# dry run
+PLAN_COLUMNS: Final[tuple[str,...]] = ('sample', 'kind', 'path', 'est_bytes', 'status')
+UP_TO_DATE: Final[str] = 'up to date'
+CHANGED: Final[str] = 'changed'
+NEW: Final[str] = 'new'
+
+# worker thread
+PAUSE_POLL_S: Final[float] = .1
+
+
+def _get_manifest_key(path: str) -> str:
+    """
+    Samples are recorded in the manifest by their file name, the samples of an export are refused if their names clash, see [get_name_clashes].
+    """
+    return os.path.split(path)[-1]
+
+
+def _save_sample(job: tuple[str, SaveObject, ManifestEntry|None]) -> tuple[str, str, str, ManifestEntry|None, Analyzer|None]:
+    """
+    As [_export_sample], with the analysis the results were saved from, for the callers that go on with it; None if the sample was skipped or failed.
+    - -> (manifest key, sample name, error massage, the new manifest entry, the sample analysis).
+    """
+    _path, _save_obj, _entry = job
+    _key: str = _get_manifest_key(_path)
+    _name: str = _key
+
+    try:
+        _sample = Sample(_path)
+        _name = _sample.get_name().lower()
+
+        _digest: str = _sample.get_hash()
+        _settings: dict = get_export_settings(_save_obj)
+        if ExportManifest.is_current(_entry, _digest, _settings, _save_obj.get_results_path()):
+            return (_key, _name, '', None, None)
+
+        _ana = Analyzer(get_sample_data(_sample))
+        _artifacts: list[str] = CanSave().cs_save_results(_sample, _save_obj, ana=_ana)
+    except Exception as e:
+        return (_key, _name, f'{type(e).__name__}: {e}', None, None)
+
+    return (_key, _name, '', {'source': _path, 'hash': _digest, 'settings': _settings, 'artifacts': _artifacts}, _ana)
+
+
+def _export_sample(job: tuple[str, SaveObject, ManifestEntry|None]) -> tuple[str, str, str, ManifestEntry|None]:
+    """
+    The worker side of the export, creates the sample at the given path and saves its results, unless its manifest entry is up to date.
+    - job: (sample path, save object, the sample's manifest entry).
+    - -> (manifest key, sample name, error massage, the new manifest entry), the entry is None if the sample was skipped or failed.
+    """
+    return _save_sample(job)[:4]
+
+
+def _render_report_page(job: tuple[str, str]) -> tuple[str, bytes, SummaryRow|None, str]:
+    """
+    The worker side of a parallel report, analyzes the sample at the given path and renders its page as a one page pdf.
+    - job: (sample path, graph color).
+    - -> (sample name, page pdf, summary row, error massage), the row is None if the sample failed.
+    """
+    _path, _color = job
+    _name: str = os.path.split(_path)[-1]
+
+    try:
+        _sample = Sample(_path)
+        _name = _sample.get_name().lower()
+        _ana = Analyzer(get_sample_data(_sample))
+        _row: SummaryRow = summarize(_name, _ana)
+        _reporter = CanReport()
+        _page: bytes = _reporter.cr_to_pdf_bytes(_reporter.cr_render_page(_name, _ana, _color))
+    except Exception as e:
+        return (_name, b'', None, f'{type(e).__name__}: {e}')
+
+    return (_name, _page, _row, '')
+
+
+def _get_pdf_writer() -> Any|None:
+    """
+    A pypdf writer to merge one page pdfs into, pypdf is optional, None without it.
+    """
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        return None
+    return PdfWriter()
+
+
+def _plan_sample(job: tuple[str, SaveObject, ManifestEntry|None]) -> tuple[str, list[dict[str, Any]], str]:
+    """
+    The worker side of the dry run, plans the sample at the given path and tells whether it's [up to date], [changed] or [new], against its manifest entry.
+    - job: (sample path, save object, the sample's manifest entry).
+    - -> (sample name, a report row per artifact, error massage).
+    """
+    _path, _save_obj, _entry = job
+    _name: str = _get_manifest_key(_path)
+
+    try:
+        _sample = Sample(_path)
+        _name = _sample.get_name().lower()
+        _plan: ExportPlan = CanSave().cs_plan_results(_sample.get_name(), _save_obj, _sample.get_data().shape[0])
+
+        _settings: dict = get_export_settings(_save_obj)
+        if ExportManifest.is_current(_entry, _sample.get_hash(), _settings, _save_obj.get_results_path()):
+            _status: str = UP_TO_DATE
+        else:
+            _status = CHANGED if _entry else NEW
+    except Exception as e:
+        return (_name, [], f'{type(e).__name__}: {e}')
+
+    _rows: list[dict[str, Any]] = [dict(zip(PLAN_COLUMNS, (_name, artifact.kind.value,
+                                                            os.path.relpath(artifact.path, _plan.results_dir_path),
+                                                            artifact.est_bytes, _status)))
+                                   for artifact in _plan.artifacts]
+    return (_name, _rows, '')
+
+
+class CanExport(CanSave, CanReport, CanDiagram):
+    """
+    A mixin wrapping the batch exporting functionality.
+    - functions:
+    - `ce_export`: export many samples, as the export mode says.
+    - `ce_export_all`: save the results of many samples in parallel.
+    - `ce_export_workbook`: stream the results of many samples into one workbook.
+    - `ce_export_stats`: save the stats of many samples into one table.
+    - `ce_export_columnar`: stream the data and stats of many samples into columnar files.
+    - `ce_export_report`: stream a page per sample, and a summary, into one pdf.
+    - `ce_export_diagrams`: save the stats of many samples, and their diagrams.
+    - `ce_export_envelopes`: save the percentile envelopes of groups of samples.
+    - `ce_dry_run`: report what saving many samples would write.
+    """
+    def _get_pool_params(self, save_obj: SaveObject, n_jobs: int) -> tuple[int, int]:
+        """
+        Resolves the [workers] and [chunk_size] of the [save_obj], 0 means pick automatically.
+        - -> (workers, chunk_size)
+        """
+        return get_pool_params(save_obj.workers, save_obj.chunk_size, n_jobs)
+
+    def _map_gated(self, func: Callable[[Any], Any], jobs: Iterable[Any], n_jobs: int, save_obj: SaveObject,
+                   gate: ExportGate|None = None, ordered: bool = True) -> Iterator[Any]:
+        """
+        Maps [func] over the [jobs] in a pool of [save_obj.workers] processes, or in this one if a single worker is asked for.
+        - jobs: handed out lazily, [gate] is called before each, it blocks while paused and returns False to stop handing them out.
+        - ordered: yield the results in the order of the [jobs], otherwise as they finish.
+        """
+        _workers, _chunk_size = self._get_pool_params(save_obj, n_jobs)
+        # the pool pulls the jobs as fast as it can, bounding the jobs in flight is what lets the gate pause it.
+        _in_flight = threading.Semaphore(_workers*_chunk_size*IN_FLIGHT_CHUNKS_PER_WORKER)
+
+        def _gated_jobs(bounded: bool = False) -> Iterator[Any]:
+            """
+            Hands out the jobs lazily, the pool pulls them from a thread of its own, so blocking here pauses the dispatch.
+            """
+            for _job in jobs:
+                if gate and not gate():
+                    return
+                if bounded:
+                    _in_flight.acquire()
+                yield _job
+
+        if _workers == 1:
+            for _job in _gated_jobs():
+                yield func(_job)
+            return
+
+        with get_pool(_workers) as pool:
+            _map = pool.imap if ordered else pool.imap_unordered
+            for _result in _map(func, _gated_jobs(bounded=True), _chunk_size):
+                _in_flight.release()
+                yield _result
+
+    def ce_export(self, paths: list[str], save_obj: SaveObject,
+                  on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> tuple[int, int]:
+        """
+        Part of the CanExport mixin.
+        Exports the samples at [paths] as the [save_obj.export_mode] says, see [ce_export_all], [ce_export_workbook], [ce_export_stats], [ce_export_columnar], [ce_export_report], [ce_export_diagrams] and [ce_export_envelopes].
+        - -> (the number of saved samples, the number of skipped up to date samples).
+        """
+        match ExportMode(save_obj.export_mode):
+            case ExportMode.PER_SAMPLE:
+                return self.ce_export_all(paths, save_obj, on_progress, gate)
+            case ExportMode.WORKBOOK | ExportMode.WORKBOOK_SHEETS:
+                return (self.ce_export_workbook(paths, save_obj, on_progress, gate), 0)
+            case ExportMode.STATS:
+                return (self.ce_export_stats(paths, save_obj, on_progress, gate), 0)
+            case ExportMode.COLUMNAR:
+                return (self.ce_export_columnar(paths, save_obj, on_progress, gate), 0)
+            case ExportMode.REPORT:
+                return (self.ce_export_report(paths, save_obj, on_progress, gate), 0)
+            case ExportMode.DIAGRAMS:
+                return (self.ce_export_diagrams(paths, save_obj, on_progress, gate), 0)
+            case ExportMode.ENVELOPES:
+                return (self.ce_export_envelopes(paths, save_obj, on_progress, gate), 0)
+
+    def ce_export_all(self, paths: list[str], save_obj: SaveObject,
+                      on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> tuple[int, int]:
+        """
+        Part of the CanExport mixin.
+        Saves the results of the samples at [paths], fanned out to worker processes that render headless.
+        - Incremental, samples whose content and export settings match the results dir manifest, with their files present, are skipped; the manifest is flushed as the export goes, so an interrupted export resumes where it stopped.
+        - The fallowing are within a SaveObject, on top of the [cs_save_results] ones:
+            - workers: the number of worker processes, 0 uses every core, 1 exports in this process.
+            - chunk_size: samples handed to a worker at once, 0 picks one based on the workload.
+            - ordered: report in the order of [paths] if true, otherwise as the samples finish.
+        - on_progress: called after every sample with (done, total, sample name, error massage).
+        - gate: called before handing out every sample, it blocks while the export is paused and returns False to cancel it.
+        - -> (the number of saved samples, the number of skipped up to date samples).
+        """
+        _total: int = len(paths)
+        _saved: int = 0
+        _skipped: int = 0
+        _unflushed: int = 0
+
+        if not paths:
+            return (_saved, _skipped)
+
+        _manifest = ExportManifest(save_obj.get_results_path())
+        # the entries are looked up as the jobs are handed out, so they see what was recorded up to then.
+        _jobs: Iterator[tuple[str, SaveObject, ManifestEntry|None]] = (
+            (path, save_obj, _manifest.get_entry(_get_manifest_key(path))) for path in paths)
+
+        try:
+            for _ind, _result in enumerate(self._map_gated(_export_sample, _jobs, _total, save_obj,
+                                                           gate, save_obj.ordered)):
+                _key, _name, _error, _entry = _result
+
+                if _entry:
+                    _manifest.record(_key, _entry)
+                    _saved += 1
+                    _unflushed += 1
+                elif not _error:
+                    _skipped += 1
+
+                if _unflushed >= MANIFEST_FLUSH_EVERY:
+                    _manifest.save()
+                    _unflushed = 0
+
+                if on_progress:
+                    on_progress(_ind+1, _total, _name, _error)
+        finally:
+            if _unflushed:
+                _manifest.save()
+
+        return (_saved, _skipped)
+
+    def _get_project_file_path(self, save_obj: SaveObject, suffix: str) -> str:
+        """
+        The path of a file covering the whole export, [results dir]/[prefix][files dir name][suffix].
+        """
+        _files_dir_name: str = os.path.basename(os.path.normpath(save_obj.files_path)) or 'samples'
+        return os.path.join(save_obj.get_results_path(), f'{save_obj.prefix}{_files_dir_name}{suffix}')
+
+    def ce_export_workbook(self, paths: list[str], save_obj: SaveObject,
+                           on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Streams the results of the samples at [paths] into one project workbook, in constant memory, no graphs; the samples are analyzed in worker processes, in order, and written as they come.
+        - The workbook has a summary sheet, a row per sample, then either a long format data sheet, [ExportMode.WORKBOOK], or a data sheet per sample, [ExportMode.WORKBOOK_SHEETS].
+        - The fallowing are within a SaveObject:
+            - prefix: To append to the beginning of the file's name, [prefix][files dir name]_project.xlsx.
+            - files_path: The dir housing the files, names the workbook.
+            - export_mode: the workbook layout.
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> the number of samples written, the workbook is only in place if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _written: int = 0
+
+        if not paths:
+            return _written
+
+        _results_dir_path: str = save_obj.get_results_path()
+        _book_path: str = self._get_project_file_path(save_obj, WORKBOOK_SUFFIX)
+        _long_format: bool = ExportMode(save_obj.export_mode) == ExportMode.WORKBOOK
+        _data_sheet: str = ''
+
+        os.makedirs(_results_dir_path, exist_ok=True)
+
+        # not [_atomic_path], a cancelled export has to leave the previous workbook, if any, as is.
+        _partial_path: str = get_partial_path(_book_path)
+        _done: int = 0
+        try:
+            with StreamingWorkbook(_partial_path) as book:
+                _summary_sheet: str = book.add_sheet(SUMMARY_SHEET, SUMMARY_COLUMNS)
+
+                _results: Iterator[AnalyzedSample] = self._map_gated(analyze_path, paths, _total, save_obj, gate)
+                for _name, _data, _row, _error in _results:
+                    if _row:
+                        book.append(_summary_sheet, _row.values())
+                        if _long_format:
+                            if not _data_sheet:
+                                _data_sheet = book.add_sheet(DATA_SHEET, ['sample', *_data.columns])
+                            book.append_frame(_data_sheet, _data, leading=(_name,))
+                        else:
+                            book.append_frame(book.add_sheet(_name, list(_data.columns)), _data)
+                        _written += 1
+
+                    _done += 1
+                    if on_progress:
+                        on_progress(_done, _total, _name, _error)
+
+            if _done == _total:
+                os.replace(_partial_path, _book_path)
+        finally:
+            if os.path.exists(_partial_path):
+                os.remove(_partial_path)
+
+        return _written
+
+    def ce_export_stats(self, paths: list[str], save_obj: SaveObject,
+                        on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Saves the stats and their interpretation, of the samples at [paths], into one summary table, a row per sample; nothing is plotted, the fastest export.
+        - The fallowing are within a SaveObject:
+            - prefix: To append to the beginning of the file's name, [prefix][files dir name]_stats.[table_format].
+            - files_path: The dir housing the files, names the table.
+            - table_format: csv, xlsx or parquet, the latter needs pyarrow.
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> the number of samples in the table, it's only written if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _rows: list[SummaryRow] = []
+        _done: int = 0
+
+        if not paths:
+            return len(_rows)
+
+        _table_format = TableFormat(save_obj.table_format)
+        _table_path: str = self._get_project_file_path(save_obj, f'{STATS_SUFFIX}.{_table_format.value}')
+
+        _results: Iterator[SummarizedSample] = self._map_gated(summarize_path, paths, _total, save_obj, gate)
+        for _name, _row, _error in _results:
+            if _row:
+                _rows.append(_row)
+
+            _done += 1
+            if on_progress:
+                on_progress(_done, _total, _name, _error)
+
+        if _done == _total:
+            os.makedirs(save_obj.get_results_path(), exist_ok=True)
+            with _atomic_path(_table_path) as _partial_path:
+                write_table(_rows, _partial_path, _table_format)
+
+        return len(_rows)
+
+    def ce_export_diagrams(self, paths: list[str], save_obj: SaveObject,
+                           on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Saves the dataset diagrams, a scatter matrix of the stats colored by the sorting and a sand-silt-clay ternary diagram per texture classification, along with the summary table; the stats table is built as the samples are analyzed, in worker processes, then plotted once.
+        - The fallowing are within a SaveObject:
+            - prefix, files_path, table_format: as in [ce_export_stats], the diagrams are named [prefix][files dir name]_scatter_matrix, _folk_ternary and _shepard_ternary.
+            - dpi, transparent, save_raw_files: as in [CanSave.cs_save_figure], the svg goes into the raw results dir.
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> the number of samples in the diagrams, they're only written if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _table = StatsTable(max(1, _total))
+        _done: int = 0
+
+        if not paths:
+            return len(_table)
+
+        _table_format = TableFormat(save_obj.table_format)
+        _table_path: str = self._get_project_file_path(save_obj, f'{STATS_SUFFIX}.{_table_format.value}')
+        _matrix_name: str = os.path.basename(self._get_project_file_path(save_obj, SCATTER_MATRIX_SUFFIX))
+        _ternary_names: dict[str, str] = {classification: os.path.basename(self._get_project_file_path(save_obj, suffix))
+                                          for classification, suffix in TERNARY_SUFFIXES.items()}
+
+        _results: Iterator[SummarizedSample] = self._map_gated(summarize_path, paths, _total, save_obj, gate)
+        for _name, _row, _error in _results:
+            if _row:
+                _table.append(_row)
+
+            _done += 1
+            if on_progress:
+                on_progress(_done, _total, _name, _error)
+
+        if _done == _total:
+            os.makedirs(save_obj.get_results_path(), exist_ok=True)
+            with _atomic_path(_table_path) as _partial_path:
+                write_table(_table.to_frame(), _partial_path, _table_format)
+
+            _files_dir_name: str = os.path.basename(os.path.normpath(save_obj.files_path))
+            self.cs_save_figure(self.cd_plot_scatter_matrix(_table, DIAGRAMS_COLOR_BY, _files_dir_name),
+                                _matrix_name, save_obj)
+            for _classification, _ternary_name in _ternary_names.items():
+                self.cs_save_figure(self.cd_plot_ternary(_table, _classification, _files_dir_name), _ternary_name, save_obj)
+
+        return len(_table)
+
+    def ce_export_envelopes(self, paths: list[str], save_obj: SaveObject,
+                            on_progress: ExportProgress|None = None, gate: ExportGate|None = None,
+                            groups: Mapping[str, str]|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Saves the percentile envelopes, 5 to 95, of the cumulative curves of every group of samples, as a long format table and a graph of their bands; the curves are evaluated on a fixed phi grid in worker processes and streamed into a sketch per group, see [GroupEnvelopes], so the memory doesn't grow with the samples.
+        - The fallowing are within a SaveObject:
+            - prefix, files_path, table_format: as in [ce_export_stats], the table and graph are named [prefix][files dir name]_envelopes.
+            - group_by: subfolder, relative to [files_path], or name prefix, see [GroupBy].
+            - dpi, transparent, save_raw_files: as in [CanSave.cs_save_figure].
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - groups: a user defined grouping, sample name to group, it overrides [group_by], see [get_group].
+        - -> the number of samples in the envelopes, they're only written if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _envelopes = GroupEnvelopes()
+        _done: int = 0
+
+        if not paths:
+            return len(_envelopes)
+
+        _group_by = GroupBy(save_obj.group_by)
+        _table_format = TableFormat(save_obj.table_format)
+        _table_path: str = self._get_project_file_path(save_obj, f'{ENVELOPES_SUFFIX}.{_table_format.value}')
+        _figure_name: str = os.path.basename(self._get_project_file_path(save_obj, ENVELOPES_SUFFIX))
+        _grid_spec: tuple[tuple[float, float], int] = ((float(_envelopes.grid[0]), float(_envelopes.grid[-1])),
+                                                       _envelopes.grid.size)
+
+        # ordered, the groups are read off the paths as the results come.
+        _jobs: Iterator[tuple[str, tuple[float, float], int]] = ((path, *_grid_spec) for path in paths)
+        _results: Iterator[ResampledSample] = self._map_gated(resample_path, _jobs, _total, save_obj, gate)
+        for _path, (_name, _curve, _error) in zip(paths, _results):
+            if _curve is not None:
+                _envelopes.add(get_group(_path, _group_by, save_obj.files_path, groups), _curve)
+
+            _done += 1
+            if on_progress:
+                on_progress(_done, _total, _name, _error)
+
+        if _done == _total:
+            _frame: pd.DataFrame = _envelopes.to_frame()
+            os.makedirs(save_obj.get_results_path(), exist_ok=True)
+            with _atomic_path(_table_path) as _partial_path:
+                write_table(_frame, _partial_path, _table_format, _frame.columns)
+
+            _fig = Figure(figsize=ENVELOPES_FIGURE_SIZE, layout='constrained')
+            _ax = _fig.add_subplot()
+            self.cp_plot_envelopes(_envelopes.grid, _envelopes.get_envelopes(), _ax, _envelopes.get_groups())
+            _ax.set_title(f'{os.path.basename(os.path.normpath(save_obj.files_path))}, by {_group_by.value}',
+                          loc='left', fontweight='bold')
+            self.cs_save_figure(_fig, _figure_name, save_obj)
+
+        return len(_envelopes)
+
+    def ce_export_columnar(self, paths: list[str], save_obj: SaveObject,
+                           on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Streams the data of the samples at [paths], in long format, and their summary table into columnar files, written in chunks, so the memory stays bounded; the samples are analyzed in worker processes, in order.
+        - Every row carries a [sample_id], the sample's position in [paths], and the [sample] name; the data keeps [phi, wht, wht%, cum.wht%] as float64.
+        - The fallowing are within a SaveObject:
+            - prefix: To append to the beginning of the files names, [prefix][files dir name]_columnar.
+            - files_path: The dir housing the files, names the files.
+            - columnar_format: parquet, feather or h5, see [ColumnarFormat].
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> the number of samples written, the files are only in place if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _written: int = 0
+        _done: int = 0
+
+        if not paths:
+            return _written
+
+        os.makedirs(save_obj.get_results_path(), exist_ok=True)
+        _base_path: str = self._get_project_file_path(save_obj, COLUMNAR_SUFFIX)
+
+        with ColumnarWriter(_base_path, ColumnarFormat(save_obj.columnar_format)) as writer:
+            _results: Iterator[AnalyzedSample] = self._map_gated(analyze_path, paths, _total, save_obj, gate)
+            for _name, _data, _row, _error in _results:
+                if _row:
+                    writer.append(_done, _name, _data, _row)
+                    _written += 1
+
+                _done += 1
+                if on_progress:
+                    on_progress(_done, _total, _name, _error)
+
+            if _done == _total:
+                writer.commit()
+
+        return _written
+
+    def ce_export_report(self, paths: list[str], save_obj: SaveObject,
+                         on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> int:
+        """
+        Part of the CanExport mixin.
+        Streams a page per sample at [paths], its graphs and stats table, then the summary pages, into one pdf, see [CanReport]; a page is written once rendered, so the figures don't pile up in memory.
+        - A single worker renders the pages here, in order, straight into the pdf; more render them in worker processes, as one page pdfs merged in order, which needs pypdf, the pages are rendered here without it.
+        - The fallowing are within a SaveObject:
+            - prefix: To append to the beginning of the file's name, [prefix][files dir name]_report.pdf.
+            - files_path: The dir housing the files, names the report.
+            - color: The color of graph elements.
+            - workers, chunk_size: as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> the number of sample pages, the report is only in place if the export wasn't cancelled midway.
+        """
+        _total: int = len(paths)
+        _rows: list[SummaryRow] = []
+        _done: int = 0
+
+        if not paths:
+            return len(_rows)
+
+        os.makedirs(save_obj.get_results_path(), exist_ok=True)
+        _report_path: str = self._get_project_file_path(save_obj, REPORT_SUFFIX)
+        _title: str = os.path.basename(_report_path).removesuffix(REPORT_SUFFIX)
+        _writer: Any|None = _get_pdf_writer() if self._get_pool_params(save_obj, _total)[0] > 1 else None
+
+        # not [_atomic_path], a cancelled export has to leave the previous report, if any, as is.
+        _partial_path: str = get_partial_path(_report_path)
+        try:
+            if _writer is None:
+                # the pdf backend is half the import time of this module, only the report needs it.
+                from matplotlib.backends.backend_pdf import PdfPages
+
+                with PdfPages(_partial_path) as pdf:
+                    _results: Iterator[AnalyzedSample] = self._map_gated(analyze_path, paths, _total, save_obj, gate)
+                    for _name, _data, _row, _error in _results:
+                        if _row:
+                            pdf.savefig(self.cr_render_page(_name, Analyzer(_data), save_obj.color))
+                            _rows.append(_row)
+
+                        _done += 1
+                        if on_progress:
+                            on_progress(_done, _total, _name, _error)
+
+                    if _done == _total:
+                        for _fig in self.cr_render_summary(_rows, _title):
+                            pdf.savefig(_fig)
+            else:
+                _jobs: Iterator[tuple[str, str]] = ((path, save_obj.color) for path in paths)
+                _pages = self._map_gated(_render_report_page, _jobs, _total, save_obj, gate)
+                for _name, _page, _row, _error in _pages:
+                    if _row:
+                        _writer.append(io.BytesIO(_page))
+                        _rows.append(_row)
+
+                    _done += 1
+                    if on_progress:
+                        on_progress(_done, _total, _name, _error)
+
+                if _done == _total:
+                    for _fig in self.cr_render_summary(_rows, _title):
+                        _writer.append(io.BytesIO(self.cr_to_pdf_bytes(_fig)))
+                    # every page embeds its own fonts, kept once.
+                    _writer.compress_identical_objects()
+                    _writer.write(_partial_path)
+
+            if _done == _total:
+                os.replace(_partial_path, _report_path)
+        finally:
+            if os.path.exists(_partial_path):
+                os.remove(_partial_path)
+
+        return len(_rows)
+
+    def ce_dry_run(self, paths: list[str], save_obj: SaveObject,
+                   on_progress: ExportProgress|None = None, gate: ExportGate|None = None) -> pd.DataFrame:
+        """
+        Part of the CanExport mixin.
+        Reports what [ce_export_all] would write for the samples at [paths], nothing is written; the samples are read, not analyzed nor plotted.
+        - The [save_obj] options are as in [ce_export_all].
+        - on_progress, gate: as in [ce_export_all].
+        - -> a row per artifact: [sample, kind, path, est_bytes, status], the path is relative to the results dir, the status is [up to date], [changed] or [new].
+        """
+        _total: int = len(paths)
+        _rows: list[dict[str, Any]] = []
+        _done: int = 0
+
+        _manifest = ExportManifest(save_obj.get_results_path())
+        _jobs: Iterator[tuple[str, SaveObject, ManifestEntry|None]] = (
+            (path, save_obj, _manifest.get_entry(_get_manifest_key(path))) for path in paths)
+
+        for _name, _sample_rows, _error in self._map_gated(_plan_sample, _jobs, _total, save_obj, gate):
+            _rows += _sample_rows
+
+            _done += 1
+            if on_progress:
+                on_progress(_done, _total, _name, _error)
+
+        return pd.DataFrame(_rows, columns=list(PLAN_COLUMNS))
+
+
+class ExportWorker(threading.Thread):
+    """
+    Runs [CanExport.ce_export] in the background, posting its events into a thread-safe queue for the UI to poll.
+    - functions:
+    - `drain`: get the pending events.
+    - `toggle_pause`: pause/resume the export.
+    - `cancel`: stop handing out samples, the ones in progress are finished.
+    """
+    def __init__(self, paths: list[str], save_obj: SaveObject, dry_run: bool = False) -> None:
+        """
+        Runs [CanExport.ce_export] in the background, posting its events into a thread-safe queue for the UI to poll.
+        - paths: the samples paths.
+        - save_obj: the export settings.
+        - dry_run: runs [CanExport.ce_dry_run] instead, posting its report as a [PLAN] event.
+        """
+        super().__init__(daemon=True)
+        self._paths = paths
+        self._save_obj = save_obj
+        self.dry_run = dry_run
+
+        self._events: queue.Queue[tuple[ExportEvent, tuple[Any,...]]] = queue.Queue()
+        self._resume = threading.Event()
+        self._cancel = threading.Event()
+        self._resume.set()
+
+    def _gate(self) -> bool:
+        """
+        Blocks while paused, returns False once cancelled.
+        """
+        while not self._resume.wait(PAUSE_POLL_S):
+            if self._cancel.is_set():
+                break
+        return not self._cancel.is_set()
+
+    def _on_progress(self, done: int, total: int, sample_name: str, error: str) -> None:
+        self._events.put((ExportEvent.PROGRESS, (done, total, sample_name, error)))
+
+    def run(self) -> None:
+        _saved, _skipped = 0, 0
+        try:
+            if self.dry_run:
+                _report = CanExport().ce_dry_run(self._paths, self._save_obj, self._on_progress, self._gate)
+                self._events.put((ExportEvent.PLAN, (_report,)))
+            else:
+                _saved, _skipped = CanExport().ce_export(self._paths, self._save_obj, self._on_progress, self._gate)
+        except Exception as e:
+            self._events.put((ExportEvent.LOG, (f'export failed, {type(e).__name__}: {e}', LogMsgType.ERROR)))
+        self._events.put((ExportEvent.DONE, (_saved, _skipped, self._cancel.is_set())))
+
+    def drain(self, limit: int) -> list[tuple[ExportEvent, tuple[Any,...]]]:
+        """
+        Gets up to [limit] pending events, without blocking.
+        """
+        _events: list[tuple[ExportEvent, tuple[Any,...]]] = []
+        while len(_events) < limit:
+            try:
+                _events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return _events
+
+    def toggle_pause(self) -> bool:
+        """
+        Pauses a running export or resumes a paused one.
+        - -> is paused.
+        """
+        if self._resume.is_set():
+            self._resume.clear()
+        else:
+            self._resume.set()
+        return not self._resume.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancels the export, samples already handed out to the workers are finished.
+        """
+        self._cancel.set()
+        self._resume.set()
@@ -278,6 +278,13 @@ class Observer():
         """
     ...
     @overload
+    def obs_broadcast(self, signal: Literal[Signal.OVERLAY], sender: BaseWidget,
+                            args: tuple[list[str], 'SaveObject', 'Sample']) -> None:
+        """
+        - signal: Signal.OVERLAY.
+        """
+    ...
+    @overload
     def obs_broadcast(self, signal: Literal[Signal.EXPAND], sender: BaseWidget,
                             args: tuple[BaseWidget]) -> None:
         """
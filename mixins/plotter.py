@@ -1,14 +1,297 @@
 # face_color can't be None, as it's fed by a SaveObj
+import threading
+from collections.abc import Mapping
+from typing import Final
+
 import numpy as np
+from matplotlib import colormaps
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from PIL import Image
+
+from typedefs import (AnalysisMethod, GraphType, PlotData, PlotInput,
+                      SamplePoints)
+
+# Constants:
+# templates
+TEMPLATE_POOL_LIMIT: Final[int] = 8
+CUM_PADDING: Final[float] = .35
+PHI_LABEL: Final[str] = "phi (\u00D8)"
+
+# overlays, the curves fade as they pile up.
+OVERLAY_ALPHA_SCALE: Final[float] = 10
+OVERLAY_ALPHA_RANGE: Final[tuple[float, float]] = (.02, .8)
+OVERLAY_LINEWIDTH: Final[float] = .8
+ENVELOPE_ALPHAS: Final[tuple[float, float]] = (.2, .3) # outer band, inner band.
+GROUPS_COLORMAP: Final[str] = 'tab10'
+
+type TemplateKey = tuple[GraphType, tuple[float, float]|None, tuple[float, float]|None]
+
+# a pool per thread, a figure is only ever drawn by the thread that made it.
+_local = threading.local()
+
+
+def _get_hist_edges(x: PlotInput) -> np.ndarray:
+    """
+    The bars edges, the phi values with an edge before the first, a step away, the step being the most common one.
+    """
+    _x: np.ndarray = np.asarray(x, dtype=float)
+    # the smallest on ties, as [pd.Series.mode] picks it.
+    _diffs, _counts = np.unique(np.diff(_x), return_counts=True)
+    _interval_x: float = float(_diffs[np.argmax(_counts)]) if len(_diffs) else 1.
+
+    return np.concatenate([_x[:1]-_interval_x, _x])
+
+
+def _get_bin_segments(x: np.ndarray, y: np.ndarray) -> list[tuple[tuple[float, float], tuple[float, float]]]:
+    """
+    The pseudo bins, a vertical line from 0 up to every bar but the last, whose edge the stairs draw.
+    """
+    return [((x_, 0), (x_, y_)) for x_, y_ in zip(x[:-1], y[:-1])]
+
+
+def _get_guide_segments(points: SamplePoints, x_min: float, y_min: float) -> list[tuple[tuple[float, float], ...]]:
+    """
+    The percentile guides, from the y axis to the point, then down to the x axis, [x_min] and [y_min] being the axes limits.
+    """
+    return [((x_min, y_cord), (x_cord, y_cord), (x_cord, y_min)) for y_cord, x_cord in points]
+
+
+def _get_point_coords(points: SamplePoints) -> tuple[list[float], list[float]]:
+    """
+    The percentile points, as (x values, y values).
+    """
+    return ([x_cord for _, x_cord in points], [y_cord for y_cord, _ in points])
+
+
+def _get_overlay_alpha(n_curves: int) -> float:
+    """
+    The curves alpha, lower the more curves there are, within [OVERLAY_ALPHA_RANGE].
+    """
+    return float(np.clip(OVERLAY_ALPHA_SCALE/max(1, n_curves), *OVERLAY_ALPHA_RANGE))
+
+
+class FigureTemplate():
+    """
+    A graph whose figure, axes and artists are created once, then updated in place for every sample, as [CanPlot.cp_plot] would draw it.
+    - functions:
+    - `update`: sets the sample data, title and color on the existing artists.
+    - `render_image`: renders the figure off screen, as an image.
+    - `recolor`: recolors the last rendered image, only the colored artists are redrawn.
+    """
+    def __init__(self, graph_type: GraphType, size: tuple[float, float]|None = None,
+                 pads: tuple[float, float]|None = None, edge_color: str = 'k') -> None:
+        """
+        A graph whose figure, axes and artists are created once, then updated in place for every sample.
+        - size: the figure size in inches, matplotlib's default if not given.
+        - pads: the constrained layout (h_pad, w_pad) in inches, matplotlib's default if not given.
+        - edge_color: the bars edge color, hexadecimal.
+        """
+        self.graph_type = graph_type
+        # no pyplot, it isn't thread-safe and the export may run off the main thread.
+        self.figure = Figure(figsize=size, layout='constrained')
+        if pads:
+            self.figure.get_layout_engine().set(h_pad=pads[0], w_pad=pads[1]) #type: ignore
+        self.ax: Axes = self.figure.add_subplot()
+
+        match graph_type:
+            case GraphType.HIST:
+                self._stairs = self.ax.stairs(values=[0], edges=[0, 1], fill=True, zorder=2,
+                                              **{'linewidth': 1.5, 'edgecolor': edge_color})
+                self._bins = LineCollection([], colors='k', capstyle='projecting', zorder=2)
+                self.ax.add_collection(self._bins, autolim=False)
+                self.ax.grid(True, axis='y', zorder=1)
+                self.ax.set_xlabel(PHI_LABEL)
+                self.ax.set_ylabel("weight %")
+            case GraphType.CUM:
+                self._guides = LineCollection([], colors='k', linestyles='--', alpha=.25, zorder=2)
+                self.ax.add_collection(self._guides, autolim=False)
+                self._points, = self.ax.plot([], [], '.k', alpha=.25, zorder=1)
+                self._curve, = self.ax.plot([], [])
+
+        # blitting, the last render without the color layer, see [render_image].
+        self._background = None
+        self._layer: list[Artist] = []
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.graph_type=}, {self.figure.get_size_inches()=})'
+
+    def update(self, plot_data: PlotData, title: str, face_color: str) -> Figure:
+        """
+        Draws [plot_data] on the existing artists, nothing is created.
+        - face_color: face color, hexadecimal.
+        - -> the updated figure.
+        """
+        _x, _y, _points, _method = plot_data
+        self._background = None
+
+        match self.graph_type:
+            case GraphType.HIST:
+                self._update_histo(np.asarray(_x, dtype=float), np.asarray(_y, dtype=float), face_color)
+            case GraphType.CUM:
+                self._update_cum(np.asarray(_x, dtype=float), np.asarray(_y, dtype=float),
+                                 _points, _method, face_color)
+
+        self.ax.set_title(title)
+        return self.figure
+
+    def render_image(self, size: tuple[int, int], dpi: int) -> Image.Image:
+        """
+        Renders the figure off screen, with Agg, at [size] pixels and [dpi], for a widget to show; no Tk canvas is involved.
+        - the figure is drawn without the color layer first, kept as the background [recolor] blits on.
+        """
+        if not isinstance(self.figure.canvas, FigureCanvasAgg):
+            FigureCanvasAgg(self.figure)
+
+        self.figure.set_dpi(dpi)
+        self.figure.set_size_inches(size[0]/dpi, size[1]/dpi)
+        _canvas: FigureCanvasAgg = self.figure.canvas #type: ignore
+
+        # animated artists are skipped by draw, only for this draw, saving the figure still draws them.
+        self._layer = self._get_color_layer()
+        for _artist in self._layer:
+            _artist.set_animated(True)
+        try:
+            _canvas.draw()
+        finally:
+            for _artist in self._layer:
+                _artist.set_animated(False)
+        self._background = _canvas.copy_from_bbox(self.figure.bbox)
+
+        return self._draw_layer()
+
+    def recolor(self, face_color: str) -> Image.Image|None:
+        """
+        Sets [face_color] on the colored artists, then redraws only them, and what's drawn over them, on the last rendered background.
+        - -> the recolored image, None if nothing was rendered since the last [update], see [render_image].
+        """
+        if self._background is None:
+            return None
+
+        match self.graph_type:
+            case GraphType.HIST:
+                self._stairs.set_facecolor(face_color)
+            case GraphType.CUM:
+                self._curve.set_color(face_color)
+
+        self.figure.canvas.restore_region(self._background) #type: ignore
+        return self._draw_layer()
+
+    def _get_color_layer(self) -> list[Artist]:
+        """
+        The colored artist and every artist drawn after it, in the axes drawing order, zorder then insertion.
+        """
+        _colored: Artist = self._stairs if self.graph_type == GraphType.HIST else self._curve
+        _artists: list[Artist] = sorted((child for child in self.ax.get_children() if child is not self.ax.patch),
+                                        key=lambda artist: artist.get_zorder())
+        return [artist for artist in _artists[_artists.index(_colored):] if artist.get_visible()]
+
+    def _draw_layer(self) -> Image.Image:
+        """
+        Draws the color layer on the canvas as is, then copies it out as an image.
+        """
+        _canvas: FigureCanvasAgg = self.figure.canvas #type: ignore
+        for _artist in self._layer:
+            self.ax.draw_artist(_artist)
+
+        return Image.frombuffer('RGBA', _canvas.get_width_height(), _canvas.buffer_rgba()).copy() #type: ignore
+
+    def _update_histo(self, x: np.ndarray, y: np.ndarray, color: str) -> None:
+        """
+        Updates the Histogram, the bars, the pseudo bins and the ticks.
+        """
+        _edges: np.ndarray = _get_hist_edges(x)
+
+        self._stairs.set_data(values=y, edges=_edges)
+        self._stairs.set_facecolor(color)
+        self._bins.set_segments(_get_bin_segments(x, y))
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_xticks(_edges)
+        self.ax.set_xticklabels(_edges)
+
+    def _update_cum(self, x: np.ndarray, y: np.ndarray, points: SamplePoints,
+                    analysis_method: AnalysisMethod, color: str) -> None:
+        """
+        Updates the cumulative curve, the two points method draws nothing.
+        """
+        _drawn: bool = analysis_method != AnalysisMethod.TWO_POINTS
+        _guided: bool = analysis_method == AnalysisMethod.GRAPHICAL
+        self._curve.set_visible(_drawn)
+        self._guides.set_visible(_guided)
+        self._points.set_visible(_guided)
 
-from typedefs import AnalysisMethod, GraphType, PlotInput, SamplePoints
+        if not _drawn:
+            self.ax.set_xlim(0, 1)
+            self.ax.set_ylim(0, 1)
+            self.ax.set_xlabel('')
+            self.ax.set_ylabel('')
+            return
+
+        self.ax.set_xlim(x.min()-CUM_PADDING/5, x.max()+CUM_PADDING/5)
+        self.ax.set_ylim(0-CUM_PADDING*10, 100+CUM_PADDING*10)
+        self.ax.set_xlabel(PHI_LABEL)
+        self.ax.set_ylabel("cumulative weight %")
+
+        if _guided:
+            _x_min, _y_min = self.ax.get_xlim()[0], self.ax.get_ylim()[0]
+            self._guides.set_segments(_get_guide_segments(points, _x_min, _y_min))
+            self._points.set_data(*_get_point_coords(points))
+
+        self._curve.set_data(x, y)
+        self._curve.set_color(color)
+
+
+def _get_pool() -> dict[TemplateKey, FigureTemplate]:
+    """
+    The calling thread's templates, by (graph type, size, pads).
+    """
+    if not hasattr(_local, 'templates'):
+        _local.templates = {}
+    return _local.templates
+
+
+def _plot_bands(ax: Axes, grid: np.ndarray, envelopes: np.ndarray, face_color: str|np.ndarray,
+                median_color: str|np.ndarray, label: str|None = None) -> None:
+    """
+    Shades the outer and inner bands of the [envelopes], percentiles ascending, and draws the middle one, the median, over them.
+    """
+    for _ind, _alpha in enumerate(ENVELOPE_ALPHAS[:len(envelopes)//2]):
+        ax.fill_between(grid, envelopes[_ind], envelopes[-_ind-1],
+                        color=face_color, alpha=_alpha, linewidth=0, zorder=1)
+    ax.plot(grid, envelopes[len(envelopes)//2], color=median_color, linewidth=1.5, zorder=3, label=label)
 
 
 class CanPlot():
     """
     Gives the ability to plot data.
+    - functions:
+    - `cp_plot`: plots the data on a given axes.
+    - `cp_get_template`: a pooled [FigureTemplate], to redraw graphs without creating figures.
+    - `cp_plot_overlay`: plots many cumulative curves, on a shared grid, as one collection.
+    - `cp_plot_envelopes`: plots the percentile bands of groups of samples, on a shared grid.
     """
+    def cp_get_template(self, graph_type: GraphType, size: tuple[float, float]|None = None,
+                        pads: tuple[float, float]|None = None) -> FigureTemplate:
+        """
+        Part of the CanPlot mixin.
+        Returns the calling thread's template for [graph_type] at [size] and [pads], created on first use; the oldest template is dropped past [TEMPLATE_POOL_LIMIT].
+        - the template is shared, its figure has to be saved before it's updated again.
+        """
+        _pool: dict[TemplateKey, FigureTemplate] = _get_pool()
+        _key: TemplateKey = (graph_type, size, pads)
+
+        if _key not in _pool:
+            if len(_pool) >= TEMPLATE_POOL_LIMIT:
+                del _pool[next(iter(_pool))]
+            _pool[_key] = FigureTemplate(graph_type, size, pads)
+
+        return _pool[_key]
+
     def cp_plot (self, x: PlotInput, y: PlotInput,
                  points: SamplePoints, analysis_method: AnalysisMethod,
                  ax: Axes, graph_type: GraphType, face_color: str,
@@ -24,17 +307,15 @@ class CanPlot():
             """
             Plots the Histogram.
             """
-            _interval_x: float = x.diff().mode()[0] #type: ignore
-            _edges: np.ndarray = np.concatenate([x[:1]-_interval_x, x])
+            _edges: np.ndarray = _get_hist_edges(x)
 
             ax.stairs(values=y, edges=_edges, fill=True,
                       color=color, zorder=2,
                       **{'linewidth': 1.5, 'edgecolor': edge_color})
             ax.grid(True, axis='y', zorder=1)
 
-            #plot vertical lines to make pseudo bins!:
-            for x,y in zip(x[:-1],y[:-1]):
-                ax.plot((x,x), (0,y), '-k' )#type: ignore
+            #plot vertical lines to make pseudo bins!, one collection however many bins:
+            ax.vlines(x[:-1], 0, y[:-1], colors='k', capstyle='projecting') #type: ignore
 
             ax.set_xticks(_edges)
             ax.set_xticklabels(_edges)
@@ -48,14 +329,9 @@ class CanPlot():
             Plots the cumulative curve.
             """
             if analysis_method == AnalysisMethod.GRAPHICAL:
-                for _point in points:
-
-                    _y_cord, _x_cord = _point
-                    _x_cords: list = [ax.get_xlim()[0], _x_cord, _x_cord]
-                    _y_cords: list = [_y_cord, _y_cord, ax.get_ylim()[0]]
-
-                    ax.plot(_x_cords, _y_cords, '--k', alpha=.25, zorder=2)
-                    ax.plot(_x_cord, _y_cord, '--.k', alpha=.25, zorder=1)
+                ax.add_collection(LineCollection(_get_guide_segments(points, ax.get_xlim()[0], ax.get_ylim()[0]),
+                                                 colors='k', linestyles='--', alpha=.25, zorder=2), autolim=False)
+                ax.plot(*_get_point_coords(points), '.k', alpha=.25, zorder=1)
             
             ax.plot(x, y, color=color) #? this fixed the double plotting issue!
             ax.set_xlabel("phi (\u00D8)")
@@ -70,4 +346,50 @@ class CanPlot():
                     _padding: float = .35
                     ax.set_xlim(x.min()-_padding/5, x.max()+_padding/5)
                     ax.set_ylim(0-_padding*10, 100+_padding*10)
-                    _plot_cum(ax, x, y, points, face_color, analysis_method)
\ No newline at end of file
+                    _plot_cum(ax, x, y, points, face_color, analysis_method)
+
+    def cp_plot_overlay(self, grid: np.ndarray, curves: np.ndarray, ax: Axes, face_color: str,
+                        envelopes: np.ndarray|None = None) -> None:
+        """
+        Part of the CanPlot mixin.
+        Plots the cumulative curves of many samples, sharing the phi [grid], as one collection, see [models.overlay.CurveOverlay].
+        - curves: (samples, grid points), NaN where a curve isn't defined, nothing is drawn there.
+        - envelopes: percentiles at the grid points, ascending, the outer and inner bands are shaded and the middle one, the median, is drawn over the curves.
+        """
+        _segments: np.ndarray = np.stack(np.broadcast_arrays(grid[np.newaxis, :], curves), axis=-1)
+        ax.add_collection(LineCollection(_segments, colors=face_color, linewidths=OVERLAY_LINEWIDTH,
+                                         alpha=_get_overlay_alpha(len(curves)), zorder=2), autolim=False)
+
+        if envelopes is not None and len(envelopes):
+            _plot_bands(ax, grid, envelopes, face_color, 'k')
+
+        ax.set_xlim(grid.min()-CUM_PADDING/5, grid.max()+CUM_PADDING/5)
+        ax.set_ylim(0-CUM_PADDING*10, 100+CUM_PADDING*10)
+        ax.set_xlabel(PHI_LABEL)
+        ax.set_ylabel("cumulative weight %")
+
+    def cp_plot_envelopes(self, grid: np.ndarray, envelopes: Mapping[str, np.ndarray], ax: Axes,
+                          counts: Mapping[str, int]|None = None) -> None:
+        """
+        Part of the CanPlot mixin.
+        Plots the percentile bands of every group of samples, sharing the phi [grid], a color per group, see [models.envelopes.GroupEnvelopes].
+        - envelopes: per group, percentiles at the grid points, ascending, the outer and inner bands are shaded and the middle one, the median, is drawn over them.
+        - counts: per group, the number of samples, for the legend.
+        - the phi axis is cut to where any band isn't flat at 0 or 100.
+        """
+        _palette: np.ndarray = colormaps[GROUPS_COLORMAP](np.arange(max(1, len(envelopes))) % colormaps[GROUPS_COLORMAP].N)
+        _active: np.ndarray = np.zeros(grid.size, dtype=bool)
+
+        for _ind, (_group, _envelopes) in enumerate(envelopes.items()):
+            _label: str = f'{_group} [{counts[_group]}]' if counts else _group
+            _plot_bands(ax, grid, _envelopes, _palette[_ind], _palette[_ind], _label)
+            with np.errstate(invalid='ignore'):
+                _active |= (_envelopes[0] < 100) & (_envelopes[-1] > 0)
+
+        _shown: np.ndarray = grid[_active] if _active.any() else grid
+        ax.set_xlim(_shown.min()-CUM_PADDING, _shown.max()+CUM_PADDING)
+        ax.set_ylim(0-CUM_PADDING*10, 100+CUM_PADDING*10)
+        ax.set_xlabel(PHI_LABEL)
+        ax.set_ylabel("cumulative weight %")
+        if envelopes:
+            ax.legend(loc='lower right', fontsize='small')
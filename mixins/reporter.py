@@ -0,0 +1,114 @@
+"""
+Laying out report pages, a page per sample and the summary pages, as figures to stream into a multi-page pdf.
+"""
+import io
+from collections.abc import Iterator, Sequence
+from typing import Final
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from models import Analyzer
+from models.batch import SUMMARY_COLUMNS, SummaryRow
+from typedefs import GraphType
+
+from .plotter import CanPlot
+from .saver import GRAPH_TITLES
+
+# Constants:
+# pages, A4 in inches.
+PAGE_SIZE: Final[tuple[float, float]] = (8.27, 11.69)
+SUMMARY_PAGE_SIZE: Final[tuple[float, float]] = (11.69, 8.27)
+GRAPHS_HEIGHT_RATIOS: Final[tuple[float, float, float]] = (1, 1, .7)
+
+# tables
+SUMMARY_ROWS_PER_PAGE: Final[int] = 30
+TABLE_FONT_SIZE: Final[int] = 9
+SUMMARY_FONT_SIZE: Final[int] = 7
+STATS_HEADER: Final[tuple[str, str, str]] = ('statistic', 'value', 'interpretation')
+
+
+def _get_stats_table(analyzer: Analyzer, rounding: int) -> pd.DataFrame:
+    """
+    The stats next to their interpretation, one row per statistic, from [SampleStats.to_frame] and [StatsInterpretation.to_frame]; the interpretation only stats, sorting, come last.
+    """
+    _stats: pd.DataFrame = analyzer.get_stats().to_frame()
+    _stats['values'] = _stats['values'].astype(float).round(rounding)
+    _interp: pd.DataFrame = analyzer.get_interpretation().to_frame()
+
+    _table: pd.DataFrame = _stats.merge(_interp, on='statistic', how='left')
+    _table = pd.concat([_table, _interp[~_interp['statistic'].isin(_stats['statistic'])]], ignore_index=True)
+
+    return _table.fillna('')[['statistic', 'values', 'interpretation']]
+
+
+class CanReport(CanPlot):
+    """
+    A mixin laying out the report pages.
+    - functions:
+    - `cr_render_page`: a sample page, its graphs and stats table.
+    - `cr_render_summary`: the summary pages, a row per sample.
+    - `cr_to_pdf_bytes`: a figure as a one page pdf.
+    """
+    def cr_render_page(self, sample_name: str, analyzer: Analyzer, color: str, rounding: int = 3) -> Figure:
+        """
+        Part of the CanReport mixin.
+        A sample page, the histogram and the cumulative curve, drawn with [CanPlot.cp_plot], above the stats and their interpretation.
+        - color: The color of graph elements.
+        - rounding: rounding the stats in the table.
+        """
+        # no pyplot, pages are rendered off the main thread and in worker processes.
+        _fig = Figure(figsize=PAGE_SIZE, layout='constrained')
+        _fig.suptitle(sample_name, fontsize='x-large', fontweight='bold')
+        _graph_ax, _cum_ax, _table_ax = _fig.subplots(3, 1, height_ratios=GRAPHS_HEIGHT_RATIOS)
+
+        for _type, _ax in ((GraphType.HIST, _graph_ax), (GraphType.CUM, _cum_ax)):
+            self.cp_plot(*analyzer.get_plot_data(_type), _ax, _type, color)
+            _ax.set_title(GRAPH_TITLES[_type])
+
+        _table: pd.DataFrame = _get_stats_table(analyzer, rounding)
+        _table_ax.axis('off')
+        _table_ax.set_title(f'Analysis method: {analyzer.get_method().value}', loc='left')
+        _cells = _table_ax.table(cellText=_table.astype(str).values.tolist(), colLabels=list(STATS_HEADER),
+                                 loc='upper center', cellLoc='left')
+        _cells.auto_set_font_size(False)
+        _cells.set_fontsize(TABLE_FONT_SIZE)
+        _cells.scale(1, 1.5)
+
+        return _fig
+
+    def cr_render_summary(self, rows: Sequence[SummaryRow], title: str = 'Summary') -> Iterator[Figure]:
+        """
+        Part of the CanReport mixin.
+        The summary pages, landscape, [SUMMARY_ROWS_PER_PAGE] samples per page; a page is made only once the previous one is consumed.
+        - rows: as [models.batch.summarize] makes them.
+        """
+        _table = pd.DataFrame(list(rows), columns=list(SUMMARY_COLUMNS)).fillna('')
+        _n_pages: int = max(1, -(-_table.shape[0]//SUMMARY_ROWS_PER_PAGE))
+
+        for _page in range(_n_pages):
+            _chunk: pd.DataFrame = _table.iloc[_page*SUMMARY_ROWS_PER_PAGE:(_page+1)*SUMMARY_ROWS_PER_PAGE]
+
+            _fig = Figure(figsize=SUMMARY_PAGE_SIZE, layout='constrained')
+            _ax = _fig.add_subplot()
+            _ax.axis('off')
+            _ax.set_title(f'{title} [{_page+1}/{_n_pages}]', loc='left', fontweight='bold')
+            if not _chunk.empty:
+                _cells = _ax.table(cellText=_chunk.astype(str).values.tolist(),
+                                   colLabels=[col.replace('_', ' ') for col in SUMMARY_COLUMNS],
+                                   loc='upper center', cellLoc='left')
+                _cells.auto_set_font_size(False)
+                _cells.set_fontsize(SUMMARY_FONT_SIZE)
+                _cells.auto_set_column_width(list(range(len(SUMMARY_COLUMNS))))
+
+            yield _fig
+
+    def cr_to_pdf_bytes(self, figure: Figure) -> bytes:
+        """
+        Part of the CanReport mixin.
+        Renders the [figure] as a one page pdf, in memory, to be merged into a report elsewhere.
+        """
+        _buffer = io.BytesIO()
+        figure.savefig(_buffer, format='pdf')
+
+        return _buffer.getvalue()
@@ -1,14 +1,18 @@
+import io
 import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Final
 
-import matplotlib.pyplot as plt
 import pandas as pd
+from matplotlib.figure import Figure
 
-from models import Analyzer, Sample
-from typedefs import GraphType, SaveObject
+from models import Analyzer, Sample, get_partial_path
+from typedefs import (Artifact, ArtifactKind, ExportPlan, GraphType,
+                      PreparedGraph, SaveObject)
 
 from .defaults import Defaults
-from .plotter import CanPlot
+from .plotter import CanPlot, FigureTemplate
 
 # Constants:
 
@@ -16,18 +20,195 @@ from .plotter import CanPlot
 WIDE_SMPL_LIMIT: Final[int] = 10
 WIDTH_PER_X: Final[float] = .71*.75 # test driven, 6.4[default graph width]/9[len(x)] in the sample.
 EDGE_PADDING: Final[float] = 10/72
+GRAPH_HEIGHT: Final[float] = 4.8
+GRAPH_WIDTH: Final[float] = 6.8
+GRAPH_TITLES: Final[dict[GraphType, str]] = {GraphType.HIST: 'Histogram', GraphType.CUM: 'Cumulative Curve'}
+PREVIEW_DPI: Final[int] = 30 # a thumbnail of the export, 204x144 px for a 6.8x4.8 in graph.
+
+# size estimation, test driven, from the sizes of exported samples.
+XLSX_BASE_BYTES: Final[int] = 5_800
+XLSX_BYTES_PER_ROW: Final[int] = 15
+CSV_BYTES_PER_ROW: Final[int] = 32
+PNG_BYTES_PER_INCH_DPI: Final[int] = 20 # per (width+height) inch per dpi, png size grows with the edges drawn, not the area.
+SVG_BASE_BYTES: Final[int] = 22_000
+SVG_BYTES_PER_ROW: Final[int] = 800
+
+
+@contextmanager
+def _atomic_path(path: str) -> Iterator[str]:
+    """
+    Yields a partial path to write into, renamed to [path] only once the writing is done, so partial files never look complete.
+    """
+    _partial_path: str = get_partial_path(path)
+    try:
+        yield _partial_path
+        os.replace(_partial_path, path)
+    finally:
+        if os.path.exists(_partial_path):
+            os.remove(_partial_path)
+
 
 class CanSave(Defaults, CanPlot):
     """
     A mixin wrapping the saving functionality.
     - functions:
-    - `cs_save_results`: save the result.
+    - `cs_plan_results`: plan what saving a sample produces.
+    - `cs_prepare_graphs`: the sample graphs, ready to render at any resolution.
+    - `cs_render_preview`: a prepared graph as a low resolution png.
+    - `cs_execute_plan`: write a planned sample.
+    - `cs_save_results`: save the result, plans then executes.
+    - `cs_save_figure`: save a figure covering many samples, a diagram, as the sample graphs are saved.
     """
-    def cs_save_results(self, sample: Sample, save_obj: SaveObject, rounding: int = 3) -> None:
+    def _get_graph_size(self, graph_type: GraphType, n_x: int) -> tuple[float, float]:
+        """
+        The graph size in inches, wider for histograms of samples analyzed with an extensive sieve set.
+        - n_x: the number of x values, the sample data rows.
+        """
+        _wide_sample: bool = (graph_type == GraphType.HIST) and (n_x > WIDE_SMPL_LIMIT)
+        _graph_width: float = n_x*WIDTH_PER_X if _wide_sample else GRAPH_WIDTH
+        return (_graph_width, GRAPH_HEIGHT)
+
+    def cs_plan_results(self, sample_name: str, save_obj: SaveObject, n_rows: int = 0) -> ExportPlan:
+        """
+        Part of the CanSave mixin.
+        Turns the [save_obj] options into the unique files saving the sample produces, each with an estimated size, and the dirs they need; nothing is written.
+        - sample_name: names the files.
+        - n_rows: the sample data rows, sizes the histogram and the estimations, 0 if unknown.
+        - The [save_obj] options are as in [cs_save_results].
+        """
+        _results_dir_path: str = save_obj.get_results_path()
+        _raw_results_dir_path: str = os.path.join(_results_dir_path, save_obj.raw_results_dir_name) #!rawThing
+        _sample_name: str = sample_name.lower()
+        _result_sample_name: str = save_obj.prefix+_sample_name
+
+        # keyed by path, so no file is ever planned twice.
+        _artifacts: dict[str, Artifact] = {}
+        def _add(artifact: Artifact) -> None:
+            _artifacts.setdefault(artifact.path, artifact)
+
+        _add(Artifact(ArtifactKind.SHEET, os.path.join(_results_dir_path, f'{_result_sample_name}.xlsx'),
+                      est_bytes=XLSX_BASE_BYTES+XLSX_BYTES_PER_ROW*n_rows))
+
+        for _type in GraphType:
+            _graph_file_name: str = f'{_sample_name}_{GRAPH_TITLES[_type].lower().replace(' ', '_')}'
+            _width, _height = self._get_graph_size(_type, n_rows)
+
+            _add(Artifact(ArtifactKind.GRAPH, os.path.join(_results_dir_path, f'{_graph_file_name}.png'), _type,
+                          est_bytes=int(PNG_BYTES_PER_INCH_DPI*(_width+_height)*save_obj.dpi)))
+            if save_obj.save_raw_files:
+                _add(Artifact(ArtifactKind.RAW_GRAPH, os.path.join(_raw_results_dir_path, f'{_graph_file_name}.svg'), _type,
+                              est_bytes=SVG_BASE_BYTES+SVG_BYTES_PER_ROW*n_rows))
+
+        if save_obj.save_raw_files:
+            _add(Artifact(ArtifactKind.RAW_DATA, os.path.join(_raw_results_dir_path, f'{_result_sample_name}.csv'),
+                          est_bytes=CSV_BYTES_PER_ROW*(n_rows+1)))
+
+        _dirs: list[str] = sorted({os.path.dirname(artifact.path) for artifact in _artifacts.values()})
+
+        return ExportPlan(sample_name, _results_dir_path, _dirs, list(_artifacts.values()))
+
+    def cs_prepare_graphs(self, sample_name: str, ana: Analyzer) -> dict[GraphType, PreparedGraph]:
+        """
+        Part of the CanSave mixin.
+        The sample graphs, their plot data, titles and sizes, prepared once, then rendered as previews and, only when exporting, at full resolution.
+        - sample_name: titles the graphs.
+        """
+        _prepared: dict[GraphType, PreparedGraph] = {}
+        for _type in GraphType:
+            _plot_data = ana.get_plot_data(_type)
+            _prepared[_type] = PreparedGraph(_type, _plot_data, f'{GRAPH_TITLES[_type]}\n{sample_name}',
+                                             self._get_graph_size(_type, len(_plot_data[0])))
+
+        return _prepared
+
+    def _render_graph(self, prepared: PreparedGraph, color: str) -> Figure:
+        """
+        Renders a prepared graph, on the pooled template of its type and size, see [CanPlot.cp_get_template].
+        """
+        _template: FigureTemplate = self.cp_get_template(prepared.graph_type, prepared.size,
+                                                         (EDGE_PADDING, EDGE_PADDING*2))
+
+        return _template.update(prepared.plot_data, prepared.title, color)
+
+    def cs_render_preview(self, prepared: PreparedGraph, color: str,
+                          transparent: bool = False, dpi: int = PREVIEW_DPI) -> bytes:
+        """
+        Part of the CanSave mixin.
+        Renders the [prepared] graph as it'd be exported, at a low resolution, fast enough to follow the export settings as they change.
+        - color, transparent: as in the SaveObject.
+        - -> png bytes.
+        """
+        _buffer = io.BytesIO()
+        self._render_graph(prepared, color).savefig(_buffer, dpi=dpi, format='png', transparent=transparent)
+
+        return _buffer.getvalue()
+
+    def cs_execute_plan(self, plan: ExportPlan, sample: Sample, save_obj: SaveObject, rounding: int = 3,
+                        prepared: dict[GraphType, PreparedGraph]|None = None, ana: Analyzer|None = None) -> list[str]:
         """
         Part of the CanSave mixin.
-        Saves the results graphs and spreadsheets to desk.
+        Writes the [plan] artifacts of the [sample], every file once and atomically; the dirs are created upfront and every graph is rendered once, at full resolution, for both its png and svg.
         - rounding: rounding the values in the output sheet.
+        - prepared: the sample graphs, as [cs_prepare_graphs] made them for a preview, prepared here if not given.
+        - ana: the sample analysis, if the caller has it already, analyzed here if not given.
+        - -> the written files paths, relative to the results dir.
+        """
+        for _dir in plan.dirs:
+            # exist_ok, as parallel exports race to create it.
+            os.makedirs(_dir, exist_ok=True)
+
+        # Data:
+        _sample_data: pd.DataFrame = sample.get_data()
+        _ana: Analyzer = ana if ana is not None else Analyzer(_sample_data)
+        _prepared: dict[GraphType, PreparedGraph] = prepared or self.cs_prepare_graphs(sample.get_name(), _ana)
+        _figures: dict[GraphType, Figure] = {}
+
+        def _get_figure(graph_type: GraphType) -> Figure:
+            if graph_type not in _figures:
+                _figures[graph_type] = self._render_graph(_prepared[graph_type], save_obj.color)
+            return _figures[graph_type]
+
+        for _artifact in plan.artifacts:
+            with _atomic_path(_artifact.path) as _partial_path:
+                match _artifact.kind:
+                    case ArtifactKind.SHEET:
+                        self._write_sheet(_partial_path, _sample_data, _ana, rounding)
+                    case ArtifactKind.GRAPH:
+                        _get_figure(_artifact.graph_type).savefig(_partial_path, dpi=save_obj.dpi, #type: ignore
+                                                                   format='png', transparent=save_obj.transparent)
+                    case ArtifactKind.RAW_GRAPH:
+                        _get_figure(_artifact.graph_type).savefig(_partial_path, dpi=save_obj.dpi, format='svg') #type: ignore
+                    case ArtifactKind.RAW_DATA:
+                        _sample_data.to_csv(_partial_path, index=False)
+
+        return plan.get_rel_paths()
+
+    def _write_sheet(self, path: str, sample_data: pd.DataFrame, ana: Analyzer, rounding: int) -> None:
+        """
+        Writes the interpreted spreadsheet, the data and the stats sheets.
+        """
+        _method = pd.DataFrame({'0': ['Analysis method:'], '1': [ana.get_method().value]})
+        _stats = ana.get_stats().to_frame()
+        _interp = ana.get_interpretation().to_frame()
+
+        with pd.ExcelWriter(path, engine='openpyxl', mode='w') as writer:
+            sample_data.to_excel(writer, index=False, sheet_name='data')
+            _method.to_excel(writer, index=False, header=False, sheet_name='stats')
+            _stats.to_excel(writer, index=False, float_format=f'%.{rounding}f',
+                            merge_cells=False, startrow=_method.shape[0]+1, sheet_name='stats')
+            _interp.to_excel(writer, index=False,
+                            merge_cells=False, startrow=_method.shape[0]+_stats.shape[0]+3,
+                            sheet_name='stats')
+
+    def cs_save_results(self, sample: Sample, save_obj: SaveObject, rounding: int = 3,
+                        prepared: dict[GraphType, PreparedGraph]|None = None, ana: Analyzer|None = None) -> list[str]:
+        """
+        Part of the CanSave mixin.
+        Saves the results graphs and spreadsheets to desk, every file is written atomically, see [cs_plan_results] and [cs_execute_plan].
+        - rounding: rounding the values in the output sheet.
+        - prepared: the sample graphs, if already prepared for a preview.
+        - ana: the sample analysis, if already analyzed.
+        - -> the produced files paths, relative to the results dir.
         - The fallowing are within a SaveObject:
             - prefix: To append to the beginning of the file's name.
             - results_path: To save the file within.
@@ -36,71 +217,33 @@ class CanSave(Defaults, CanPlot):
             - color: The color of graph elements.
             - dpi: The png resolution.
             - save_raw_files: If True a non interpreted spreadsheet would be exported as well.
+            - transparent: Sets the png background to transparent.
             - interval: To inclusively export files between which.
         """
-        # Unpacking the SaveObj:
-        _clr = save_obj.color
-        _prfx = save_obj.prefix
-        _results_dir_path = save_obj.get_results_path()
-        _raw_dir_name = save_obj.raw_results_dir_name #!confg
-        _save_raws = save_obj.save_raw_files
-        _dpi = save_obj.dpi
-        _transparent = save_obj.transparent
-
-        # Paths:
-        _result_sample_name: str = _prfx+sample.get_name().lower()
-        _raw_results_dir_path: str = os.path.join(_results_dir_path, _raw_dir_name) #!rawThing
-       
-        if not os.path.exists(_results_dir_path):
-            os.mkdir(_results_dir_path)
-
-        _file_path: str = os.path.join(_results_dir_path, _result_sample_name)
-        _raw_file_path: str = os.path.join(_raw_results_dir_path, _result_sample_name)
+        _plan: ExportPlan = self.cs_plan_results(sample.get_name(), save_obj, sample.get_data().shape[0])
+        return self.cs_execute_plan(_plan, sample, save_obj, rounding, prepared, ana)
 
-        # Data:
-        _sample_data: pd.DataFrame = sample.get_data()
+    def cs_save_figure(self, figure: Figure, file_name: str, save_obj: SaveObject) -> list[str]:
+        """
+        Part of the CanSave mixin.
+        Saves a [figure] that isn't a sample graph, a dataset diagram, into the results layout the sample graphs go into: a png in the results dir, an svg in the raw results dir; atomically.
+        - file_name: without the extension.
+        - The fallowing are within a SaveObject:
+            - dpi, transparent: the png resolution and background.
+            - save_raw_files: If True the svg is saved as well.
+        - -> the written files paths, relative to the results dir.
+        """
+        _results_dir_path: str = save_obj.get_results_path()
+        _paths: list[str] = [os.path.join(_results_dir_path, f'{file_name}.png')]
+        if save_obj.save_raw_files:
+            _paths.append(os.path.join(_results_dir_path, save_obj.raw_results_dir_name, f'{file_name}.svg'))
 
-        _ana: Analyzer = Analyzer(_sample_data)
-        _method = pd.DataFrame({'0': ['Analysis method:'], '1': [_ana.get_method().value]})
-        _stats = _ana.get_stats().to_frame()
-        _interp = _ana.get_interpretation().to_frame()
+        for _path in _paths:
+            os.makedirs(os.path.dirname(_path), exist_ok=True)
+            with _atomic_path(_path) as _partial_path:
+                if _path.endswith('.png'):
+                    figure.savefig(_partial_path, dpi=save_obj.dpi, format='png', transparent=save_obj.transparent)
+                else:
+                    figure.savefig(_partial_path, dpi=save_obj.dpi, format='svg')
 
-        # Writing Data:
-        with pd.ExcelWriter(f'{_file_path}.xlsx', engine='openpyxl', mode='w') as writer:
-            _sample_data.to_excel(writer, index=False, sheet_name='data')
-            _method.to_excel(writer, index=False, header=False, sheet_name='stats')
-            _stats.to_excel(writer, index=False, float_format=f'%.{rounding}f',
-                            merge_cells=False, startrow=_method.shape[0]+1, sheet_name='stats')
-            _interp.to_excel(writer, index=False,
-                            merge_cells=False, startrow=_method.shape[0]+_stats.shape[0]+3,
-                            sheet_name='stats')
-            
-        for _type in GraphType:
-            _graph_names = {GraphType.HIST: "Histogram", GraphType.CUM: "Cumulative Curve"}
-            _sample_name: str = sample.get_name().lower()
-            _title: str = _graph_names[_type]
-            _graph_file_name: str = f'{_sample_name}_{_title.lower().replace(' ', '_')}'
-            _graph_file_path: str = os.path.join(_results_dir_path, _graph_file_name)
-            
-            _x, _y, _points, _method = _ana.get_plot_data(_type)
-            _wide_sample: bool = (_type == GraphType.HIST) and (len(_x)>WIDE_SMPL_LIMIT)
-            # for samples analyzed with in extensive sieve set.
-            _graph_width: float = len(_x)*WIDTH_PER_X if _wide_sample else 6.8
-            _fig, _ax = plt.subplots(figsize=(_graph_width,4.8), layout='constrained')
-            _fig.get_layout_engine().set(h_pad=EDGE_PADDING, w_pad=EDGE_PADDING*2) #type: ignore
-
-            self.cp_plot(_x, _y, _points, _method, _ax, _type, _clr)
-            _ax.set_title(f'{_title}\n{sample.get_name()}')
-            
-            _fig.savefig(_graph_file_path+'.png', dpi=_dpi, format='png', transparent=_transparent)
-          
-            if _save_raws:
-                if not os.path.exists(_raw_results_dir_path):
-                    os.mkdir(_raw_results_dir_path)
-
-                _sample_data.to_csv(f'{_raw_file_path}.csv', index=False)
-                
-                _raw_graph_file_path: str = os.path.join(_raw_results_dir_path, _graph_file_name)
-                _fig.savefig(_raw_graph_file_path+'.svg', dpi=_dpi, format='svg')
-          
-            plt.close()
\ No newline at end of file
+        return [os.path.relpath(path, _results_dir_path) for path in _paths]
@@ -3,7 +3,8 @@ from typing import Final
 
 import pandas as pd
 
-from typedefs import FileFormat
+from models import iter_columnar_samples
+from typedefs import ColumnarFormat, FileFormat
 from utils import utls
 
 # Constants:
@@ -21,6 +22,8 @@ class Validator():
     - functions:
     - `val_samples`: for now, a format validator.
     - `val_handle_aio`: checks for All-in-one, AIO, file.
+    - `val_is_columnar`: checks for a columnar file.
+    - `val_handle_columnar`: unpacks a columnar file.
     """
     def val_samples(self, samples_dir_path: str, sample_file_name: str) -> bool:
         """
@@ -47,6 +50,9 @@ class Validator():
         - Must be called after [val_samples] on the same [args].
         """
 
+        if self.val_is_columnar(sample_file_name):
+            return self.val_handle_columnar(sample_dir_path, sample_file_name)
+
         _fmt: str = sample_file_name.split('.')[-1]
         _path: str = os.path.join(sample_dir_path, sample_file_name)
         
@@ -103,4 +109,30 @@ class Validator():
                 _path = os.path.join(sample_dir_path, name)
                 data.to_csv(_path, index=False)
         
-        return _nms
\ No newline at end of file
+        return _nms
+
+    def val_is_columnar(self, sample_file_name: str) -> bool:
+        """
+        Part of the Validator mixin.
+        Checks if the file is a columnar one, many samples that have to be unpacked, never a sample on its own.
+        """
+        return sample_file_name.split('.')[-1] in [format_.value for format_ in ColumnarFormat]
+
+    def val_handle_columnar(self, sample_dir_path: str, sample_file_name: str) -> list[str]:
+        """
+        Part of the Validator mixin.
+        Unpacks the samples of a columnar file, as exported by [CanExport.ce_export_columnar], into a csv per sample, read in chunks.
+        - A columnar file without samples data, a stats table, unpacks to nothing.
+        - Must be called after [val_samples] on the same [args].
+        """
+        _fmt = ColumnarFormat(sample_file_name.split('.')[-1])
+        _path: str = os.path.join(sample_dir_path, sample_file_name)
+
+        _nms: list[str] = []
+        for _name, _data in iter_columnar_samples(_path, _fmt):
+            # sample names are only unique within a folder, a project may span many.
+            _nm: str = f'{_name}.csv' if f'{_name}.csv' not in _nms else f'{_name}_{len(_nms)}.csv'
+            _data.to_csv(os.path.join(sample_dir_path, _nm), index=False)
+            _nms.append(_nm)
+
+        return _nms
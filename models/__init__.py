@@ -1,7 +1,44 @@
 """
 Data models for the application.
+- the models are loaded on first use, so importing one, as the library api and the workers do, doesn't pull in the rest, scipy and matplotlib with them.
 """
-from .analyzer import Analyzer
-from .cache import Cache
-from .sample import Sample
-from .signal_data import SignalData
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .analyzer import Analyzer
+    from .cache import Cache, dump_caches_stats, get_caches_stats
+    from .columnar import ColumnarWriter, iter_columnar_samples
+    from .job_queue import JobQueue
+    from .manifest import (ExportManifest, get_export_settings, get_name_clashes,
+                           get_partial_path)
+    from .overlay import CurveOverlay
+    from .results_store import ResultsStore
+    from .sample import Sample
+    from .signal_data import SignalData
+    from .stats_table import StatsTable
+    from .workbook import StreamingWorkbook
+
+_MODELS: dict[str, str] = {'Analyzer': 'analyzer',
+                           'Cache': 'cache',
+                           'dump_caches_stats': 'cache',
+                           'get_caches_stats': 'cache',
+                           'ColumnarWriter': 'columnar',
+                           'iter_columnar_samples': 'columnar',
+                           'JobQueue': 'job_queue',
+                           'ExportManifest': 'manifest',
+                           'get_export_settings': 'manifest',
+                           'get_name_clashes': 'manifest',
+                           'get_partial_path': 'manifest',
+                           'CurveOverlay': 'overlay',
+                           'ResultsStore': 'results_store',
+                           'Sample': 'sample',
+                           'SignalData': 'signal_data',
+                           'StatsTable': 'stats_table',
+                           'StreamingWorkbook': 'workbook'}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MODELS:
+        return getattr(import_module(f'.{_MODELS[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
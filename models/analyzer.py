@@ -14,58 +14,37 @@ class Analyzer():
     The class that wrangles the data, provides the stats it's interpretation, then prepares it for plotting.
     """
     #TODO: implement Sample() like memory
-    def __init__(self, sample_data: pd.DataFrame = pd.DataFrame()) -> None:
+    def __init__(self, sample_data: pd.DataFrame = pd.DataFrame(), method: AnalysisMethod|None = None,
+                 skew_schema: SkewnessSchema = SkewnessSchema.OBSERVATIONAL) -> None:
         """
         The class that wrangles the data, provides the stats it's interpretation, then prepares it for plotting.
+        - method: None picks the graphical method where it's valid, the Method of Moments otherwise; [AnalysisMethod.GRAPHICAL] raises a ValueError where it isn't, [AnalysisMethod.MOMENTS] always uses it; a two points sample is always [AnalysisMethod.TWO_POINTS].
+        - skew_schema: the verbal interpretation of the skewness.
         """
+        self._curve: tuple[np.ndarray, np.ndarray]|None = None
+        self._phi_range: tuple[float, float]|None = None
+
         if sample_data.empty:
-            self.x = pd.Series()
-            self.y = pd.Series()
+            self._curve = (np.array([]), np.array([]))
             self.points: SamplePoints = []
             self.sample_data = sample_data
             self.stats: SampleStats = SampleStats()
             return
         self.sample_data = sample_data # edge case discoverd when testing friedman 1958 
-        self.x, self.y, interp_f = self._get_input(self.sample_data)
-        self.points, self.stats = self._calculate_stats(self.y.min(), interp_f, self.sample_data)
-
-        #TODO: expose to user edit!
-        _default_skewness_schema: SkewnessSchema = SkewnessSchema.OBSERVATIONAL
-        self.interpretation = self._interpret(self.stats, _default_skewness_schema)
+        self._interp_f, self._lerp_y = self._get_input(self.sample_data)
+        self.points, self.stats = self._calculate_stats(self._get_y_min(), self._interp_f, self.sample_data, method)
+        self.interpretation = self._interpret(self.stats, skew_schema)
 
     def _get_input(self,
-                   sample_data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, PchipInterpolator]:
+                   sample_data: pd.DataFrame) -> tuple[PchipInterpolator, np.ndarray]:
         """
         Prepares the data [phi, cum.wt%] for stats calculation via interpolation using Scipy's PchipInterpolator, an implementation of Hermite polynomial interpolation.
-        - -> (interpolated_phi, interpolated_cum.wt%, interpolation_function)
+        - -> (interpolation_function, the cum.wt% to interpolate phi at)
         """
         sample_data = sample_data.dropna().reset_index(drop=True)
         _phi: pd.Series = sample_data['phi']
         _cum_wht: pd.Series = sample_data['cum.wht%']
         
-        def _inverse(
-                interpolation_fn: PchipInterpolator,
-                wt_prcnts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
-            """
-            Interpolation function inversion, get phi(x) at wt_prcnts(y).
-            - -> tuple[phis, wt_prcnts]
-            """
-            _rounding_digits: int = 4
-            _phis_inverted: list[float] = []
-            _valid_wt_prcnts: list[float] = []
-
-            for _wt_prcnt in wt_prcnts:
-                # extrapolate: wither the interpolation should extrapolate.
-                _phi = interpolation_fn.solve(_wt_prcnt, extrapolate=False)
-                if _phi.size != 0:
-                    _phis_inverted.append(_phi[0])
-                    _valid_wt_prcnts.append(_wt_prcnt)
-                
-            _x: np.ndarray = np.round(_phis_inverted, _rounding_digits)
-            _y: np.ndarray = np.round(_valid_wt_prcnts, _rounding_digits)
-
-            return (_x, _y)
-        
         _interp_f = PchipInterpolator(_phi, _cum_wht)
         _cap: float = _cum_wht.max()
         _min: float = _cum_wht.min()
@@ -73,17 +52,55 @@ class Analyzer():
 
         _lerp_y = np.linspace(_min, _cap, _step)
 
-        _x, _y = _inverse(_interp_f, _lerp_y)
+        return (_interp_f, _lerp_y)
+
+    def _inverse(self,
+            interpolation_fn: PchipInterpolator,
+            wt_prcnts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolation function inversion, get phi(x) at wt_prcnts(y).
+        - -> tuple[phis, wt_prcnts]
+        """
+        _rounding_digits: int = 4
+        _phis_inverted: list[float] = []
+        _valid_wt_prcnts: list[float] = []
+
+        for _wt_prcnt in wt_prcnts:
+            # extrapolate: wither the interpolation should extrapolate.
+            _phi = interpolation_fn.solve(_wt_prcnt, extrapolate=False)
+            if _phi.size != 0:
+                _phis_inverted.append(_phi[0])
+                _valid_wt_prcnts.append(_wt_prcnt)
+            
+        _x: np.ndarray = np.round(_phis_inverted, _rounding_digits)
+        _y: np.ndarray = np.round(_valid_wt_prcnts, _rounding_digits)
+
+        return (_x, _y)
 
-        return (_x, _y, _interp_f)
+    def _get_curve(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The interpolated cumulative curve, inverted on first use; it's the bulk of the analysis time and only the plotting needs it.
+        - -> (interpolated_phi, interpolated_cum.wt%)
+        """
+        if self._curve is None:
+            self._curve = self._inverse(self._interp_f, self._lerp_y)
+        return self._curve
+
+    def _get_y_min(self) -> float:
+        """
+        The lowest interpolated cum.wt%, the first one if it inverts, as the curve is increasing, otherwise the curve is needed.
+        """
+        _, _y = self._inverse(self._interp_f, self._lerp_y[:1])
+        return _y.min() if _y.size else self._get_curve()[1].min()
 
     def _calculate_stats(self,
             y_min: float, interp_f: PchipInterpolator
-            , sample_data: pd.DataFrame) -> tuple[SamplePoints, SampleStats]:
+            , sample_data: pd.DataFrame, method: AnalysisMethod|None = None) -> tuple[SamplePoints, SampleStats]:
         """
         Calculates stats: [mean, std, skewness, kurtosis], based on ,if possible, (Folk&Ward, 1957) graphical formulas, otherwise, the Method of Moments is used.
         - y_min: [cum.wht%].min().
         - interp_f: the interpolation function.
+        - method: forces the method, see [__init__].
         """
         _points: SamplePoints = []
         _stats: SampleStats = SampleStats()
@@ -99,8 +116,10 @@ class Analyzer():
             
             _points = [_create_point(wt_prcnt) for wt_prcnt in _wt_prcnts if wt_prcnt > y_min]
             _graphical_is_valid: bool = len(_points) == len(_wt_prcnts)
+            if method is AnalysisMethod.GRAPHICAL and not _graphical_is_valid:
+                raise ValueError(f'the graphical method needs the {_wt_prcnts[0]:g}-{_wt_prcnts[-1]:g} cum.wt% within the curve')
 
-            if _graphical_is_valid:
+            if _graphical_is_valid and method is not AnalysisMethod.MOMENTS:
                 self.method = AnalysisMethod.GRAPHICAL
 
                 _phi_prcnt: dict[str, float] = {f'{int(k)}': v for (k), v in _points}
@@ -257,7 +276,33 @@ class Analyzer():
                 _x: PlotInput = self.sample_data['phi']
                 _y: PlotInput = self.sample_data['wht%']
             case GraphType.CUM:
-                _x: PlotInput = self.x
-                _y: PlotInput = self.y
+                _x, _y = self._get_curve()
 
-        return (_x, _y, self.points, self.method)
\ No newline at end of file
+        return (_x, _y, self.points, self.method)
+
+    def get_phi_range(self) -> tuple[float, float]:
+        """
+        Returns the sample's phi range, where the cumulative curve is defined, found on first use.
+        - -> (min, max), NaNs for an empty sample.
+        """
+        if self.sample_data.empty:
+            return (np.nan, np.nan)
+        if self._phi_range is None:
+            _phi: pd.Series = self.sample_data.dropna()['phi']
+            self._phi_range = (float(_phi.min()), float(_phi.max()))
+        return self._phi_range
+
+    def get_curve_at(self, phi: np.ndarray, fill: bool = False) -> np.ndarray:
+        """
+        Returns the cumulative curve, cum.wt%, at the given [phi], evaluated directly, no inversion; for laying many samples on a shared phi grid.
+        - fill: 0 before the sample's phi range and 100 past it, the first sieve taken as the coarsest and the last as the pan, otherwise NaN outside it.
+        - -> NaN for an empty sample.
+        """
+        if self.sample_data.empty:
+            return np.full(np.shape(phi), np.nan)
+        _curve: np.ndarray = self._interp_f(phi, extrapolate=False)
+        if fill:
+            _min, _max = self.get_phi_range()
+            _curve = np.clip(np.where(phi < _min, 0.0, np.where(phi > _max, 100.0, _curve)), 0, 100)
+
+        return _curve
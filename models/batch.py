@@ -0,0 +1,209 @@
+"""
+Analyzing samples in bulk, without any plotting, safe to run in worker processes.
+"""
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import signal
+import sys
+from collections.abc import Sequence
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+
+from typedefs import AnalysisMethod, SkewnessSchema, TableFormat
+
+from .analyzer import Analyzer
+from .sample import Sample
+from .texture import (TEXTURE_COLUMNS, classify_folk, classify_shepard,
+                      get_fractions)
+
+# Constants:
+# pool
+CHUNKS_PER_WORKER: Final[int] = 4
+HEADLESS_BACKEND: Final[str] = 'Agg'
+
+# summary
+SUMMARY_COLUMNS: Final[tuple[str,...]] = ('sample', 'method',
+                                          'mean', 'std', 'skewness', 'kurtosis',
+                                          'sorting', 'skewness_interpretation', 'kurtosis_interpretation',
+                                          *TEXTURE_COLUMNS, 'folk_class', 'shepard_class')
+
+# results store, float64 noise aside.
+STORED_ROUNDING: Final[int] = 9
+
+type SummaryRow = dict[str, Any]
+type AnalyzedSample = tuple[str, pd.DataFrame, SummaryRow|None, str]
+type SummarizedSample = tuple[str, SummaryRow|None, str]
+type ResampledSample = tuple[str, np.ndarray|None, str]
+type SampleSource = str|tuple[str, pd.DataFrame] # a path, or (name, data) in memory.
+type AnalyzedSource = tuple[str, pd.DataFrame, SummaryRow|None, str, str] # (name, data, row, content hash, error massage)
+type RecordedSample = AnalyzedSource
+
+
+def get_mp_context() -> mp.context.BaseContext:
+    """
+    The worker processes start method; forking a process that runs a Tk main loop isn't safe, so the gui spawns, headless code forks where it can, skipping the re-imports.
+    """
+    if 'tkinter' not in sys.modules and 'fork' in mp.get_all_start_methods():
+        return mp.get_context('fork')
+    return mp.get_context('spawn')
+
+
+def init_worker() -> None:
+    """
+    Runs once in every worker process, workers have no display, hence the headless backend.
+    - forked workers inherit the parent's signal handlers, the pool terminates them with SIGTERM, and ctrl+c is the parent's to handle.
+    """
+    import matplotlib
+    matplotlib.use(HEADLESS_BACKEND)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def get_pool_params(workers: int, chunk_size: int, n_jobs: int) -> tuple[int, int]:
+    """
+    Resolves the pool size and the chunk size for [n_jobs], 0 means pick automatically; never more workers than jobs.
+    - -> (workers, chunk_size)
+    """
+    _workers: int = max(1, min(workers if workers > 0 else (os.cpu_count() or 1), n_jobs))
+    _chunk_size: int = chunk_size if chunk_size > 0 else max(1, n_jobs//(_workers*CHUNKS_PER_WORKER))
+
+    return (_workers, _chunk_size)
+
+
+def get_pool(workers: int) -> mp.pool.Pool:
+    """
+    A pool of [workers] processes, started as [get_mp_context] says, every one set up by [init_worker].
+    """
+    return get_mp_context().Pool(workers, initializer=init_worker)
+
+
+def get_sample_data(sample: Sample) -> pd.DataFrame:
+    """
+    The [sample]'s data, raises a ValueError if it has none, so every mode reports an empty sample the same, before analyzing it.
+    """
+    _data: pd.DataFrame = sample.get_data()
+    if _data.empty:
+        raise ValueError('the sample has no data')
+    return _data
+
+
+def summarize(name: str, analyzer: Analyzer, rounding: int = 3) -> SummaryRow:
+    """
+    One row of a project summary, the analysis method, the stats and their interpretation, the texture and its classes.
+    - name: the sample name.
+    - rounding: rounding the stats, as in the per sample spreadsheets.
+    """
+    _stats = analyzer.get_stats()
+    _interp = analyzer.get_interpretation()
+    _fractions = get_fractions([analyzer])
+
+    return {'sample': name,
+            'method': analyzer.get_method().value,
+            'mean': round(float(_stats.mean), rounding),
+            'std': round(float(_stats.std), rounding),
+            'skewness': round(float(_stats.skewness), rounding),
+            'kurtosis': round(float(_stats.kurtosis), rounding),
+            'sorting': _interp.sorting,
+            'skewness_interpretation': _interp.skewness,
+            'kurtosis_interpretation': _interp.kurtosis,
+            **{col: round(float(frac), rounding) for col, frac in zip(TEXTURE_COLUMNS, _fractions[0])},
+            'folk_class': classify_folk(_fractions)[0],
+            'shepard_class': classify_shepard(_fractions)[0]}
+
+
+def analyze_source(source: SampleSource, method: AnalysisMethod|None = None, schema: SkewnessSchema = SkewnessSchema.OBSERVATIONAL,
+                   rounding: int = 3) -> AnalyzedSource:
+    """
+    Creates and analyzes a sample file or data in memory, with the given method and skewness schema, see [Analyzer]; every bulk analysis slices what it needs off it. Errors are returned, not raised, to not bring a pool down.
+    - source: the sample path or (name, data).
+    - rounding: rounding the stats, see [summarize].
+    - -> (sample name, sample data, summary row, content hash, error massage), the row is None if the sample failed.
+    """
+    _name: str = os.path.split(source)[-1] if isinstance(source, str) else source[0]
+
+    try:
+        _sample = Sample(source) if isinstance(source, str) else Sample.from_frame(source[1], source[0])
+        _name = _sample.get_name().lower()
+        _data: pd.DataFrame = get_sample_data(_sample)
+        _row: SummaryRow = summarize(_name, Analyzer(_data, method, schema), rounding)
+        _hash: str = _sample.get_hash()
+    except Exception as e:
+        return (_name, pd.DataFrame(), None, '', f'{type(e).__name__}: {e}')
+
+    return (_name, _data, _row, _hash, '')
+
+
+def analyze_path(path: str) -> AnalyzedSample:
+    """
+    [analyze_source] of the sample file at [path], as the exports analyze it.
+    - -> (sample name, sample data, summary row, error massage), the row is None if the sample failed.
+    """
+    _name, _data, _row, _, _error = analyze_source(path)
+    return (_name, _data, _row, _error)
+
+
+def summarize_path(path: str) -> SummarizedSample:
+    """
+    As [analyze_path], without sending the sample data back, all a stats only export needs.
+    - -> (sample name, summary row, error massage), the row is None if the sample failed.
+    """
+    _name, _, _row, _, _error = analyze_source(path)
+    return (_name, _row, _error)
+
+
+def summarize_source(job: tuple[SampleSource, AnalysisMethod|None, SkewnessSchema]) -> SummarizedSample:
+    """
+    As [summarize_path], for a sample file or data in memory, analyzed with the given method and skewness schema.
+    - job: (sample path or (name, data), analysis method, skewness schema).
+    - -> (sample name, summary row, error massage), the row is None if the sample failed.
+    """
+    _name, _, _row, _, _error = analyze_source(*job)
+    return (_name, _row, _error)
+
+
+def record_source(job: tuple[SampleSource, AnalysisMethod|None, SkewnessSchema]) -> RecordedSample:
+    """
+    As [summarize_source], with what a results store keeps on top of the summary, the sample data and its content hash, see [models.results_store]; the stats aren't rounded past [STORED_ROUNDING], queries see them as computed.
+    - -> (sample name, sample data, summary row, content hash, error massage), the row is None if the sample failed.
+    """
+    return analyze_source(*job, STORED_ROUNDING)
+
+
+def resample_path(job: tuple[str, tuple[float, float], int]) -> ResampledSample:
+    """
+    Creates the sample at the given path and evaluates its cumulative curve on a phi grid, filled past its range, see [Analyzer.get_curve_at]; the grid is sent as its range, the curve is all that's sent back.
+    - job: (sample path, grid phi range, grid points), as [np.linspace] takes them.
+    - -> (sample name, curve, error massage), the curve is None if the sample failed or is empty.
+    """
+    _path, _phi_range, _n_points = job
+    _name: str = os.path.split(_path)[-1]
+
+    try:
+        _sample = Sample(_path)
+        _name = _sample.get_name().lower()
+        _ana = Analyzer(get_sample_data(_sample))
+        _curve: np.ndarray = _ana.get_curve_at(np.linspace(*_phi_range, _n_points), fill=True)
+    except Exception as e:
+        return (_name, None, f'{type(e).__name__}: {e}')
+
+    return (_name, _curve, '')
+
+
+def write_table(rows: list[SummaryRow]|pd.DataFrame, path: str, table_format: TableFormat,
+                columns: Sequence[str] = SUMMARY_COLUMNS) -> None:
+    """
+    Writes the summary [rows], or a frame of them, to [path] as [table_format], parquet needs pyarrow, pandas raises an ImportError without it.
+    - columns: the table's columns, any other table than the summary names its own.
+    """
+    _table = pd.DataFrame(rows, columns=list(columns))
+
+    match table_format:
+        case TableFormat.CSV:
+            _table.to_csv(path, index=False)
+        case TableFormat.EXCEL:
+            _table.to_excel(path, index=False, sheet_name='summary', engine='openpyxl')
+        case TableFormat.PARQUET:
+            _table.to_parquet(path, index=False)
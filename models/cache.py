@@ -1,10 +1,96 @@
-from tkinter import Widget
+import hashlib
+import json
+import os
+import sys
+import weakref
 from typing import Any, Sequence, TypeVar
 
-from typedefs import SaveObject
+import numpy as np
+import pandas as pd
+
+from typedefs import CacheStats, SaveObject, SourceFingerprint
 
 Element = TypeVar('Element')
 
+# Constants:
+# hashing
+HASH_CHUNK_SIZE: int = 1 << 20
+HASH_DIGEST_SIZE: int = 16
+
+# size estimation
+RGBA_BYTES: int = 4
+SIZE_ESTIMATION_DEPTH: int = 2
+
+# every live Cache instance, for the stats.
+_caches: weakref.WeakSet['Cache'] = weakref.WeakSet()
+
+
+def fingerprint(path: str, content_hash: bool = False) -> SourceFingerprint:
+    """
+    Creates the fingerprint of the source file at [path].
+    - content_hash: if True, a fast blake2b hash of the file content is added, otherwise it's left empty.
+    - -> (mtime_ns, size, content hash)
+    """
+    _stat: os.stat_result = os.stat(path)
+    _digest: str = ''
+
+    if content_hash:
+        _hash = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        with open(path, 'rb') as f:
+            for _chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                _hash.update(_chunk)
+        _digest = _hash.hexdigest()
+
+    return (_stat.st_mtime_ns, _stat.st_size, _digest)
+
+
+def estimate_size(element: Any, depth: int = SIZE_ESTIMATION_DEPTH) -> int:
+    """
+    A rough estimation of the memory held by [element] in bytes.
+    - frames and arrays report their buffers, widgets their RGBA pixel buffer, other objects are summed up to [depth] attributes deep.
+    """
+    if isinstance(element, pd.DataFrame):
+        return int(element.memory_usage(deep=True).sum())
+    if isinstance(element, pd.Series):
+        return int(element.memory_usage(deep=True))
+    if isinstance(element, np.ndarray):
+        return int(element.nbytes)
+    if isinstance(element, (bytes, bytearray, str)):
+        return sys.getsizeof(element)
+    # tk widgets, duck typed to keep tkinter out of the models.
+    if hasattr(element, 'winfo_reqwidth'):
+        return element.winfo_reqwidth()*element.winfo_reqheight()*RGBA_BYTES
+
+    _size: int = sys.getsizeof(element)
+    if depth <= 0:
+        return _size
+    if isinstance(element, (list, tuple, set)):
+        _size += sum(estimate_size(i, depth-1) for i in element)
+    elif isinstance(element, dict):
+        _size += sum(estimate_size(i, depth-1) for i in element.values())
+    elif hasattr(element, '__dict__'):
+        _size += sum(estimate_size(i, depth-1) for i in vars(element).values())
+
+    return _size
+
+
+def get_caches_stats() -> list[CacheStats]:
+    """
+    Returns the stats of every live Cache instance.
+    """
+    return [cache.stats() for cache in _caches]
+
+
+def dump_caches_stats(path: str) -> None:
+    """
+    Writes a JSON snapshot of every live Cache instance stats into [path].
+    """
+    _snapshot: list[dict] = [stats.to_dict() for stats in get_caches_stats()]
+
+    with open(path, 'w') as f:
+        json.dump(_snapshot, f, indent=4)
+
+
 class Cache():
     """
     Caching functionality.
@@ -14,16 +100,36 @@ class Cache():
     - `add`: add an item to the cache.
     - `remove`: an item from the cache.
     - `get`: an item from the cache.
+    - `invalidate`: an item and everything depending on it.
+    - `stats`: hits, misses, evictions, entries and estimated bytes.
     """
-    def __init__(self, size: int = 1000) -> None:
+    def __init__(self, size: int = 1000, hash_content: bool = False, name: str = '') -> None:
         """
         Caching functionality.
         - functions:
         - data: data to cache.
         - limit: the caches size.
+        - hash_content: fingerprint the sources by content as well, a touched but unchanged source keeps its entry.
+        - name: used to tell the caches apart in the stats.
         """
         self.data: dict = {}
         self.limit = size
+        self.hash_content = hash_content
+        self.name = name
+        # {id: (source path, fingerprint)}
+        self.sources: dict[str, tuple[str, SourceFingerprint]] = {}
+        # the dependency graph, kept by both ends, weakly, a dropped cache takes its entries with it:
+        # {id: {(cache holding the dependent, dependent id)}}, and {id: [(cache holding the parent, parent id)]}.
+        self.dependents: dict[str, set[tuple[weakref.ref['Cache'], str]]] = {}
+        self.parents: dict[str, list[tuple[weakref.ref['Cache'], str]]] = {}
+
+        # Metrics:
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.sizes: dict[str, int] = {}
+
+        _caches.add(self)
 
     def __repr__(self) -> str:
         return f'Data ID\'s: {self.data.keys()}\nSize: {self.size()}'
@@ -33,9 +139,16 @@ class Cache():
         Checks if item with the [id] is cached then does a length/size comparison with [against] if provided, otherwise, it assumes that it's not needed.
         - against: a python sequence, e.g., list, tuple, etc, to compare against.
         """
-        _valid_id: bool = id_ in self.data
+        _valid_id: bool = id_ in self.data and self._is_fresh(id_)
         _valid_data: bool = len(self.data[id_]) == len(against) if _valid_id and against else True
-        return _valid_id and _valid_data
+        _hit: bool = _valid_id and _valid_data
+
+        if _hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return _hit
     
     def size(self) -> int:
         """
@@ -43,34 +156,95 @@ class Cache():
         """
         return len(self.data)
 
-    def add(self, id_: str, widget) -> None:
+    def _is_fresh(self, id_: str) -> bool:
+        """
+        Compares the stored source fingerprint of [id_], if any, against the source file on disk; stale entries are invalidated.
+        """
+        if id_ not in self.sources:
+            return True
+
+        _path, (_mtime_ns, _size, _digest) = self.sources[id_]
+        try:
+            _stat: os.stat_result = os.stat(_path)
+        except OSError:
+            self.invalidate(id_)
+            return False
+
+        if (_stat.st_mtime_ns, _stat.st_size) == (_mtime_ns, _size):
+            return True
+
+        # touched, maybe by opening and saving without edits, only the content can tell.
+        if _digest and _stat.st_size == _size:
+            _new_print: SourceFingerprint = fingerprint(_path, content_hash=True)
+            if _new_print[2] == _digest:
+                self.sources[id_] = (_path, _new_print)
+                return True
+
+        self.invalidate(id_)
+        return False
+
+    def add(self, id_: str, widget, source: str = '', depends_on: Sequence[tuple['Cache', str]] = ()) -> None:
         """
         Adds element using the given [id_] to the cache.
+        - source: path of the file the element is derived from, the element goes stale when the file changes.
+        - depends_on: (cache, id) pairs, entries of any cache, this one included, that when invalidated invalidate this element as well.
         """
         if id_ not in self.data:
 
             self.data[id_] = widget.copy() if isinstance(widget, SaveObject) else widget
+            self.sizes[id_] = estimate_size(self.data[id_])
+
+            if source:
+                self.sources[id_] = (source, fingerprint(source, self.hash_content))
+            for parent, parent_id in depends_on:
+                parent.dependents.setdefault(parent_id, set()).add((weakref.ref(self), id_))
+                self.parents.setdefault(id_, []).append((weakref.ref(parent), parent_id))
         
-        # Limit size:
+        # Limit size, the oldest entries go first, with their dependents, nothing is left to tell them stale once they're gone:
         if self.size() > self.limit:
-            _keys = [i for i in self.data.keys()][-self.limit:]
-            self.data = self.data.fromkeys(_keys)
+            _evicted = [i for i in self.data.keys()][:-self.limit]
+            for _id in _evicted:
+                self.invalidate(_id)
+            self.evictions += len(_evicted)
     
     def remove(self, id_: str) -> None:
         """
         Removes item at [id_] from the cache.
         """
         if id_ in self.data:
-            _ = self.data.pop(id_)  
+            _ = self.data.pop(id_)
+        self.sources.pop(id_, None)
+        self.sizes.pop(id_, None)
+
+        # the edges go with the dependent, evicted or invalidated, the graph is never larger than the caches.
+        for parent_ref, parent_id in self.parents.pop(id_, []):
+            _parent: Cache|None = parent_ref()
+            _edges = _parent.dependents.get(parent_id) if _parent is not None else None
+            if _edges is not None:
+                _edges.discard((weakref.ref(self), id_))
+                if not _edges:
+                    del _parent.dependents[parent_id]
+
+    def invalidate(self, id_: str) -> None:
+        """
+        Removes item at [id_] from the cache, then, following the dependency graph, every item depending on it, in any cache.
+        """
+        _dependents: set[tuple[weakref.ref[Cache], str]] = self.dependents.pop(id_, set())
+        self.remove(id_)
+
+        for cache_ref, dependent_id in _dependents:
+            _cache: Cache|None = cache_ref()
+            if _cache is not None:
+                _cache.invalidate(dependent_id)
 
     def get(self, id_: str) -> Any:        
         """
         Gets the element at the given [id_] from the cache.
-        - make sure the item is cached first!.
+        - make sure the item is cached first!, only [check] looks at the source, the item is served as checked.
         - if the item isn't in the cache, return -> [].
         """
         _output = []
-        if self.check(id_):
+        if id_ in self.data:
             _output = self.data[id_]
             _output = _output.copy() if isinstance(_output, SaveObject) else _output
         else:
@@ -78,5 +252,21 @@ class Cache():
             quit()
         return _output
     
+    def stats(self) -> CacheStats:
+        """
+        Returns the cache metrics.
+        """
+        _lookups: int = self.hits + self.misses
+
+        return CacheStats(
+            name = self.name,
+            limit = self.limit,
+            entries = self.size(),
+            hits = self.hits,
+            misses = self.misses,
+            hit_rate = self.hits/_lookups if _lookups else 0.0,
+            evictions = self.evictions,
+            est_bytes = sum(self.sizes.values()))
+
     def see_all(self) -> None:
         return print(self.data)
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""
+Columnar, binary, files holding many samples in long format, written and read in chunks, for downstream pipelines and fast re-imports.
+"""
+import os
+from collections.abc import Iterator
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+
+from typedefs import ColumnarFormat
+
+from .batch import SummaryRow
+from .manifest import get_partial_path
+
+# Constants:
+# chunks
+CHUNK_ROWS: Final[int] = 65_536
+
+# tables
+DATA_KEY: Final[str] = 'data'
+STATS_KEY: Final[str] = 'stats'
+ID_COLUMN: Final[str] = 'sample_id'
+NAME_COLUMN: Final[str] = 'sample'
+DATA_DTYPES: Final[dict[str, str]] = {ID_COLUMN: 'int32', NAME_COLUMN: 'object',
+                                      'phi': 'float64', 'wht': 'float64', 'wht%': 'float64', 'cum.wht%': 'float64'}
+IMPORT_COLUMNS: Final[list[str]] = [ID_COLUMN, NAME_COLUMN, 'phi', 'wht']
+
+# hdf5, strings are fixed width there.
+HDF_STR_ITEMSIZE: Final[int] = 128
+
+
+def _to_data_chunk(parts: list[tuple[int, str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    The data of many samples, (sample id, sample name, data), in long format, the id and name repeated on every row; built once per chunk, with fixed dtypes, as every chunk has to match the first.
+    """
+    _lengths: list[int] = [data.shape[0] for _, _, data in parts]
+    _columns: dict[str, Any] = {ID_COLUMN: np.repeat([sample_id for sample_id, _, _ in parts], _lengths),
+                                NAME_COLUMN: np.repeat([name for _, name, _ in parts], _lengths).astype(object)}
+    for _col in list(DATA_DTYPES)[2:]:
+        _columns[_col] = np.concatenate([data[_col].to_numpy(np.float64) if _col in data
+                                         else np.full(data.shape[0], np.nan) for _, _, data in parts])
+
+    return pd.DataFrame(_columns).astype(DATA_DTYPES)
+
+
+def _to_stats_chunk(rows: list[tuple[int, SummaryRow]]) -> pd.DataFrame:
+    """
+    The summary [rows], (sample id, row), as a frame.
+    """
+    return pd.DataFrame([{ID_COLUMN: sample_id, **row} for sample_id, row in rows]).astype({ID_COLUMN: 'int32'})
+
+
+def get_columnar_paths(base_path: str, columnar_format: ColumnarFormat) -> dict[str, str]:
+    """
+    The files a [ColumnarWriter] produces, per table key.
+    - hdf5 holds all the tables in one file: [base_path].h5
+    - parquet and feather hold a table per file: [base_path]_[key].[format]
+    """
+    _ext: str = columnar_format.value
+    if columnar_format == ColumnarFormat.HDF5:
+        return {key: f'{base_path}.{_ext}' for key in (DATA_KEY, STATS_KEY)}
+    return {key: f'{base_path}_{key}.{_ext}' for key in (DATA_KEY, STATS_KEY)}
+
+
+class ColumnarWriter():
+    """
+    Writes the [data] and [stats] tables of many samples, in chunks of [chunk_rows], into partial files, renamed into place on [commit].
+    - functions:
+    - `append`: buffers a sample, writes a chunk once enough rows are buffered.
+    - `commit`: writes what's left and renames the files into place.
+    - `close`: drops the partial files, if not committed.
+    """
+    def __init__(self, base_path: str, columnar_format: ColumnarFormat, chunk_rows: int = CHUNK_ROWS) -> None:
+        """
+        Writes the [data] and [stats] tables of many samples, in chunks of [chunk_rows], into partial files, renamed into place on [commit].
+        - base_path: the files path, without the extension, see [get_columnar_paths].
+        - columnar_format: parquet and feather need pyarrow, hdf5 needs pytables.
+        """
+        self.format = columnar_format
+        self.paths: dict[str, str] = get_columnar_paths(base_path, columnar_format)
+        self._chunk_rows = chunk_rows
+
+        self._data_parts: list[tuple[int, str, pd.DataFrame]] = []
+        self._stats_rows: list[tuple[int, SummaryRow]] = []
+        self._buffered: int = 0
+        self._writers: dict[str, Any] = {}
+        self._schemas: dict[str, Any] = {}
+        self._store: pd.HDFStore|None = None
+
+        for _path in set(self.paths.values()):
+            if os.path.exists(get_partial_path(_path)):
+                os.remove(get_partial_path(_path))
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.paths=}, {self._chunk_rows=})'
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def append(self, sample_id: int, name: str, data: pd.DataFrame, row: SummaryRow) -> None:
+        """
+        Buffers a sample, its [data] into the [DATA_KEY] table and its summary [row] into the [STATS_KEY] one.
+        - sample_id: unique within the export, names may not be.
+        """
+        self._data_parts.append((sample_id, name, data))
+        self._stats_rows.append((sample_id, row))
+        self._buffered += data.shape[0]
+
+        if self._buffered >= self._chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Writes the buffered samples as one chunk per table.
+        """
+        if not self._data_parts:
+            return
+        _data_chunk: pd.DataFrame = _to_data_chunk(self._data_parts)
+        _stats_chunk: pd.DataFrame = _to_stats_chunk(self._stats_rows)
+        self._data_parts, self._stats_rows, self._buffered = [], [], 0
+
+        self._write(DATA_KEY, _data_chunk)
+        self._write(STATS_KEY, _stats_chunk)
+
+    def _write(self, key: str, chunk: pd.DataFrame) -> None:
+        """
+        Writes the [chunk] into the [key] table, a parquet row group, a feather record batch or an hdf5 table append.
+        """
+        _partial_path: str = get_partial_path(self.paths[key])
+
+        match self.format:
+            case ColumnarFormat.PARQUET | ColumnarFormat.FEATHER:
+                import pyarrow as pa
+
+                if key not in self._writers:
+                    self._schemas[key] = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    if self.format == ColumnarFormat.PARQUET:
+                        import pyarrow.parquet as pq
+                        self._writers[key] = pq.ParquetWriter(_partial_path, self._schemas[key])
+                    else:
+                        self._writers[key] = pa.ipc.new_file(_partial_path, self._schemas[key])
+
+                _table = pa.Table.from_pandas(chunk, schema=self._schemas[key], preserve_index=False)
+                self._writers[key].write_table(_table)
+            case ColumnarFormat.HDF5:
+                if self._store is None:
+                    self._store = pd.HDFStore(_partial_path, mode='w')
+                _str_columns: list[str] = [col for col in chunk.columns if chunk[col].dtype == object]
+                self._store.append(key, chunk, format='table', index=False, data_columns=[ID_COLUMN],
+                                   min_itemsize={col: HDF_STR_ITEMSIZE for col in _str_columns})
+
+    def _close_writers(self) -> None:
+        """
+        Closes the open writers, the files are complete after this.
+        """
+        for _writer in self._writers.values():
+            _writer.close()
+        self._writers = {}
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def commit(self) -> list[str]:
+        """
+        Writes what's still buffered, then renames the partial files into place.
+        - -> the written files paths.
+        """
+        self._flush()
+        self._close_writers()
+
+        _written: list[str] = []
+        for _path in sorted(set(self.paths.values())):
+            if os.path.exists(get_partial_path(_path)):
+                os.replace(get_partial_path(_path), _path)
+                _written.append(_path)
+
+        return _written
+
+    def close(self) -> None:
+        """
+        Closes the writers and removes any partial file left, an uncommitted export leaves the previous files, if any, as is.
+        """
+        self._close_writers()
+        for _path in set(self.paths.values()):
+            if os.path.exists(get_partial_path(_path)):
+                os.remove(get_partial_path(_path))
+
+
+def _has_samples(path: str, columnar_format: ColumnarFormat) -> bool:
+    """
+    Checks the file holds samples data, not a stats table, from its schema only.
+    """
+    match columnar_format:
+        case ColumnarFormat.PARQUET:
+            import pyarrow.parquet as pq
+            _columns: list[str] = pq.read_schema(path).names
+        case ColumnarFormat.FEATHER:
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                _columns = pa.ipc.open_file(source).schema.names
+        case ColumnarFormat.HDF5:
+            with pd.HDFStore(path, mode='r') as store:
+                if f'/{DATA_KEY}' not in store.keys():
+                    return False
+                _columns = list(store.select(DATA_KEY, stop=0).columns)
+
+    return set(IMPORT_COLUMNS) <= set(_columns)
+
+
+def _iter_chunks(path: str, columnar_format: ColumnarFormat, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads the samples data in chunks, only the columns a Sample is created from.
+    """
+    match columnar_format:
+        case ColumnarFormat.PARQUET:
+            import pyarrow.parquet as pq
+            for _batch in pq.ParquetFile(path).iter_batches(chunk_rows, columns=IMPORT_COLUMNS):
+                yield _batch.to_pandas()
+        case ColumnarFormat.FEATHER:
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                _reader = pa.ipc.open_file(source)
+                for _ind in range(_reader.num_record_batches):
+                    yield _reader.get_batch(_ind).select(IMPORT_COLUMNS).to_pandas()
+        case ColumnarFormat.HDF5:
+            with pd.HDFStore(path, mode='r') as store:
+                yield from store.select(DATA_KEY, columns=IMPORT_COLUMNS, chunksize=chunk_rows)
+
+
+def iter_columnar_samples(path: str, columnar_format: ColumnarFormat,
+                          chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    Yields the samples in a columnar file, one at a time, in chunks; a file without samples data, a stats table for example, yields nothing.
+    - -> (sample name, [phi, wht] data)
+    """
+    if not _has_samples(path, columnar_format):
+        return
+
+    _carry: pd.DataFrame = pd.DataFrame()
+    for _chunk in _iter_chunks(path, columnar_format, chunk_rows):
+        if _chunk.empty:
+            continue
+        if not _carry.empty:
+            _chunk = pd.concat([_carry, _chunk], ignore_index=True)
+
+        # samples are contiguous, the last one may go on in the next chunk.
+        _ids: np.ndarray = _chunk[ID_COLUMN].to_numpy()
+        _is_last: np.ndarray = _ids == _ids[-1]
+        _carry = _chunk[_is_last]
+
+        for _, _data in _chunk[~_is_last].groupby(ID_COLUMN, sort=False):
+            yield (str(_data[NAME_COLUMN].iloc[0]), _data[['phi', 'wht']].reset_index(drop=True))
+
+    if not _carry.empty:
+        yield (str(_carry[NAME_COLUMN].iloc[0]), _carry[['phi', 'wht']].reset_index(drop=True))
@@ -0,0 +1,202 @@
+"""
+The percentile envelopes of the cumulative curves of groups of samples, on one fixed phi grid, kept as streaming quantile sketches, so a group's size doesn't bound the memory.
+"""
+import os
+import re
+import warnings
+from collections.abc import Mapping, Sequence
+from typing import Final
+
+import numpy as np
+import pandas as pd
+
+from typedefs import GroupBy
+
+from .overlay import ENVELOPE_PERCENTILES
+
+# Constants:
+# grid, wide enough for gravel to clay, the curves are 0 before a sample's range and 100 past it.
+ENVELOPE_PHI_RANGE: Final[tuple[float, float]] = (-6.0, 14.0)
+ENVELOPE_POINTS: Final[int] = 401
+
+# sketch, cum.wt% is within [0, 100], fixed bins are exact to a bin width and merge by adding.
+SKETCH_BINS: Final[int] = 500
+SKETCH_BATCH: Final[int] = 256 # curves buffered per group before a sketch update.
+
+# groups
+UNGROUPED: Final[str] = 'ungrouped'
+# the sample name without its trailing number, and the separators before it.
+PREFIX_PATTERN: Final[re.Pattern] = re.compile(r'[\s_.-]*\d+$')
+
+
+def get_group(path: str, group_by: GroupBy, root: str = '', groups: Mapping[str, str]|None = None) -> str:
+    """
+    The group of the sample at [path].
+    - group_by: [GroupBy.SUBFOLDER] names the group after the folder holding the sample, relative to [root], the root itself by its name; [GroupBy.PREFIX] after the sample name, its trailing number stripped.
+    - groups: a user defined grouping, sample name, or file name, to group, it overrides [group_by]; samples missing from it are [UNGROUPED].
+    """
+    _file_name: str = os.path.basename(path)
+    _name: str = os.path.splitext(_file_name)[0].lower()
+
+    if groups is not None:
+        return groups.get(_name, groups.get(_file_name, UNGROUPED))
+
+    match group_by:
+        case GroupBy.SUBFOLDER:
+            _dir: str = os.path.dirname(os.path.abspath(path))
+            _rel: str = os.path.relpath(_dir, os.path.abspath(root)) if root else os.path.basename(_dir)
+            return os.path.basename(os.path.normpath(root)) if _rel == os.curdir else _rel.replace(os.sep, '/')
+        case GroupBy.PREFIX:
+            return PREFIX_PATTERN.sub('', _name) or _name
+
+    return UNGROUPED
+
+
+class QuantileSketch():
+    """
+    The running distribution of many curves at every point of a shared grid, as fixed width cum.wt% bins and the exact extremes; the percentiles are read off it within a bin width, [100/SKETCH_BINS], in memory independent of the number of curves.
+    - functions:
+    - `update`: adds a batch of curves, in one vectorized pass.
+    - `merge`: adds another sketch of the same shape.
+    - `get_percentiles`: the percentiles at every grid point.
+    """
+    def __init__(self, n_points: int, n_bins: int = SKETCH_BINS) -> None:
+        """
+        The running distribution of many curves at every point of a shared grid of [n_points], in [n_bins] cum.wt% bins.
+        """
+        self._n_bins = n_bins
+        self._counts: np.ndarray = np.zeros((n_points, n_bins), dtype=np.uint32)
+        self._min: np.ndarray = np.full(n_points, np.nan)
+        self._max: np.ndarray = np.full(n_points, np.nan)
+        self.n_curves: int = 0
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.n_curves=}, {self._counts.shape=})'
+
+    def update(self, curves: np.ndarray) -> None:
+        """
+        Adds the [curves], (curves, grid points), NaNs are skipped, a point only counts the curves defined there.
+        """
+        curves = np.atleast_2d(curves)
+        _valid: np.ndarray = np.isfinite(curves)
+        _bins: np.ndarray = np.clip((curves[_valid]*(self._n_bins/100)).astype(np.intp), 0, self._n_bins-1)
+        _cells: np.ndarray = np.nonzero(_valid)[1]*self._n_bins+_bins
+
+        self._counts += np.bincount(_cells, minlength=self._counts.size).reshape(self._counts.shape).astype(np.uint32)
+        with warnings.catch_warnings():
+            # a point no curve is defined at stays NaN.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self._min = np.fmin(self._min, np.nanmin(curves, axis=0))
+            self._max = np.fmax(self._max, np.nanmax(curves, axis=0))
+        self.n_curves += curves.shape[0]
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Adds the [other] sketch, built over the same grid and bins, as from another worker.
+        """
+        self._counts += other._counts
+        self._min = np.fmin(self._min, other._min)
+        self._max = np.fmax(self._max, other._max)
+        self.n_curves += other.n_curves
+
+    def get_percentiles(self, percentiles: Sequence[float] = ENVELOPE_PERCENTILES) -> np.ndarray:
+        """
+        The [percentiles] at every grid point, interpolated within their bin, kept within the extremes, so a point every curve agrees at is exact; NaN where no curve is defined.
+        - -> (len(percentiles), grid points).
+        """
+        _cum: np.ndarray = np.cumsum(self._counts, axis=1, dtype=np.int64)
+        _total: np.ndarray = _cum[:, -1]
+        _width: float = 100/self._n_bins
+        _rows: np.ndarray = np.arange(_cum.shape[0])
+        _out: np.ndarray = np.empty((len(percentiles), _cum.shape[0]))
+
+        for _ind, _percentile in enumerate(percentiles):
+            _target: np.ndarray = _total*(_percentile/100)
+            _bin: np.ndarray = np.minimum((_cum < _target[:, np.newaxis]).sum(axis=1), self._n_bins-1)
+            _before: np.ndarray = np.where(_bin > 0, _cum[_rows, _bin-1], 0)
+            _in_bin: np.ndarray = self._counts[_rows, _bin]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                _frac: np.ndarray = np.clip(np.where(_in_bin > 0, (_target-_before)/_in_bin, 0), 0, 1)
+            _out[_ind] = np.clip((_bin+_frac)*_width, self._min, self._max)
+
+        _out[:, _total == 0] = np.nan
+        return _out
+
+
+class GroupEnvelopes():
+    """
+    The percentile envelopes of the cumulative curves of groups of samples, on one fixed phi grid, a [QuantileSketch] per group; the curves are buffered per group and added in batches.
+    - functions:
+    - `add`: adds a sample's curve to its group.
+    - `get_groups`: the groups and their number of samples.
+    - `get_envelopes`: the percentiles of every group.
+    - `to_frame`: the envelopes in long format, a row per group and grid point.
+    """
+    def __init__(self, phi_range: tuple[float, float] = ENVELOPE_PHI_RANGE, n_points: int = ENVELOPE_POINTS,
+                 batch_size: int = SKETCH_BATCH) -> None:
+        """
+        The percentile envelopes of the cumulative curves of groups of samples, on one fixed phi grid.
+        - phi_range, n_points: the grid, fixed upfront, the curves are streamed.
+        - batch_size: the curves buffered per group before its sketch is updated.
+        """
+        self.grid: np.ndarray = np.linspace(*phi_range, n_points)
+        self._batch_size = max(1, batch_size)
+        self._sketches: dict[str, QuantileSketch] = {}
+        self._buffers: dict[str, list[np.ndarray]] = {}
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({len(self._sketches)=}, {self.grid.size=})'
+
+    def __len__(self) -> int:
+        return sum(self.get_groups().values())
+
+    def add(self, group: str, curve: np.ndarray) -> None:
+        """
+        Adds a sample's [curve], on [grid], to its [group].
+        """
+        if group not in self._sketches:
+            self._sketches[group] = QuantileSketch(self.grid.size)
+            self._buffers[group] = []
+
+        self._buffers[group].append(curve)
+        if len(self._buffers[group]) >= self._batch_size:
+            self._flush(group)
+
+    def _flush(self, group: str) -> None:
+        """
+        Adds the buffered curves of the [group] to its sketch.
+        """
+        if self._buffers[group]:
+            self._sketches[group].update(np.stack(self._buffers[group]))
+            self._buffers[group] = []
+
+    def get_groups(self) -> dict[str, int]:
+        """
+        Returns the groups, in the order they came, and their number of samples.
+        """
+        return {group: sketch.n_curves+len(self._buffers[group]) for group, sketch in self._sketches.items()}
+
+    def get_envelopes(self, percentiles: Sequence[float] = ENVELOPE_PERCENTILES) -> dict[str, np.ndarray]:
+        """
+        Returns the [percentiles] of every group at every grid point, see [QuantileSketch.get_percentiles].
+        """
+        for _group in self._sketches:
+            self._flush(_group)
+        return {group: sketch.get_percentiles(percentiles) for group, sketch in self._sketches.items()}
+
+    def to_frame(self, percentiles: Sequence[float] = ENVELOPE_PERCENTILES) -> pd.DataFrame:
+        """
+        Returns the envelopes in long format: [group, samples, phi] and a [p..] column per percentile.
+        """
+        _columns: list[str] = [f'p{percentile:g}' for percentile in percentiles]
+        _parts: list[pd.DataFrame] = []
+        _counts: dict[str, int] = self.get_groups()
+
+        for _group, _envelopes in self.get_envelopes(percentiles).items():
+            _part = pd.DataFrame(_envelopes.T, columns=_columns)
+            _part.insert(0, 'group', _group)
+            _part.insert(1, 'samples', _counts[_group])
+            _part.insert(2, 'phi', self.grid)
+            _parts.append(_part)
+
+        return pd.concat(_parts, ignore_index=True) if _parts else pd.DataFrame(columns=['group', 'samples', 'phi', *_columns])
@@ -0,0 +1,325 @@
+"""
+A persistent queue of analysis and export jobs, a job per sample, in a local SQLite file; runners pull from it, so a crash or a reboot resumes where it stopped.
+- jobs are grouped into campaigns, a submission, that hold their settings once.
+- runners keep a heartbeat, the jobs of a runner that stopped beating go back to the queue, or fail once out of attempts.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from typing import Any, Final
+
+import pandas as pd
+
+from typedefs import ExportMode, JobKind, JobState, SaveObject
+
+from .manifest import format_clashes, get_name_clashes
+
+# Constants:
+# sqlite
+BUSY_TIMEOUT_MS: Final[int] = 10_000
+SCHEMA: Final[str] = '''
+CREATE TABLE IF NOT EXISTS campaigns (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT NOT NULL REFERENCES campaigns(name),
+    path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    runner TEXT,
+    error TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    elapsed REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, id);
+CREATE INDEX IF NOT EXISTS jobs_by_campaign ON jobs (campaign, state);
+CREATE TABLE IF NOT EXISTS runners (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    heartbeat REAL NOT NULL
+);
+'''
+
+# jobs
+DEFAULT_MAX_ATTEMPTS: Final[int] = 3
+# a runner that hasn't beaten for this long is taken for dead.
+STALE_RUNNER_S: Final[float] = 30.0
+LOST_RUNNER_ERROR: Final[str] = 'RuntimeError: the runner stopped while running it'
+PROGRESS_COLUMNS: Final[tuple[str,...]] = ('campaign', 'kind', *(state.value for state in JobState),
+                                           'total', 'mean_job_ms', 'samples_per_s')
+
+# (job id, kind, sample path, settings)
+type QueuedJob = tuple[int, JobKind, str, SaveObject]
+# (job id, error massage, seconds, result), a job without an error is done.
+type FinishedJob = tuple[int, str, float, Any]
+
+
+def get_runner_id() -> str:
+    """
+    A runner id unique to this process, [host:pid:start time].
+    """
+    return f'{socket.gethostname()}:{os.getpid()}:{time.time():.0f}'
+
+
+class JobQueue():
+    """
+    A persistent queue of analysis and export jobs in a local SQLite file, safe to share between threads and processes.
+    - functions:
+    - `submit`: queues a job per sample, as a campaign.
+    - `claim`: hands the oldest queued jobs to a runner.
+    - `finish`: records the jobs outcomes, failed ones are retried until out of attempts.
+    - `register_runner`, `beat`, `unregister_runner`, `get_live_runners`: the runners heartbeat.
+    - `recover`, `release`: requeue the jobs of dead runners, the claimed jobs that never ran.
+    - `pause`, `resume`, `cancel`, `retry`: a campaign's, or all, jobs.
+    - `get_counts`, `get_progress`, `get_results`: observe the queue.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        A persistent queue of analysis and export jobs in a local SQLite file, created if missing.
+        - path: the SQLite file.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # autocommit, the writes that go together are wrapped in explicit transactions.
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS/1000, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        # {campaign: (kind, settings)}, campaigns never change once submitted.
+        self._campaigns: dict[str, tuple[JobKind, SaveObject]] = {}
+
+        with self._lock:
+            # WAL, runners write while the gui and the status command read.
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.path=})'
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _write(self, statements: Iterable[tuple[str, Sequence[Any]|Iterable[Sequence[Any]]]], many: bool = False) -> int:
+        """
+        Runs the [statements], (sql, params), in one immediate transaction, so concurrent runners never claim the same job.
+        - many: every statement takes a sequence of params.
+        - -> the number of rows changed by the last one.
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                _changed: int = 0
+                for _sql, _params in statements:
+                    _changed = (self._db.executemany(_sql, _params) if many else self._db.execute(_sql, _params)).rowcount #type: ignore
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return _changed
+
+    def _read(self, sql: str, params: Sequence[Any] = ()) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _get_campaign(self, name: str) -> tuple[JobKind, SaveObject]:
+        if name not in self._campaigns:
+            _kind, _settings = self._read('SELECT kind, settings FROM campaigns WHERE name = ?', (name,))[0]
+            _save_obj = SaveObject(**json.loads(_settings))
+            # json has no tuples.
+            _save_obj.interval = tuple(_save_obj.interval) #type: ignore
+            self._campaigns[name] = (JobKind(_kind), _save_obj)
+        return self._campaigns[name]
+
+    def submit(self, paths: Sequence[str], save_obj: SaveObject, kind: JobKind = JobKind.EXPORT, campaign: str = '',
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> str:
+        """
+        Queues a job per sample at [paths], in one transaction, as the [campaign], which holds the settings.
+        - campaign: its name, named after the samples dir and the time otherwise; submitting to an existing one adds to it, its kind and settings have to match.
+        - max_attempts: how many times a failing job runs before it's failed for good.
+        - -> the campaign name.
+        """
+        if kind is JobKind.EXPORT and ExportMode(save_obj.export_mode) is not ExportMode.PER_SAMPLE:
+            raise ValueError(f'only the [{ExportMode.PER_SAMPLE.value}] export is made of independent jobs, not [{save_obj.export_mode}]')
+
+        _name: str = campaign or f'{os.path.basename(os.path.normpath(save_obj.files_path)) or 'samples'} {time.strftime('%Y-%m-%d %H:%M:%S')}'
+        _settings: str = json.dumps(save_obj.to_dict(), sort_keys=True)
+        _existing: list[tuple] = self._read('SELECT kind, settings FROM campaigns WHERE name = ?', (_name,))
+        if _existing and _existing[0] != (kind.value, _settings):
+            raise ValueError(f'the campaign [{_name}] exists, with another kind or settings')
+        if kind is JobKind.EXPORT:
+            # the exports of a campaign share a results dir, and its manifest.
+            _queued: list[str] = [row[0] for row in self._read('SELECT path FROM jobs WHERE campaign = ?', (_name,))]
+            if _clashes := get_name_clashes(dict.fromkeys([*_queued, *(os.path.abspath(path) for path in paths)])):
+                raise ValueError(f'samples exported under the same name, {format_clashes(_clashes)}')
+
+        _now: float = time.time()
+        self._write([('INSERT OR IGNORE INTO campaigns (name, kind, settings, created_at) VALUES (?, ?, ?, ?)',
+                      [(_name, kind.value, _settings, _now)]),
+                     ('INSERT INTO jobs (campaign, path, state, max_attempts, queued_at) VALUES (?, ?, ?, ?, ?)',
+                      [(_name, os.path.abspath(path), JobState.QUEUED.value, max(1, max_attempts), _now) for path in paths])],
+                    many=True)
+        return _name
+
+    def claim(self, runner: str, limit: int) -> list[QueuedJob]:
+        """
+        Hands up to [limit] of the oldest queued jobs to the [runner], marking them running and counting an attempt.
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                _rows: list[tuple] = self._db.execute('SELECT id, campaign, path FROM jobs WHERE state = ? ORDER BY id LIMIT ?',
+                                                      (JobState.QUEUED.value, limit)).fetchall()
+                self._db.executemany('UPDATE jobs SET state = ?, runner = ?, attempts = attempts+1, started_at = ? WHERE id = ?',
+                                     [(JobState.RUNNING.value, runner, time.time(), row[0]) for row in _rows])
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+        _jobs: list[QueuedJob] = []
+        for _id, _campaign, _path in _rows:
+            _kind, _settings = self._get_campaign(_campaign)
+            _jobs.append((_id, _kind, _path, _settings))
+        return _jobs
+
+    def finish(self, runner: str, jobs: Sequence[FinishedJob]) -> int:
+        """
+        Records the outcome of the [jobs] the [runner] ran, in one transaction; a failed job goes back to the queue until it's out of attempts.
+        - a job the runner no longer holds, requeued while it was taken for dead, and maybe claimed by another runner since, keeps its state, the outcome is dropped.
+        - -> the number of outcomes recorded.
+        """
+        _now: float = time.time()
+        _done = [(JobState.DONE.value, _now, elapsed, json.dumps(result), id_, runner, JobState.RUNNING.value)
+                 for id_, error, elapsed, result in jobs if not error]
+        _failed = [(JobState.QUEUED.value, JobState.FAILED.value, error, _now, elapsed, id_, runner, JobState.RUNNING.value)
+                   for id_, error, elapsed, _ in jobs if error]
+
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                _before: int = self._db.total_changes
+                self._db.executemany('UPDATE jobs SET state = ?, error = \'\', finished_at = ?, elapsed = ?, result = ? '
+                                     'WHERE id = ? AND runner = ? AND state = ?', _done)
+                self._db.executemany('UPDATE jobs SET state = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, '
+                                     'error = ?, finished_at = ?, elapsed = ? WHERE id = ? AND runner = ? AND state = ?', _failed)
+                _recorded: int = self._db.total_changes-_before
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return _recorded
+
+    def register_runner(self, runner: str) -> None:
+        _now: float = time.time()
+        _host, _pid, _ = runner.rsplit(':', 2)
+        self._write([('INSERT OR REPLACE INTO runners (id, host, pid, started_at, heartbeat) VALUES (?, ?, ?, ?, ?)',
+                      (runner, _host, int(_pid), _now, _now))])
+
+    def beat(self, runner: str) -> None:
+        self._write([('UPDATE runners SET heartbeat = ? WHERE id = ?', (time.time(), runner))])
+
+    def unregister_runner(self, runner: str) -> None:
+        """
+        Removes the [runner], the jobs it still holds, if any, go back to the queue.
+        """
+        self._write([('DELETE FROM runners WHERE id = ?', (runner,)), self._get_requeue_statement()])
+
+    def get_live_runners(self, stale_after: float = STALE_RUNNER_S) -> list[str]:
+        """
+        The runners that have beaten within [stale_after] seconds.
+        """
+        return [row[0] for row in self._read('SELECT id FROM runners WHERE heartbeat >= ?', (time.time()-stale_after,))]
+
+    def _get_requeue_statement(self) -> tuple[str, Sequence[Any]]:
+        """
+        Requeues the running jobs held by runners that are gone, failing the ones out of attempts.
+        """
+        return ('UPDATE jobs SET state = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, error = ? '
+                'WHERE state = ? AND runner NOT IN (SELECT id FROM runners)',
+                (JobState.QUEUED.value, JobState.FAILED.value, LOST_RUNNER_ERROR, JobState.RUNNING.value))
+
+    def recover(self, stale_after: float = STALE_RUNNER_S) -> int:
+        """
+        Forgets the runners that haven't beaten within [stale_after] seconds, and requeues the jobs held by runners that are gone, or fails them once out of attempts.
+        - -> the number of jobs recovered.
+        """
+        return self._write([('DELETE FROM runners WHERE heartbeat < ?', (time.time()-stale_after,)),
+                            self._get_requeue_statement()])
+
+    def release(self, runner: str, ids: Sequence[int]) -> None:
+        """
+        Hands jobs the [runner] claimed but never ran back to the queue, their attempt uncounted; the ones it no longer holds are left alone.
+        """
+        self._write([('UPDATE jobs SET state = ?, runner = NULL, attempts = attempts-1 WHERE id = ? AND runner = ? AND state = ?',
+                      [(JobState.QUEUED.value, id_, runner, JobState.RUNNING.value) for id_ in ids])], many=True)
+
+    def _set_state(self, from_states: Sequence[JobState], to_state: JobState, campaign: str|None, extra: str = '') -> int:
+        _where: str = f'state IN ({', '.join('?'*len(from_states))})'+(' AND campaign = ?' if campaign else '')
+        _params: list[Any] = [to_state.value, *(state.value for state in from_states)]+([campaign] if campaign else [])
+        return self._write([(f'UPDATE jobs SET state = ?{extra} WHERE {_where}', _params)])
+
+    def pause(self, campaign: str|None = None) -> int:
+        """
+        Holds the queued jobs of the [campaign], of every campaign if None, the running ones are finished; -> the number held.
+        """
+        return self._set_state([JobState.QUEUED], JobState.PAUSED, campaign)
+
+    def resume(self, campaign: str|None = None) -> int:
+        return self._set_state([JobState.PAUSED], JobState.QUEUED, campaign)
+
+    def cancel(self, campaign: str|None = None) -> int:
+        """
+        Drops the queued and paused jobs of the [campaign], of every campaign if None, the running ones are finished; -> the number dropped.
+        """
+        return self._set_state([JobState.QUEUED, JobState.PAUSED], JobState.CANCELLED, campaign)
+
+    def retry(self, campaign: str|None = None) -> int:
+        """
+        Queues the failed and cancelled jobs of the [campaign] again, with their attempts reset; -> the number queued.
+        """
+        return self._set_state([JobState.FAILED, JobState.CANCELLED], JobState.QUEUED, campaign, ', attempts = 0')
+
+    def get_counts(self, campaign: str|None = None) -> dict[JobState, int]:
+        """
+        The number of jobs in every state, of the [campaign], of every campaign if None; cheap enough to poll.
+        """
+        _rows = self._read('SELECT state, COUNT(*) FROM jobs'+(' WHERE campaign = ?' if campaign else '')+' GROUP BY state',
+                           (campaign,) if campaign else ())
+        _counts: dict[str, int] = dict(_rows)
+        return {state: _counts.get(state.value, 0) for state in JobState}
+
+    def get_progress(self) -> pd.DataFrame:
+        """
+        Every campaign, oldest first, its jobs per state, the mean job time and the throughput, from its first start to its last finish.
+        """
+        _states: str = ', '.join(f'SUM(j.state = \'{state.value}\')' for state in JobState)
+        _rows = self._read(f'SELECT c.name, c.kind, {_states}, COUNT(j.id), AVG(j.elapsed)*1000, '
+                           f'SUM(j.state = \'{JobState.DONE.value}\')/NULLIF(MAX(j.finished_at)-MIN(j.started_at), 0) '
+                           'FROM campaigns c LEFT JOIN jobs j ON j.campaign = c.name GROUP BY c.name ORDER BY c.created_at')
+        return pd.DataFrame(_rows, columns=list(PROGRESS_COLUMNS))
+
+    def get_results(self, campaign: str) -> pd.DataFrame:
+        """
+        The results of the done jobs of the [campaign], a row per job, with the sample [path] and the job [elapsed] seconds; the summary rows of an analyze campaign, the written files of an export one.
+        """
+        _rows = self._read('SELECT path, elapsed, result FROM jobs WHERE campaign = ? AND state = ? ORDER BY id',
+                           (campaign, JobState.DONE.value))
+        _results: list[dict[str, Any]] = []
+        for _path, _elapsed, _result in _rows:
+            _value: Any = json.loads(_result)
+            _results.append({'path': _path, 'elapsed': _elapsed, **(_value if isinstance(_value, dict) else {'result': _value})})
+        return pd.DataFrame(_results)
@@ -0,0 +1,124 @@
+import json
+import os
+from collections.abc import Iterable
+from typing import Any, Final
+
+from typedefs import SaveObject
+
+# Constants:
+# names
+MANIFEST_FILE_NAME: Final[str] = 'export_manifest.json'
+PARTIAL_SUFFIX: Final[str] = '.part'
+
+# the SaveObject attributes that change the produced artifacts.
+SETTINGS_ATTRIBS: Final[tuple[str,...]] = ('prefix', 'color', 'dpi', 'transparent',
+                                           'save_raw_files', 'raw_results_dir_name')
+
+type ManifestEntry = dict[str, Any]
+
+
+def get_partial_path(path: str) -> str:
+    """
+    The path to write into before renaming to [path], keeps the extension last, as some writers infer the format from it.
+    - `dir/name.ext` -> `dir/name.part.ext`
+    """
+    _root, _ext = os.path.splitext(path)
+    return f'{_root}{PARTIAL_SUFFIX}{_ext}'
+
+
+def get_export_settings(save_obj: SaveObject) -> dict[str, Any]:
+    """
+    The part of the [save_obj] that affects the exported artifacts.
+    """
+    return {attrib: save_obj.get(attrib) for attrib in SETTINGS_ATTRIBS} #type: ignore
+
+
+def get_name_clashes(paths: Iterable[str]) -> dict[str, list[str]]:
+    """
+    The samples at [paths] that would be exported under the same name, a sample's results and manifest entry are named after its file, see [Sample.get_name]; samples from different dirs, or of different formats, may clash.
+    - -> {sample name: the clashing paths}, empty if every name is unique.
+    """
+    _by_name: dict[str, list[str]] = {}
+    for _path in paths:
+        _by_name.setdefault(os.path.basename(_path).split('.')[0].lower(), []).append(_path)
+
+    return {name: paths for name, paths in _by_name.items() if len(paths) > 1}
+
+
+def format_clashes(clashes: dict[str, list[str]]) -> str:
+    """
+    The [clashes] of [get_name_clashes] on one line, for the error massages.
+    """
+    return '; '.join(f'[{name}]: {', '.join(paths)}' for name, paths in clashes.items())
+
+
+class ExportManifest():
+    """
+    Keeps track of what an export produced in a results dir, per sample, to skip up to date samples and resume interrupted exports.
+    - functions:
+    - `get_entry`: the record of a sample.
+    - `is_current`: is the sample's record up to date.
+    - `record`: records a sample's artifacts.
+    - `save`: writes the manifest atomically.
+    """
+    def __init__(self, results_dir_path: str) -> None:
+        """
+        Keeps track of what an export produced in a results dir, per sample, to skip up to date samples and resume interrupted exports.
+        - results_dir_path: where the manifest lives, artifact paths are relative to it.
+        """
+        self.results_dir_path = results_dir_path
+        self.path: str = os.path.join(results_dir_path, MANIFEST_FILE_NAME)
+        self.entries: dict[str, ManifestEntry] = self._load()
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.path=}, {len(self.entries)=})'
+
+    def _load(self) -> dict[str, ManifestEntry]:
+        """
+        Loads the manifest file if any, a corrupt manifest is treated as an empty one, everything would just be exported again.
+        """
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get_entry(self, key: str) -> ManifestEntry|None:
+        """
+        Returns the record of the sample with [key], None if not recorded.
+        """
+        return self.entries.get(key)
+
+    @staticmethod
+    def is_current(entry: ManifestEntry|None, digest: str,
+                   settings: dict[str, Any], results_dir_path: str) -> bool:
+        """
+        Checks that the [entry] was produced from the same sample content [digest], with the same [settings], and that all of its artifacts still exist.
+        - static, to be usable by worker processes given only the entry.
+        """
+        if not entry:
+            return False
+
+        _same_input: bool = entry.get('hash') == digest and entry.get('settings') == settings
+        _artifacts: list[str] = entry.get('artifacts', [])
+        _all_exist: bool = bool(_artifacts) and all(
+            os.path.exists(os.path.join(results_dir_path, artifact)) for artifact in _artifacts)
+
+        return _same_input and _all_exist
+
+    def record(self, key: str, entry: ManifestEntry) -> None:
+        """
+        Records the [entry] of the sample with [key], overriding any previous one.
+        """
+        self.entries[key] = entry
+
+    def save(self) -> None:
+        """
+        Writes the manifest, into a partial file first, then renames it, so a crash never leaves a truncated manifest behind.
+        """
+        os.makedirs(self.results_dir_path, exist_ok=True)
+        _partial_path: str = get_partial_path(self.path)
+
+        with open(_partial_path, 'w') as f:
+            json.dump(self.entries, f, indent=4)
+        os.replace(_partial_path, self.path)
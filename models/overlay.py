@@ -0,0 +1,121 @@
+"""
+The cumulative curves of many samples on one shared phi grid, for overlaying a whole selection in one plot.
+"""
+import warnings
+from collections.abc import Callable, Sequence
+from typing import Final
+
+import numpy as np
+
+from typedefs import AnalysisMethod
+
+from .analyzer import Analyzer
+from .sample import Sample
+
+# Constants:
+# grid
+OVERLAY_POINTS: Final[int] = 256 # the curves are decimated to about the axes width in pixels, at most.
+MIN_OVERLAY_POINTS: Final[int] = 16
+
+# envelopes
+ENVELOPE_PERCENTILES: Final[tuple[float, float, float, float, float]] = (5, 25, 50, 75, 95)
+
+
+class CurveOverlay():
+    """
+    The cumulative curves of many samples, resampled on one shared phi grid, a row per sample, to be drawn as one collection.
+    - the two points samples have no curve, they're skipped, see [skipped].
+    - functions:
+    - `resample`: the curves on a grid of n points, the last one is kept.
+    - `get_envelopes`: the percentiles, across the samples, at every grid point.
+    """
+    def __init__(self, analyzers: Sequence[Analyzer], names: Sequence[str] = ()) -> None:
+        """
+        The cumulative curves of many samples, resampled on one shared phi grid, a row per sample.
+        - names: the samples names, in the [analyzers] order, for the skipped ones.
+        """
+        _names: list[str] = list(names) or [str(ind) for ind in range(len(analyzers))]
+        _drawn: list[bool] = [not ana.sample_data.empty and ana.get_method() != AnalysisMethod.TWO_POINTS
+                              for ana in analyzers]
+
+        self._analyzers: list[Analyzer] = [ana for ana, drawn in zip(analyzers, _drawn) if drawn]
+        self.names: list[str] = [name for name, drawn in zip(_names, _drawn) if drawn]
+        self.skipped: list[str] = [name for name, drawn in zip(_names, _drawn) if not drawn]
+
+        _ranges: np.ndarray = np.array([ana.get_phi_range() for ana in self._analyzers]).reshape(-1, 2)
+        self.phi_range: tuple[float, float] = ((float(_ranges[:, 0].min()), float(_ranges[:, 1].max()))
+                                               if _ranges.size else (0.0, 1.0))
+
+        self._resampled: tuple[int, np.ndarray, np.ndarray]|None = None
+        self._envelopes: tuple[int, np.ndarray]|None = None
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({len(self)=}, {self.phi_range=}, {len(self.skipped)=})'
+
+    def __len__(self) -> int:
+        return len(self._analyzers)
+
+    def resample(self, n_points: int = OVERLAY_POINTS) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The curves on a shared grid of [n_points], spanning all the samples; each curve is evaluated on the grid, not inverted, NaN outside its own range.
+        - n_points: the decimation, about the axes width in pixels, [MIN_OVERLAY_POINTS] at least.
+        - -> (grid, curves), curves is (samples, n_points).
+        """
+        n_points = max(MIN_OVERLAY_POINTS, n_points)
+        if self._resampled is not None and self._resampled[0] == n_points:
+            return self._resampled[1:]
+
+        _grid: np.ndarray = np.linspace(*self.phi_range, n_points)
+        _curves: np.ndarray = np.empty((len(self), n_points))
+        for _ind, _ana in enumerate(self._analyzers):
+            _curves[_ind] = _ana.get_curve_at(_grid)
+
+        self._resampled = (n_points, _grid, _curves)
+        self._envelopes = None
+
+        return (_grid, _curves)
+
+    def get_envelopes(self, n_points: int = OVERLAY_POINTS,
+                      percentiles: Sequence[float] = ENVELOPE_PERCENTILES) -> np.ndarray:
+        """
+        The [percentiles] of the curves at every point of the [n_points] grid, NaN where no curve is defined.
+        - -> (len(percentiles), n_points).
+        """
+        _grid, _curves = self.resample(n_points)
+        if self._envelopes is not None and self._envelopes[0] == hash(tuple(percentiles)):
+            return self._envelopes[1]
+
+        if not len(self):
+            return np.full((len(percentiles), _grid.size), np.nan)
+        with warnings.catch_warnings():
+            # grid points between samples ranges may have no curve at all.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            _envelopes: np.ndarray = np.nanpercentile(_curves, percentiles, axis=0)
+
+        self._envelopes = (hash(tuple(percentiles)), _envelopes)
+        return _envelopes
+
+
+def load_overlay(paths: Sequence[str], cancelled: Callable[[], bool] = lambda: False,
+                 n_points: int = OVERLAY_POINTS) -> CurveOverlay|None:
+    """
+    Reads and analyzes the samples at [paths] into an overlay, resampled on [n_points] already; no widget nor cache is touched, safe to run off the UI thread.
+    - the samples that fail to read are skipped, as the ones without a curve are.
+    - cancelled: polled between samples, a later selection makes this one moot; -> None once it returns True.
+    """
+    _analyzers: list[Analyzer] = []
+    _names: list[str] = []
+    for _path in paths:
+        if cancelled():
+            return None
+        try:
+            _sample = Sample(_path)
+            _analyzers.append(Analyzer(_sample.get_data()))
+            _names.append(_sample.get_name())
+        except Exception:
+            _analyzers.append(Analyzer())
+            _names.append(_path)
+
+    _overlay = CurveOverlay(_analyzers, _names)
+    _overlay.resample(n_points)
+    return _overlay
@@ -0,0 +1,275 @@
+"""
+A results store, every analyzed sample, across projects, in one local SQLite file: its data, stats, analysis method, interpretation and provenance, the source path, the content hash and the settings.
+- every stat is indexed, and the moments are in an R*Tree as well, so a query bounding several of them, std < .5 and mean between 1 and 2 say, only reads the matching samples, milliseconds over a million.
+- samples are added in bulk, a transaction per batch; a sample already stored in the project, with the same content and settings, is skipped.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+
+# Constants:
+# sqlite
+BUSY_TIMEOUT_MS: Final[int] = 10_000
+
+# columns, the texture ones as [models.texture.TEXTURE_COLUMNS], not imported, it pulls in the analysis.
+STATS_COLUMNS: Final[tuple[str,...]] = ('mean', 'std', 'skewness', 'kurtosis', 'gravel', 'sand', 'silt', 'clay')
+LABEL_COLUMNS: Final[tuple[str,...]] = ('sorting', 'skewness_interpretation', 'kurtosis_interpretation', 'folk_class', 'shepard_class')
+# the R*Tree dimensions, the moments, the ones queried together; the texture is bound by its own indexes.
+BOX_COLUMNS: Final[tuple[str,...]] = ('mean', 'std', 'skewness', 'kurtosis')
+RESULT_COLUMNS: Final[tuple[str,...]] = ('id', 'project', 'sample', 'source', 'hash', 'method',
+                                         *STATS_COLUMNS, *LABEL_COLUMNS, 'settings', 'stored_at')
+INDEXED_COLUMNS: Final[tuple[str,...]] = ('sample', 'hash', 'method', *STATS_COLUMNS, *LABEL_COLUMNS)
+
+SCHEMA: Final[str] = f'''
+CREATE TABLE IF NOT EXISTS settings (
+    settings_id INTEGER PRIMARY KEY,
+    settings TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    sample TEXT NOT NULL,
+    source TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    settings_id INTEGER NOT NULL REFERENCES settings(settings_id),
+    method TEXT NOT NULL,
+    {',\n    '.join(f'{column} REAL' for column in STATS_COLUMNS)},
+    {',\n    '.join(f'{column} TEXT' for column in LABEL_COLUMNS)},
+    stored_at REAL NOT NULL,
+    UNIQUE (project, hash, settings_id)
+);
+CREATE TABLE IF NOT EXISTS sample_data (
+    id INTEGER PRIMARY KEY REFERENCES samples(id),
+    columns TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+{'\n'.join(f'CREATE INDEX IF NOT EXISTS samples_by_{column} ON samples ({column});' for column in INDEXED_COLUMNS)}
+'''
+# 32 bit floats, rounded outwards, the matches are filtered on the stored stats after.
+BOX_SCHEMA: Final[str] = f'CREATE VIRTUAL TABLE IF NOT EXISTS sample_boxes USING rtree(id, {', '.join(f'{column}_min, {column}_max' for column in BOX_COLUMNS)})'
+
+# (source path, '' for data in memory, sample data, summary row, content hash), see [models.batch.record_source].
+type StoredSample = tuple[str, pd.DataFrame, Mapping[str, Any], str]
+# a stat bound, (min, max), inclusive, None leaves a side open; a label is matched as is.
+type Bound = tuple[float|None, float|None]|str
+
+
+class ResultsStore():
+    """
+    A results store, every analyzed sample, across projects, in one local SQLite file, safe to share between threads and processes.
+    - functions:
+    - `add_many`: stores analyzed samples in bulk.
+    - `find`: the samples whose stats fall within bounds, indexed.
+    - `query`: the samples matching an sql condition.
+    - `get_data`: the data of stored samples.
+    - `get_projects`: the projects stored, and their number of samples.
+    - `remove_project`: forgets a project's samples.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        A results store in a local SQLite file, created if missing.
+        - path: the SQLite file.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # autocommit, the writes that go together are wrapped in explicit transactions.
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS/1000, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(SCHEMA)
+            # the R*Tree is a compile time option, without it the stats are bound by their own indexes alone.
+            try:
+                self._db.execute(BOX_SCHEMA)
+                self.has_boxes: bool = True
+            except sqlite3.OperationalError:
+                self.has_boxes = False
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.path=}, {self.has_boxes=})'
+
+    def close(self) -> None:
+        with self._lock:
+            # keeps the planner statistics current, cheap unless the tables changed a lot.
+            self._db.execute('PRAGMA optimize')
+            self._db.close()
+
+    def add_many(self, samples: Iterable[StoredSample], project: str, settings: Mapping[str, Any]|None = None) -> tuple[int, int]:
+        """
+        Stores the analyzed [samples], in one transaction; the ones already stored in the [project], with the same content hash and [settings], are skipped.
+        - settings: what the samples were analyzed and exported with, kept as their provenance.
+        - -> (the number of samples stored, the number skipped).
+        """
+        _settings: str = json.dumps(settings or {}, sort_keys=True, default=str)
+        _now: float = time.time()
+        _samples: list[StoredSample] = list(samples)
+        if not _samples:
+            return (0, 0)
+
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.execute('INSERT OR IGNORE INTO settings (settings) VALUES (?)', (_settings,))
+                _settings_id: int = self._db.execute('SELECT settings_id FROM settings WHERE settings = ?', (_settings,)).fetchone()[0]
+                # fresh ids, a skipped sample's id is left unused, so its data and box are skipped with it.
+                _first_id: int = self._db.execute('SELECT COALESCE(MAX(id), 0)+1 FROM samples').fetchone()[0]
+                _ids: range = range(_first_id, _first_id+len(_samples))
+                _before: int = self._db.total_changes
+
+                self._db.executemany(
+                    f'INSERT INTO samples (id, project, sample, source, hash, settings_id, method, {', '.join(STATS_COLUMNS+LABEL_COLUMNS)}, '
+                    f'stored_at) VALUES ({', '.join('?'*(8+len(STATS_COLUMNS)+len(LABEL_COLUMNS)))}) ON CONFLICT DO NOTHING',
+                    [(id_, project, row['sample'], source, hash_, _settings_id, row['method'],
+                      *(row[column] for column in STATS_COLUMNS), *(row[column] for column in LABEL_COLUMNS), _now)
+                     for id_, (source, _, row, hash_) in zip(_ids, _samples)])
+                _added: int = self._db.total_changes-_before
+
+                _exists: str = 'WHERE EXISTS (SELECT 1 FROM samples WHERE id = ?)'
+                self._db.executemany(f'INSERT INTO sample_data (id, columns, data) SELECT ?, ?, ? {_exists}',
+                                     [(id_, json.dumps(list(map(str, data.columns))),
+                                       np.ascontiguousarray(data.to_numpy(dtype=np.float64)).tobytes(), id_)
+                                      for id_, (_, data, _, _) in zip(_ids, _samples)])
+                if self.has_boxes:
+                    # NaN stats can't be boxed, they match no bound anyway.
+                    self._db.executemany(f'INSERT INTO sample_boxes SELECT ?, {', '.join('?'*2*len(BOX_COLUMNS))} {_exists}',
+                                         [(id_, *(float(row[column]) for column in BOX_COLUMNS for _ in range(2)), id_)
+                                          for id_, (_, _, row, _) in zip(_ids, _samples)
+                                          if all(math.isfinite(row[column]) for column in BOX_COLUMNS)])
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+        return (_added, len(_samples)-_added)
+
+    def _select(self, where: Sequence[str], params: Sequence[Any], limit: int|None, order_by: str|None) -> pd.DataFrame:
+        if order_by is not None and (order_by.lstrip('-') not in RESULT_COLUMNS or order_by.lstrip('-') == 'settings'):
+            raise ValueError(f'can\'t order by [{order_by}], not a result column, bar [settings]')
+
+        # the settings are few, looked up once each, not joined into every row.
+        _columns: list[str] = ['settings_id' if column == 'settings' else column for column in RESULT_COLUMNS]
+        _sql: str = f'SELECT {', '.join(_columns)} FROM samples'
+        if where:
+            _sql += f' WHERE {' AND '.join(f'({condition})' for condition in where)}'
+        if order_by:
+            _sql += f' ORDER BY {order_by.lstrip('-')}{' DESC' if order_by.startswith('-') else ''}'
+        if limit is not None:
+            _sql += f' LIMIT {int(limit)}'
+
+        with self._lock:
+            _rows: list[tuple] = self._db.execute(_sql, params).fetchall()
+            _settings: dict[int, str] = dict(self._db.execute('SELECT settings_id, settings FROM settings').fetchall())
+        _frame = pd.DataFrame(_rows, columns=_columns)
+        _frame['settings_id'] = _frame['settings_id'].map(_settings)
+        return _frame.rename(columns={'settings_id': 'settings'})
+
+    def find(self, project: str|None = None, method: str|None = None, limit: int|None = None, order_by: str|None = None,
+             **bounds: Bound) -> pd.DataFrame:
+        """
+        The samples whose stats fall within the [bounds], e.g. find(std=(None, .5), mean=(1, 2), sorting='poorly sorted').
+        - project, method: only the samples of the project, analyzed with the method, an [AnalysisMethod] value; every one if None.
+        - order_by: a result column, descending if it starts with -.
+        - bounds: a (min, max) per stat, see [STATS_COLUMNS], inclusive, None leaves a side open; a value per label, see [LABEL_COLUMNS].
+        - -> a row per sample, see [RESULT_COLUMNS].
+        """
+        _where: list[str] = []
+        _params: list[Any] = []
+        _boxed: list[str] = []
+        _box_params: list[float] = []
+
+        for _column, _bound in bounds.items():
+            if _column in LABEL_COLUMNS and isinstance(_bound, str):
+                _where.append(f'{_column} = ?')
+                _params.append(_bound)
+                continue
+            if _column not in STATS_COLUMNS or isinstance(_bound, str):
+                raise ValueError(f'[{_column}] isn\'t a stat bound by (min, max) nor a label matched by its value')
+
+            for _value, _operator, _side in zip(_bound, ('>=', '<='), ('max', 'min')):
+                if _value is None:
+                    continue
+                _where.append(f'{_column} {_operator} ?')
+                _params.append(_value)
+                # a box reaching past the bound, the stored stat is checked after.
+                if self.has_boxes and _column in BOX_COLUMNS:
+                    _boxed.append(f'{_column}_{_side} {_operator} ?')
+                    _box_params.append(_value)
+
+        if _boxed:
+            _where.insert(0, f'id IN (SELECT id FROM sample_boxes WHERE {' AND '.join(_boxed)})')
+            _params[:0] = _box_params
+        for _column, _value in (('project', project), ('method', method)):
+            if _value is not None:
+                _where.append(f'{_column} = ?')
+                _params.append(_value)
+
+        return self._select(_where, _params, limit, order_by)
+
+    def query(self, where: str = '', params: Sequence[Any] = (), project: str|None = None, limit: int|None = None,
+              order_by: str|None = None) -> pd.DataFrame:
+        """
+        The samples matching an sql condition over the result columns, bar [settings], e.g. query('std < ? AND folk_class LIKE ?', (.5, '%sand%')); the stats indexes serve it, [find] is quicker for bounds on several moments.
+        - project: only the samples of the project, every one if None.
+        - -> a row per sample, see [RESULT_COLUMNS].
+        """
+        _where: list[str] = [where] if where else []
+        if project is not None:
+            _where.append('project = ?')
+            params = [*params, project]
+        return self._select(_where, params, limit, order_by)
+
+    def get_data(self, ids: Iterable[int]) -> dict[int, pd.DataFrame]:
+        """
+        The data of the stored samples with the given [ids], as it was analyzed.
+        """
+        _ids: list[int] = [int(id_) for id_ in ids]
+        _data: dict[int, pd.DataFrame] = {}
+
+        with self._lock:
+            _rows: list[tuple] = self._db.execute(f'SELECT id, columns, data FROM sample_data WHERE id IN ({', '.join('?'*len(_ids))})',
+                                                  _ids).fetchall()
+        for _id, _columns, _blob in _rows:
+            _names: list[str] = json.loads(_columns)
+            _data[_id] = pd.DataFrame(np.frombuffer(_blob, dtype=np.float64).reshape(-1, len(_names)), columns=_names)
+
+        return _data
+
+    def get_projects(self) -> pd.DataFrame:
+        """
+        Every project, its number of samples and when it was first and last added to.
+        """
+        with self._lock:
+            _rows: list[tuple] = self._db.execute('SELECT project, COUNT(*), MIN(stored_at), MAX(stored_at) FROM samples '
+                                                  'GROUP BY project ORDER BY project').fetchall()
+        _frame = pd.DataFrame(_rows, columns=['project', 'samples', 'first_stored', 'last_stored'])
+        for _column in ('first_stored', 'last_stored'):
+            _frame[_column] = pd.to_datetime(_frame[_column], unit='s').dt.floor('s')
+        return _frame
+
+    def remove_project(self, project: str) -> int:
+        """
+        Forgets the [project]'s samples, -> the number removed.
+        """
+        _ids: str = 'SELECT id FROM samples WHERE project = ?'
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.execute(f'DELETE FROM sample_data WHERE id IN ({_ids})', (project,))
+                if self.has_boxes:
+                    self._db.execute(f'DELETE FROM sample_boxes WHERE id IN ({_ids})', (project,))
+                _removed: int = self._db.execute('DELETE FROM samples WHERE project = ?', (project,)).rowcount
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return _removed
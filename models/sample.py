@@ -1,3 +1,4 @@
+import hashlib
 import os
 import re
 
@@ -16,6 +17,9 @@ class Sample():
     - functions:
     - `get_name`: get the file name.
     - `get_data`: get the samples data.
+    - `get_path`: get the source file path.
+    - `get_hash`: get the content hash.
+    - `from_frame`: create a sample from data in memory.
     """
     def __init__(self, path: str = '') -> None:
         """
@@ -23,6 +27,7 @@ class Sample():
             - name: str.
             - data: pd.DataFrame, a minimum of 3 points is necessary for calculations.
         """
+        self._path: str = path
         self._full_name: str = ''
         self._data: pd.DataFrame = pd.DataFrame()
 
@@ -45,12 +50,18 @@ class Sample():
         """
         _full_name: str = os.path.split(path)[-1]
         _format: str = _full_name.split('.')[-1]
-        _data: pd.DataFrame = import_form_path(path, _format)
-        
+
+        return (_full_name, self._prepare_data(import_form_path(path, _format)))
+
+    def _prepare_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepares the raw [phi, wht] data, as read from a file, into the [HEADER] columns, an empty frame if it isn't 2 columns wide.
+        """
+        _data: pd.DataFrame = data
         #TODO: Some popup error crash??
         # We only assume 2*n col df.
-        if min(_data.shape) > 2:
-            return ('', pd.DataFrame())
+        if _data.empty or min(_data.shape) > 2:
+            return pd.DataFrame()
         
         if _data.shape[1] > 2:
             _data = _data.T
@@ -70,7 +81,22 @@ class Sample():
         _data[HEADER[2]] = ((_data[HEADER[1]]/_data[HEADER[1]].sum())*100).round(2)
         _data[HEADER[3]] = _data[HEADER[2]].cumsum().round(2)
         
-        return (_full_name, _data)
+        return _data
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, name: str) -> 'Sample':
+        """
+        Creates a sample from [data] in memory, laid out as in a sample file, [phi, wht] columns or rows, with or without a header; a frame with [phi, wht] columns among others is reduced to them.
+        - name: the sample name, a file name, with its extension, as [get_name(full=True)] returns it.
+        """
+        if set(HEADER[:2]) <= set(data.columns):
+            data = data.loc[:, list(HEADER[:2])]
+
+        _sample = cls()
+        _sample._full_name = name
+        _sample._data = _sample._prepare_data(data.copy())
+
+        return _sample
     
     def get_name(self, full: bool = False) -> str:
         """
@@ -80,6 +106,22 @@ class Sample():
 
         return _short_name if not full else self._full_name      
     
+    def get_path(self) -> str:
+        """
+        Returns the path of the file the sample was created from.
+        """
+        return self._path
+
+    def get_hash(self) -> str:
+        """
+        Returns a hash of the sample name and data, the file format and layout don't matter.
+        """
+        _hash = hashlib.blake2b(self._full_name.encode(), digest_size=16)
+        _hash.update(pd.util.hash_pandas_object(self._data, index=True).to_numpy().tobytes())
+        _hash.update(','.join(self._data.columns).encode())
+
+        return _hash.hexdigest()
+
     def get_data(self) -> pd.DataFrame:
         """
         Returns the sample data.
@@ -1,7 +1,9 @@
 # Due to the way tkinter handles event bindings race conditions are bound to happen, in which a listener might be added before the broadcaster/sender leading to a situation where we don't know the [args] to listen to, hence the convoluted args logic resulting from the need to handle multiple entry points to append new [arg] to [self.args]!!
-from tkinter import BaseWidget
-from tkinter.commondialog import Dialog
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from tkinter import BaseWidget
+    from tkinter.commondialog import Dialog
 
 
 class SignalData():
@@ -19,8 +21,8 @@ class SignalData():
         - listener.
         - args.
         """
-        self.sender: Dialog|BaseWidget|None = None
-        self.listeners: list[BaseWidget|Dialog] = []
+        self.sender: 'Dialog|BaseWidget|None' = None
+        self.listeners: 'list[BaseWidget|Dialog]' = []
         self.args: list[list[Any]] = [[]]
     
     def __repr__(self) -> str:
@@ -41,13 +43,13 @@ class SignalData():
         if arg != _temp_arg:
             self.args = [arg for arg_ in self.args]
         
-    def add_listener(self, listener: BaseWidget|Dialog) -> None:
+    def add_listener(self, listener: 'BaseWidget|Dialog') -> None:
         """
         Adds a listener.
         """
         self.listeners.append(listener)
     
-    def set_sender(self, sender: BaseWidget|Dialog) -> None:
+    def set_sender(self, sender: 'BaseWidget|Dialog') -> None:
         """
         Adds a sender.
         """
@@ -0,0 +1,125 @@
+"""
+The stats of a whole dataset, a row per sample, built incrementally as the samples are analyzed, for the dataset diagrams.
+"""
+import warnings
+from collections.abc import Iterable
+from typing import Final
+
+import numpy as np
+import pandas as pd
+
+from .batch import SUMMARY_COLUMNS, SummaryRow
+from .texture import TEXTURE_COLUMNS
+
+# Constants:
+STAT_COLUMNS: Final[tuple[str, str, str, str]] = ('mean', 'std', 'skewness', 'kurtosis')
+# every interpretation, and the stat or fraction it interprets, its classes are ordered by it.
+CLASS_COLUMNS: Final[dict[str, str]] = {'sorting': 'std',
+                                        'skewness_interpretation': 'skewness',
+                                        'kurtosis_interpretation': 'kurtosis',
+                                        'folk_class': 'sand',
+                                        'shepard_class': 'sand'}
+INITIAL_CAPACITY: Final[int] = 1024
+
+
+class StatsTable():
+    """
+    The stats of many samples, a row per sample, appended as they're analyzed; the stats and the texture fractions are kept in growable arrays and the interpretations as class codes, so 100k samples stay compact.
+    - functions:
+    - `append`: adds a summary row, as [models.batch.summarize] makes it.
+    - `extend`: adds many.
+    - `get_stats`: the stats, a column per [STAT_COLUMNS].
+    - `get_fractions`: the texture, a column per [TEXTURE_COLUMNS].
+    - `get_classes`: an interpretation as class codes, and the classes.
+    - `to_frame`: the table as summary rows.
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        """
+        The stats of many samples, a row per sample, appended as they're analyzed.
+        - capacity: the rows allocated upfront, doubled whenever full.
+        """
+        self._size: int = 0
+        self._stats: np.ndarray = np.empty((max(1, capacity), len(STAT_COLUMNS)))
+        self._fractions: np.ndarray = np.empty((max(1, capacity), len(TEXTURE_COLUMNS)))
+        self._codes: np.ndarray = np.empty((max(1, capacity), len(CLASS_COLUMNS)), dtype=np.int16)
+        self._classes: dict[str, dict[str, int]] = {column: {} for column in CLASS_COLUMNS}
+        self._names: list[str] = []
+        self._methods: list[str] = []
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({len(self)=}, {self._stats.shape[0]=})'
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, row: SummaryRow) -> None:
+        """
+        Adds a sample, its summary [row]; the stats are copied into the table, nothing refers to the row afterwards.
+        """
+        if self._size == self._stats.shape[0]:
+            self._stats = np.concatenate([self._stats, np.empty_like(self._stats)])
+            self._fractions = np.concatenate([self._fractions, np.empty_like(self._fractions)])
+            self._codes = np.concatenate([self._codes, np.empty_like(self._codes)])
+
+        self._stats[self._size] = [row[column] for column in STAT_COLUMNS]
+        self._fractions[self._size] = [row[column] for column in TEXTURE_COLUMNS]
+        for _ind, _column in enumerate(CLASS_COLUMNS):
+            _classes: dict[str, int] = self._classes[_column]
+            self._codes[self._size, _ind] = _classes.setdefault(str(row[_column]), len(_classes))
+        self._names.append(row['sample'])
+        self._methods.append(row['method'])
+        self._size += 1
+
+    def extend(self, rows: Iterable[SummaryRow]) -> None:
+        """
+        Adds many samples, see [append].
+        """
+        for _row in rows:
+            self.append(_row)
+
+    def get_stats(self) -> np.ndarray:
+        """
+        Returns the stats, (samples, [STAT_COLUMNS]), a view, valid until the next append.
+        """
+        return self._stats[:self._size]
+
+    def get_fractions(self) -> np.ndarray:
+        """
+        Returns the gravel, sand, silt and clay %, (samples, [TEXTURE_COLUMNS]), a view, valid until the next append.
+        """
+        return self._fractions[:self._size]
+
+    def get_classes(self, column: str) -> tuple[np.ndarray, list[str]]:
+        """
+        Returns the [column] interpretation as class codes, the classes ordered by the median of the stat or fraction they interpret, from the lowest.
+        - column: one of [CLASS_COLUMNS].
+        - -> (a code per sample, the class of every code)
+        """
+        _codes: np.ndarray = self._codes[:self._size, list(CLASS_COLUMNS).index(column)]
+        _labels: list[str] = list(self._classes[column])
+        _related: str = CLASS_COLUMNS[column]
+        _stat: np.ndarray = (self.get_stats()[:, STAT_COLUMNS.index(_related)] if _related in STAT_COLUMNS
+                             else self.get_fractions()[:, TEXTURE_COLUMNS.index(_related)])
+
+        with warnings.catch_warnings():
+            # the two points samples have no spread, their classes may have no stat at all, they go last.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            _medians: list[float] = [float(np.nanmedian(_stat[_codes == code])) for code in range(len(_labels))]
+        _order: np.ndarray = np.argsort(_medians, kind='stable')
+        _recode: np.ndarray = np.empty(len(_labels), dtype=np.int16)
+        _recode[_order] = np.arange(len(_labels))
+
+        return (_recode[_codes], [_labels[code] for code in _order])
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the table, in the summary columns, [models.batch.SUMMARY_COLUMNS].
+        """
+        _frame = pd.DataFrame(self.get_stats(), columns=list(STAT_COLUMNS))
+        _frame.insert(0, 'sample', self._names)
+        _frame.insert(1, 'method', self._methods)
+        _frame[list(TEXTURE_COLUMNS)] = self.get_fractions()
+        for _ind, _column in enumerate(CLASS_COLUMNS):
+            _frame[_column] = np.array(list(self._classes[_column]), dtype=object)[self._codes[:self._size, _ind]]
+
+        return _frame[list(SUMMARY_COLUMNS)]
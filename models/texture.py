@@ -0,0 +1,113 @@
+"""
+The texture of samples, their gravel, sand, silt and clay fractions, and its classification after Folk (1954) and Shepard (1954); vectorized, a row per sample.
+"""
+from collections.abc import Sequence
+from typing import Final
+
+import numpy as np
+
+from .analyzer import Analyzer
+
+# Constants:
+# phi boundaries, gravel|sand, sand|silt, silt|clay (Wentworth, 1922).
+TEXTURE_BOUNDARIES: Final[tuple[float, float, float]] = (-1.0, 4.0, 8.0)
+TEXTURE_COLUMNS: Final[tuple[str, str, str, str]] = ('gravel', 'sand', 'silt', 'clay')
+
+# Folk (1954), gravel %, sand:mud and silt:clay ratios.
+TRACE_GRAVEL: Final[float] = .01
+GRAVEL_LIMITS: Final[tuple[float, float, float]] = (80, 30, 5)
+SAND_LIMITS: Final[tuple[float, float, float]] = (90, 50, 10)
+SAND_MUD_RATIOS: Final[tuple[float, float, float]] = (9, 1, 1/9)
+SILT_CLAY_RATIOS: Final[tuple[float, float]] = (2, 1/2)
+
+# a class per gravel limit, then the gravel free ones, per sand limit, from the most sandy.
+FOLK_GRAVELLY_CLASSES: Final[tuple[tuple[str,...],...]] = (
+    ('gravel',),
+    ('sandy gravel', 'muddy sandy gravel', 'muddy gravel'),
+    ('gravelly sand', 'gravelly muddy sand', 'gravelly mud'),
+    ('slightly gravelly sand', 'slightly gravelly muddy sand', 'slightly gravelly sandy mud', 'slightly gravelly mud'))
+FOLK_CLASSES: Final[tuple[tuple[str,...],...]] = (
+    ('sand',),
+    ('silty sand', 'muddy sand', 'clayey sand'),
+    ('sandy silt', 'sandy mud', 'sandy clay'),
+    ('silt', 'mud', 'clay'))
+
+# Shepard (1954), the gravel free fractions.
+SHEPARD_MAJOR: Final[float] = 75
+SHEPARD_MINOR: Final[float] = 20
+SHEPARD_CENTRAL_CLASS: Final[str] = 'sand silt clay'
+# the dominant fraction names the class, the second qualifies it, [sand, silt, clay] order.
+SHEPARD_NOUNS: Final[tuple[str, str, str]] = ('sand', 'silt', 'clay')
+SHEPARD_ADJECTIVES: Final[tuple[str, str, str]] = ('sandy', 'silty', 'clayey')
+
+
+def get_fractions(analyzers: Sequence[Analyzer]) -> np.ndarray:
+    """
+    The gravel, sand, silt and clay % of every sample, read off its cumulative curve at the [TEXTURE_BOUNDARIES], no inversion, filled past the sample's phi range, see [Analyzer.get_curve_at].
+    - -> (samples, [TEXTURE_COLUMNS]), NaNs for an empty sample.
+    """
+    _bounds: np.ndarray = np.array(TEXTURE_BOUNDARIES)
+    _cum: np.ndarray = np.array([ana.get_curve_at(_bounds, fill=True) for ana in analyzers]).reshape(-1, _bounds.size)
+    _cum = np.maximum.accumulate(_cum, axis=1)
+
+    return np.diff(_cum, prepend=0.0, append=100.0, axis=1)
+
+
+def _get_gravel_free(fractions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The sand, silt and clay % of the gravel free part of every sample, NaNs if there's none.
+    """
+    _total: np.ndarray = fractions[:, 1:].sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _free: np.ndarray = np.where(_total > 0, fractions[:, 1:]/_total*100, np.nan)
+
+    return (_free[:, 0], _free[:, 1], _free[:, 2])
+
+
+def _by_ratio(numerator: np.ndarray, denominator: np.ndarray, ratios: Sequence[float], classes: Sequence[str]) -> np.ndarray:
+    """
+    Picks one of [classes] per sample, the first whose ratio numerator:denominator reaches, the last otherwise.
+    """
+    return np.select([numerator >= ratio*denominator for ratio in ratios], classes[:-1], classes[-1]).astype(object)
+
+
+def classify_folk(fractions: np.ndarray) -> np.ndarray:
+    """
+    The texture classes, after Folk (1954); the gravel %, then the sand:mud ratio, or, for the gravel free samples, the sand % then the silt:clay ratio.
+    - fractions: as [get_fractions] makes them.
+    - -> a class per sample, '' for an empty one.
+    """
+    _gravel, _sand, _silt, _clay = fractions.T
+    _mud: np.ndarray = _silt+_clay
+    _free_sand, _free_silt, _free_clay = _get_gravel_free(fractions)
+
+    _gravelly: list[np.ndarray] = [np.full(len(fractions), FOLK_GRAVELLY_CLASSES[0][0], dtype=object)]
+    _gravelly += [_by_ratio(_sand, _mud, SAND_MUD_RATIOS[:len(classes)-1], classes) for classes in FOLK_GRAVELLY_CLASSES[1:]]
+    _free: list[np.ndarray] = [np.full(len(fractions), FOLK_CLASSES[0][0], dtype=object)]
+    _free += [_by_ratio(_free_silt, _free_clay, SILT_CLAY_RATIOS, classes) for classes in FOLK_CLASSES[1:]]
+
+    _conditions: list[np.ndarray] = [_gravel >= limit for limit in (*GRAVEL_LIMITS, TRACE_GRAVEL)]
+    _conditions += [_free_sand >= limit for limit in SAND_LIMITS]+[np.isfinite(_free_sand)]
+
+    return np.select(_conditions, _gravelly+_free, '').astype(object)
+
+
+def classify_shepard(fractions: np.ndarray) -> np.ndarray:
+    """
+    The texture classes, after Shepard (1954), of the gravel free part; a fraction of [SHEPARD_MAJOR] % names the class alone, all three of [SHEPARD_MINOR] % make the central class, otherwise the dominant fraction, qualified by the second.
+    - fractions: as [get_fractions] makes them.
+    - -> a class per sample, '' for an empty one.
+    """
+    _free: np.ndarray = np.column_stack(_get_gravel_free(fractions))
+    _valid: np.ndarray = np.isfinite(_free).all(axis=1)
+    _ranked: np.ndarray = np.argsort(-np.nan_to_num(_free), axis=1, kind='stable')
+
+    _names: np.ndarray = np.array([[f'{SHEPARD_ADJECTIVES[second]} {SHEPARD_NOUNS[first]}' for second in range(3)]
+                                   for first in range(3)], dtype=object)
+    _mixed: np.ndarray = _names[_ranked[:, 0], _ranked[:, 1]]
+    _major: np.ndarray = np.array(SHEPARD_NOUNS, dtype=object)[_ranked[:, 0]]
+
+    with np.errstate(invalid='ignore'):
+        _conditions: list[np.ndarray] = [~_valid, _free.max(axis=1) >= SHEPARD_MAJOR, _free.min(axis=1) >= SHEPARD_MINOR]
+
+    return np.select(_conditions, ['', _major, SHEPARD_CENTRAL_CLASS], _mixed).astype(object)
@@ -0,0 +1,152 @@
+"""
+A streaming .xlsx writer, rows are flushed to disk as they're appended, so the memory doesn't grow with the workbook.
+"""
+import math
+import re
+from collections.abc import Iterable, Sequence
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+
+# Constants:
+# sheets
+SHEET_NAME_LIMIT: Final[int] = 31
+INVALID_SHEET_CHARS: Final[str] = r'[\[\]:*?/\\]'
+
+# engines, in order of preference.
+XLSXWRITER: Final[str] = 'xlsxwriter'
+OPENPYXL: Final[str] = 'openpyxl'
+
+
+def get_engine() -> str:
+    """
+    Returns the fastest available streaming engine, xlsxwriter is optional, openpyxl is already needed for importing.
+    """
+    try:
+        import xlsxwriter # noqa: F401
+        return XLSXWRITER
+    except ImportError:
+        return OPENPYXL
+
+
+def _to_cell(value: Any) -> Any:
+    """
+    Turns numpy scalars into python ones and NaNs into empty cells, both engines reject the former and write the latter as errors.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class StreamingWorkbook():
+    """
+    A write only .xlsx workbook, its sheets are appended to row by row, in constant memory.
+    - functions:
+    - `add_sheet`: adds a sheet with a header row.
+    - `append`: appends a row to a sheet.
+    - `append_frame`: appends the rows of a DataFrame to a sheet.
+    - `close`: writes the workbook.
+    """
+    def __init__(self, path: str, engine: str = '') -> None:
+        """
+        A write only .xlsx workbook, its sheets are appended to row by row, in constant memory.
+        - path: the file to write, it's only complete once closed.
+        - engine: [xlsxwriter] or [openpyxl], the fastest available if not given.
+        """
+        self.path = path
+        self.engine: str = engine or get_engine()
+        self._sheets: dict[str, Any] = {}
+        self._rows: dict[str, int] = {}
+
+        match self.engine:
+            case 'xlsxwriter':
+                import xlsxwriter
+                # constant_memory: every sheet streams its rows into a temp file once the next row starts.
+                self._book = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+            case 'openpyxl':
+                import openpyxl
+                self._book = openpyxl.Workbook(write_only=True)
+            case _:
+                raise ValueError(f'unknown workbook engine [{self.engine}]')
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.path=}, {self.engine=}, {len(self._sheets)=})'
+
+    def __enter__(self) -> 'StreamingWorkbook':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _get_sheet_name(self, name: str) -> str:
+        """
+        Makes [name] a valid sheet name, no []:*?/\\ and up to 31 characters, unique regardless of the case.
+        """
+        _name: str = re.sub(INVALID_SHEET_CHARS, '_', name).strip("'") or 'sheet'
+        _name = _name[:SHEET_NAME_LIMIT]
+        _taken: set[str] = {sheet.lower() for sheet in self._sheets}
+
+        _ind: int = 1
+        _unique: str = _name
+        while _unique.lower() in _taken:
+            _suffix: str = f'_{_ind}'
+            _unique = _name[:SHEET_NAME_LIMIT-len(_suffix)]+_suffix
+            _ind += 1
+
+        return _unique
+
+    def add_sheet(self, name: str, header: Sequence[str] = ()) -> str:
+        """
+        Adds a sheet, sheets are ordered as added.
+        - name: the wanted name, it's made valid and unique.
+        - header: the first row, if any.
+        - -> the sheet name used, to append to it.
+        """
+        _name: str = self._get_sheet_name(name)
+
+        match self.engine:
+            case 'xlsxwriter':
+                self._sheets[_name] = self._book.add_worksheet(_name)
+            case 'openpyxl':
+                self._sheets[_name] = self._book.create_sheet(_name)
+        self._rows[_name] = 0
+
+        if header:
+            self.append(_name, header)
+
+        return _name
+
+    def append(self, sheet: str, row: Iterable[Any]) -> None:
+        """
+        Appends the [row] values to the [sheet], rows are final once appended.
+        """
+        _row: list[Any] = [_to_cell(value) for value in row]
+
+        match self.engine:
+            case 'xlsxwriter':
+                self._sheets[sheet].write_row(self._rows[sheet], 0, _row)
+            case 'openpyxl':
+                self._sheets[sheet].append(_row)
+        self._rows[sheet] += 1
+
+    def append_frame(self, sheet: str, frame: pd.DataFrame, leading: Sequence[Any] = ()) -> None:
+        """
+        Appends the [frame] rows to the [sheet], without its header or index.
+        - leading: values to put before every row, a sample name in a long format sheet for example.
+        """
+        _leading: list[Any] = list(leading)
+        for _row in frame.itertuples(index=False, name=None):
+            self.append(sheet, _leading+list(_row))
+
+    def close(self) -> None:
+        """
+        Writes the workbook to [self.path].
+        """
+        match self.engine:
+            case 'xlsxwriter':
+                self._book.close()
+            case 'openpyxl':
+                self._book.save(self.path)
@@ -1,20 +1,24 @@
+import io
 import os
 from typing import Callable, Final
 
 import customtkinter as ctk
+from PIL import Image
 
 from mixins import Defaults, HasToolTip, Observer
 from models import Cache
-from typedefs import SaveObject, Signal
+from typedefs import (ColumnarFormat, ExportMode, GroupBy, SaveObject, Signal,
+                      TableFormat)
 
 from .base_picker import BasePicker, BaseToggle
 from .base_screen import BaseScreen
-from .pickers import DirPicker, DpiPicker, GraphColorPicker, IntervalPicker
+from .pickers import (DirPicker, DpiPicker, GraphColorPicker, IntervalPicker,
+                      OptionPicker)
 
 # Constants
 # screen:
 X_OFFSET: Final[int] = 500
-SCREEN_SIZE: Final[tuple[int,int]] = (450,315)
+SCREEN_SIZE: Final[tuple[int,int]] = (450,610)
 
 # fonts:
 BTN_FRAME_FONT: Final[tuple[str,int]] = ('Arial', 16)
@@ -22,7 +26,7 @@ BTN_FRAME_FONT: Final[tuple[str,int]] = ('Arial', 16)
 # cache:
 KEY: Final[str] = 'final'
 
-_saveobj_cache = Cache(1) # one element cache for one step go back
+_saveobj_cache = Cache(1, name='export_saveobj') # one element cache for one step go back
 
 
 #TODO: a way to remember what we did before, a running singleton of sorts; LTS, Currently the SaveObj does this mission, should it?!.
@@ -31,18 +35,31 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
     The export confirmation dialogue screen.
     - function:
     - `use_global_defaults`: If true, the [ExportScreen] uses the global default values instead of the latest used.
+    - `dry_run_func`: If given, a dry run button plans the export with the current settings, without writing anything.
+    - `preview_func`: If given, low resolution previews of the current sample graphs follow the color and transparency picked, returns pngs.
+    - `queue_func`: If given, a queue button hands the export to the persistent job queue, run in the background, past the app's lifetime.
     """
     def __init__(self, master, state_func: Callable, connection_func: Callable,
-                 save_obj: SaveObject, use_global_defaults: bool = False) -> None:
+                 save_obj: SaveObject, use_global_defaults: bool = False,
+                 dry_run_func: Callable[[SaveObject], None]|None = None,
+                 preview_func: Callable[[str, bool], list[bytes]]|None = None,
+                 queue_func: Callable[[SaveObject], None]|None = None) -> None:
         """
         The export confirmation dialogue screen.
         - use_global_defaults: If true, the [ExportScreen] uses the global default values instead of the latest used.
+        - dry_run_func: If given, a dry run button plans the export with the current settings, without writing anything.
+        - preview_func: If given, low resolution previews of the current sample graphs follow the color and transparency picked, returns pngs.
+        - queue_func: If given, a queue button hands the export to the persistent job queue, run in the background, past the app's lifetime.
         """
         super().__init__(master, title='export screen', approve_label='export', size=SCREEN_SIZE)
         self._master = master
         self._state_func = state_func
         self._state_func(False)
         self._use_blob_def: bool = use_global_defaults
+        self._connection_func = connection_func
+        self._dry_run_func = dry_run_func
+        self._preview_func = preview_func
+        self._queue_func = queue_func
 
         self.approve_btn.configure(command=lambda: self._on_approve(connection_func))
         self.wm_protocol("WM_DELETE_WINDOW", lambda: self._on_close())
@@ -68,10 +85,35 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
                     text='show folder', width=150, state=ctk.DISABLED,
                     command=lambda: self._on_show_btn_pressed())
 
+        self.dry_run_btn: ctk.CTkButton = ctk.CTkButton(self.button_frame,
+                    text='dry run', width=150,
+                    command=lambda: self._on_dry_run())
+
+        self.queue_btn: ctk.CTkButton = ctk.CTkButton(self.button_frame,
+                    text='queue', width=150,
+                    command=lambda: self._on_queue())
+
+        self._progress_bar: ctk.CTkProgressBar = ctk.CTkProgressBar(self.button_frame)
+        self._progress_bar.set(0)
+
         self._qualifiers_frame = ctk.CTkFrame(self.main_frame)
+        self._preview_frame = ctk.CTkFrame(self.main_frame)
+        self._previews: list[ctk.CTkLabel] = [ctk.CTkLabel(self._preview_frame, text='') for _ in range(2)]
 
         # Pickers:
         self._inter_pckr = IntervalPicker(self.main_frame, self._save_obj.get('interval'))
+        self._mode_pckr = OptionPicker(self.main_frame, 'Export as',
+                [mode.value for mode in ExportMode], self._save_obj.get('export_mode'),
+                'per sample: a spreadsheet and graphs per sample.\nworkbook: one project workbook, a summary sheet and the samples data, no graphs.\nstats only: one summary table, the fastest.\ncolumnar data: the samples data and the summary table, for other programs, re-importable.\npdf report: one pdf, a page per sample, its graphs and stats, then the summary.\nstats diagrams: the summary table, a scatter matrix of the stats, colored by sorting, and the sand-silt-clay ternaries.\ngroup envelopes: the percentile bands of the cumulative curves of every group of samples, a table and a graph.')
+        self._table_pckr = OptionPicker(self.main_frame, 'Table format',
+                [format_.value for format_ in TableFormat], self._save_obj.get('table_format'),
+                'The format of the stats only, stats diagrams and group envelopes tables, parquet needs pyarrow.')
+        self._columnar_pckr = OptionPicker(self.main_frame, 'Columnar format',
+                [format_.value for format_ in ColumnarFormat], self._save_obj.get('columnar_format'),
+                'The format of the columnar data export, parquet and feather need pyarrow, h5 needs pytables.')
+        self._group_pckr = OptionPicker(self.main_frame, 'Group by',
+                [group_by.value for group_by in GroupBy], self._save_obj.get('group_by'),
+                'How the samples are grouped for the group envelopes, by the subfolder or the name without its trailing number.')
         self._prfx_pckr = BasePicker(self.main_frame,
                 'Prefix', self._save_obj.get('prefix'),
                 'A prefix to add to the resulting files, [prefix_example_name]')
@@ -79,7 +121,8 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
                 str(self._save_obj.get('dpi')), 'The resolution of the graphs, higher is better')
         self._dir_picker = DirPicker(self.main_frame, 'Export to',
                 self._save_obj.get_results_path(), 'Enable to pick a folder to export into')
-        self._graph_clr_pckr = GraphColorPicker(self.main_frame, self._save_obj.get('color'))  
+        self._graph_clr_pckr = GraphColorPicker(self.main_frame, self._save_obj.get('color'),
+                                                lambda _: self._update_preview())
         
         self._raws_pckr = BaseToggle(self._qualifiers_frame,
                 'Save raw files?', 
@@ -89,10 +132,13 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
                 'Transparent', 
                 self._save_obj.get('transparent'),
                 'Make graph transparent.')
+        self._trans_pckr.val.trace_add('write', lambda *_: self._update_preview())
 
         self._btn_frame_font = ctk.CTkFont(*BTN_FRAME_FONT)
         self.cancel_btn.configure(font=self._btn_frame_font)
         self.approve_btn.configure(font=self._btn_frame_font)
+        self._place_dry_run_btn()
+        self._place_queue_btn()
 
         # Layout:
         # qualifiers_frame:
@@ -101,18 +147,44 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
 
         # main_frame:
         self._inter_pckr.pack(fill='x', padx=2, pady=(2,2))
+        self._mode_pckr.pack(fill='x', padx=2, pady=(0,2))
+        self._table_pckr.pack(fill='x', padx=2, pady=(0,2))
+        self._columnar_pckr.pack(fill='x', padx=2, pady=(0,2))
+        self._group_pckr.pack(fill='x', padx=2, pady=(0,2))
         self._qualifiers_frame.pack(fill='x', padx=2, pady=(2,0))
         self._prfx_pckr.pack(fill='x', padx=2, pady=(2,0))
         self._dpi_picker.pack(fill='x', padx=2, pady=(2,0))
         self._dir_picker.pack(fill='x', padx=2, pady=(2,0))
         self._graph_clr_pckr.pack(fill='x', padx=2, pady=(2,2))
 
+        # preview_frame:
+        if self._preview_func:
+            for _preview in self._previews:
+                _preview.pack(side='left', expand=True, padx=2, pady=2)
+            self._preview_frame.pack(fill='x', padx=2, pady=(0,2))
+            self.htt_tip(self._preview_frame, 'a low resolution preview of the current sample, the export renders at the picked dpi')
+            self._update_preview()
+
     def set_limit(self, val: int) -> None:
         """
         Sets the interval cap, which is the number of active samples.
         """
         self._inter_pckr.set_upper_limit(val)
 
+    def _update_preview(self) -> None:
+        """
+        Renders the graphs previews with the picked color and transparency, the full resolution is only rendered when exporting.
+        """
+        if not self._preview_func or not self.winfo_exists():
+            return
+
+        _pngs: list[bytes] = self._preview_func(self._graph_clr_pckr.get_value(), self._trans_pckr.get_value())
+        for _preview, _png in zip(self._previews, _pngs):
+            _image = Image.open(io.BytesIO(_png))
+            _preview.configure(image=ctk.CTkImage(_image, _image, size=_image.size))
+        if not _pngs:
+            self._previews[0].configure(text='analyze a sample to preview its graphs')
+
     def _update_save_obj(self) -> None:
         """
         Updates the save object.
@@ -125,7 +197,11 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
             color = self._graph_clr_pckr.get_value(),
             dpi = int(self._dpi_picker.get_value()),
             save_raw_files = self._raws_pckr.get_value(),
-            transparent = self._trans_pckr.get_value())
+            transparent = self._trans_pckr.get_value(),
+            export_mode = self._mode_pckr.get_value(),
+            table_format = self._table_pckr.get_value(),
+            columnar_format = self._columnar_pckr.get_value(),
+            group_by = self._group_pckr.get_value())
 
     def _on_approve(self, func: Callable[[SaveObject], None]) -> None:
         """
@@ -136,13 +212,80 @@ class ExportScreen(BaseScreen, Defaults, HasToolTip, Observer):
         
         func(self._save_obj)
 
+    def _place_dry_run_btn(self) -> None:
+        """
+        Shows [self.dry_run_btn] next to the approve button, if there's a [dry_run_func].
+        """
+        if self._dry_run_func is None:
+            return
+        self.dry_run_btn.place(anchor='e', relx=.785, rely=.5, relwidth=.18, relheight=1)
+        self.htt_tip(self.dry_run_btn, 'list what the export would write, and what\'s already up to date, without writing')
+
+    def _on_dry_run(self) -> None:
+        """
+        Plans the export with the current settings, triggered by the dry run button press.
+        """
+        self._update_save_obj()
+
+        self._dry_run_func(self._save_obj)
+
+    def _place_queue_btn(self) -> None:
+        """
+        Shows [self.queue_btn] next to the cancel button, if there's a [queue_func].
+        """
+        if self._queue_func is None:
+            return
+        self.queue_btn.place(anchor='w', relx=.215, rely=.5, relwidth=.18, relheight=1)
+        self.htt_tip(self.queue_btn, 'queue the export, per sample, run in the background, it goes on if the app is closed and resumes after a crash')
+
+    def _on_queue(self) -> None:
+        """
+        Queues the export with the current settings, triggered by the queue button press.
+        """
+        self._update_save_obj()
+
+        self._queue_func(self._save_obj)
+
+    def on_export_started(self, pause_func: Callable[[], bool], cancel_func: Callable[[], None]) -> None:
+        """
+        Turns the approve/cancel buttons into pause/cancel ones and shows the progress bar, for the duration of the export.
+        - pause_func: pauses/resumes the export, returns is paused.
+        - cancel_func: cancels the export.
+        """
+        def _on_pause() -> None:
+            _paused: bool = pause_func()
+            self.approve_btn.configure(text='resume' if _paused else 'pause')
+
+        self.show_btn.place_forget()
+        self.dry_run_btn.place_forget()
+        self.queue_btn.place_forget()
+        self._progress_bar.set(0)
+        self._progress_bar.place(anchor='center', relx=.5, rely=.5, relwidth=.55)
+        self.approve_btn.configure(text='pause', command=_on_pause)
+        self.cancel_btn.configure(text='cancel', command=cancel_func)
+        self.htt_tip(self.approve_btn, 'pause/resume the export')
+
+    def set_progress(self, value: float) -> None:
+        """
+        Sets the progress bar to [value], between 0 and 1.
+        """
+        if self.winfo_exists():
+            self._progress_bar.set(value)
+
     def on_exported(self) -> None:
         """
         Enables [self.show_btn], signal triggered.
         """
+        if not self.winfo_exists():
+            return
+        self._progress_bar.place_forget()
+        self.approve_btn.configure(text='export', command=lambda: self._on_approve(self._connection_func))
+        self.cancel_btn.configure(text='close', command=lambda: self._on_close())
         self.show_btn.configure(state=ctk.NORMAL)
         self.show_btn.place(anchor='n', relx=.5, rely=0, relwidth=.20, relheight=1)
         self.htt_tip(self.show_btn, 'open the results folder in the file explorer')
+        self._place_dry_run_btn()
+        self._place_queue_btn()
 
     def _on_show_btn_pressed(self) -> None:
         """
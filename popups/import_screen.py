@@ -5,7 +5,7 @@ from tkinter import BaseWidget
 from tkinter.filedialog import Open
 
 from mixins import Observer
-from typedefs import FileFormat, LogMsgType, Signal
+from typedefs import ColumnarFormat, FileFormat, LogMsgType, Signal
 
 
 class ImportScreen(Open, BaseWidget, Observer):
@@ -19,7 +19,8 @@ class ImportScreen(Open, BaseWidget, Observer):
     _types: list[tuple[str, list|str]] = [
         ('All data files', _formats),
         ('Comma separated values', f'.{FileFormat.CSV.value}'),
-        ('Excel file', f'.{FileFormat.EXCEL.value}')
+        ('Excel file', f'.{FileFormat.EXCEL.value}'),
+        ('Columnar data', [f'.{i.value}' for i in ColumnarFormat])
         ]
     
     def __init__(self, master, path: str,
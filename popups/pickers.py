@@ -157,6 +157,41 @@ class DpiPicker(BasePicker):
         self._update_value(str(_dpi))
 
 
+class OptionPicker(ctk.CTkFrame, HasToolTip):
+    """
+    Picking one of a few options, from a drop down.
+    """
+    def __init__(self, master, label_txt: str, options: list[str],
+                 default_value: str, tooltip_msg: str = '') -> None:
+        """
+        Picking one of a few options, from a drop down.
+        - label_txt: the label.
+        - options: the options to pick from.
+        - default_value: the picked option at launch, the first option if it isn't one of [options].
+        - tooltip_msg: the text to be shown in the tool tip.
+        """
+        super().__init__(master)
+
+        _value: str = default_value if default_value in options else options[0]
+        self._pick_var: ctk.StringVar = ctk.StringVar(self, value=_value)
+
+        self._label: ctk.CTkLabel = ctk.CTkLabel(self, text=label_txt, width=150, anchor='w')
+        if tooltip_msg:
+            self.htt_tip(self._label, tooltip_msg)
+
+        self._drop_down: ctk.CTkComboBox = ctk.CTkComboBox(self,
+                    values=options, variable=self._pick_var, state='readonly')
+
+        self._label.pack(side='left', padx=(6,2))
+        self._drop_down.pack(side='left', expand=True, fill='x', padx=2, pady=2)
+
+    def get_value(self) -> str:
+        """
+        Returns the picked option.
+        """
+        return self._pick_var.get()
+
+
 class IntervalPicker(ctk.CTkFrame, HasToolTip):
     """
     Picking the interval, which files to save.
@@ -370,11 +405,13 @@ class IntervalPicker(ctk.CTkFrame, HasToolTip):
 class GraphColorPicker(ctk.CTkFrame, Observer):
     """
     Picking the color of the exported graphs/plots.
+    - command: called with the color once it's picked.
     """
-    def __init__(self, master, color: str) -> None:
+    def __init__(self, master, color: str, command: Callable[[str], None]|None = None) -> None:
         super().__init__(master)
 
         self._color: str = color
+        self._command = command
 
         self._toggle: ctk.CTkSwitch = ctk.CTkSwitch(self,
             text='Use preview color', width=150,
@@ -404,6 +441,8 @@ class GraphColorPicker(ctk.CTkFrame, Observer):
         - `color`: hex color.
         """
         self._color = color
+        if self._command:
+            self._command(color)
 
     def get_value(self) -> str:
         """
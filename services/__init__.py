@@ -0,0 +1,4 @@
+"""
+Headless entry points, no tkinter, customtkinter nor pywinstyles; the command line modes, batch, watch, serve, queue and store, and the library api.
+"""
+from .api import analyze_many, store_many
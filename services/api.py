@@ -0,0 +1,131 @@
+"""
+The library api, analyzing samples from python, a notebook say, without the gui nor the export; importing it loads pandas alone, the analysis is loaded by the first call.
+"""
+import os
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from typing import Any, Final
+
+import pandas as pd
+
+from typedefs import AnalysisMethod, SkewnessSchema
+
+# Constants:
+# frames passed without a name are named by their position, unless their [attrs] name them.
+FRAME_NAME: Final[str] = 'sample_{}'
+FRAME_NAME_ATTR: Final[str] = 'name'
+
+# results store, the samples stored per transaction.
+STORE_BATCH_SIZE: Final[int] = 500
+DEFAULT_PROJECT: Final[str] = 'default'
+
+type SampleInput = str|os.PathLike[str]|pd.DataFrame
+
+
+def _get_sources(paths_or_frames: Sequence[SampleInput]|Mapping[str, pd.DataFrame]) -> list[str|tuple[str, pd.DataFrame]]:
+    """
+    The samples as the batch engine takes them, a path, or (name, data) for a frame, see [models.batch.SampleSource].
+    """
+    if isinstance(paths_or_frames, Mapping):
+        return [(str(name), frame) for name, frame in paths_or_frames.items()]
+
+    _sources: list[str|tuple[str, pd.DataFrame]] = []
+    for _ind, _input in enumerate(paths_or_frames):
+        if isinstance(_input, pd.DataFrame):
+            _sources.append((str(_input.attrs.get(FRAME_NAME_ATTR, FRAME_NAME.format(_ind))), _input))
+        else:
+            _sources.append(os.fspath(_input))
+
+    return _sources
+
+
+def _map_jobs(func: Callable[[Any], Any], jobs: list[Any], workers: int, chunk_size: int) -> Iterator[Any]:
+    """
+    Maps [func] over the [jobs], in order, in a pool of worker processes, or in this one if a single worker is asked for; 0 picks the workers and the chunk size.
+    """
+    from models.batch import get_pool, get_pool_params
+
+    _workers, _chunk_size = get_pool_params(workers, chunk_size, len(jobs))
+
+    if _workers == 1:
+        yield from map(func, jobs)
+        return
+    with get_pool(_workers) as pool:
+        yield from pool.imap(func, jobs, _chunk_size)
+
+
+def analyze_many(paths_or_frames: Sequence[SampleInput]|Mapping[str, pd.DataFrame], workers: int = 0,
+                 method: AnalysisMethod|None = None, schema: SkewnessSchema = SkewnessSchema.OBSERVATIONAL,
+                 chunk_size: int = 0) -> pd.DataFrame:
+    """
+    Analyzes the samples, in a pool of worker processes, into a tidy frame, a row per sample, in order.
+    - paths_or_frames: sample files, or frames laid out as a sample file is, [phi, wht]; a mapping names the frames, otherwise their [attrs['name']] does, or their position.
+    - workers: the number of worker processes, 0 uses every core, 1 analyzes in this process.
+    - method: None picks the graphical method where it's valid, see [Analyzer]; a sample the forced method fails on is reported in [error].
+    - schema: the verbal interpretation of the skewness.
+    - chunk_size: the samples handed to a worker at once, 0 picks one based on the number of samples.
+    - -> the [source] path, '' for a frame, the summary columns, see [models.batch.SUMMARY_COLUMNS], and the [error] massage, '' if the sample went through, its stats are NaN otherwise.
+    """
+    from models.batch import SUMMARY_COLUMNS, summarize_source
+
+    if method is AnalysisMethod.TWO_POINTS:
+        raise ValueError(f'{method} is set by the sample data, it can\'t be forced')
+
+    _sources = _get_sources(paths_or_frames)
+    _jobs = [(source, method, schema) for source in _sources]
+
+    _rows: list[dict] = []
+    for _source, (_name, _row, _error) in zip(_sources, _map_jobs(summarize_source, _jobs, workers, chunk_size)):
+        _rows.append({'source': _source if isinstance(_source, str) else '',
+                      **(_row or {'sample': _name}),
+                      'error': _error})
+
+    return pd.DataFrame(_rows, columns=['source', *SUMMARY_COLUMNS, 'error'])
+
+
+def store_many(paths_or_frames: Sequence[SampleInput]|Mapping[str, pd.DataFrame], path: str = '', project: str = DEFAULT_PROJECT,
+               workers: int = 0, method: AnalysisMethod|None = None, schema: SkewnessSchema = SkewnessSchema.OBSERVATIONAL,
+               chunk_size: int = 0, settings: Mapping[str, Any]|None = None) -> tuple[int, int, list[tuple[str, str]]]:
+    """
+    Analyzes the samples, in a pool of worker processes, as [analyze_many] does, and stores them, their data, stats and provenance, in a results store, in bulk, see [models.results_store].
+    - path: the store file, the one in the app config dir if ''.
+    - project: the project the samples are stored under, a sample already stored in it, with the same content and settings, is skipped.
+    - settings: kept with the samples as their provenance, on top of the method and schema.
+    - -> (the number of samples stored, the number skipped, the failed ones as (sample name, error massage)).
+    """
+    from mixins.defaults import RESULTS_DB_PATH
+    from models.batch import record_source
+    from models.results_store import ResultsStore, StoredSample
+
+    if method is AnalysisMethod.TWO_POINTS:
+        raise ValueError(f'{method} is set by the sample data, it can\'t be forced')
+
+    _sources = _get_sources(paths_or_frames)
+    _jobs = [(source, method, schema) for source in _sources]
+    _settings: dict[str, Any] = {'method': method.value if method else None, 'schema': schema.name, **(settings or {})}
+    _store = ResultsStore(path or RESULTS_DB_PATH)
+    _batch: list[StoredSample] = []
+    _stored: int = 0
+    _skipped: int = 0
+    _errors: list[tuple[str, str]] = []
+
+    def _flush() -> None:
+        nonlocal _stored, _skipped
+        _added, _existing = _store.add_many(_batch, project, _settings)
+        _stored += _added
+        _skipped += _existing
+        _batch.clear()
+
+    try:
+        for _source, (_name, _data, _row, _hash, _error) in zip(_sources, _map_jobs(record_source, _jobs, workers, chunk_size)):
+            if _row is None:
+                _errors.append((_name, _error))
+                continue
+            _batch.append((os.path.abspath(_source) if isinstance(_source, str) else '', _data, _row, _hash))
+            if len(_batch) >= STORE_BATCH_SIZE:
+                _flush()
+    finally:
+        if _batch:
+            _flush()
+        _store.close()
+
+    return (_stored, _skipped, _errors)
@@ -0,0 +1,525 @@
+"""
+The command line, headless, modes: python auto_gsa.py batch [inputs] -o [out dir], python auto_gsa.py watch [dir] -o [out dir], python auto_gsa.py serve, python auto_gsa.py queue submit|run|status, python auto_gsa.py store add|find.
+- the analysis and export modules are only imported once the arguments are parsed, --help is instant.
+"""
+import argparse
+import glob
+import os
+import signal
+import sys
+import time
+from collections.abc import Sequence
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Final
+
+from mixins.defaults import DEFAULT_CLR, JOBS_DB_PATH, RESULTS_DB_PATH
+from typedefs import (AnalysisMethod, ColumnarFormat, ExportMode, GroupBy, JobKind, SaveObject, SkewnessSchema,
+                      TableFormat)
+
+if TYPE_CHECKING:
+    from mixins.exporter import CanExport
+    from services.watcher import WatchBatch
+
+# Constants:
+# as [mixins.defaults] sets them for the gui, the headless mode never reads nor writes the gui config.
+DEFAULT_PREFIX: Final[str] = 'results_'
+DEFAULT_DPI: Final[int] = 300
+DEFAULT_RESULTS_DIR_NAME: Final[str] = 'analysis_results'
+DEFAULT_RAW_DIR_NAME: Final[str] = 'raw_files'
+
+# progress, a line every [PROGRESS_STEPS]th of the samples.
+PROGRESS_STEPS: Final[int] = 20
+GLOB_CHARS: Final[str] = '*?['
+
+# results store, the columns printed, the rest are in the saved table.
+FOUND_COLUMNS: Final[list[str]] = ['id', 'project', 'sample', 'method', 'mean', 'std', 'skewness', 'kurtosis', 'sorting', 'folk_class']
+
+
+def _add_export_arguments(parser: argparse.ArgumentParser, pool: bool = True) -> None:
+    """
+    The export settings the exporting commands share, see [SaveObject].
+    - pool: the command runs the export, it takes the pool settings.
+    """
+    parser.add_argument('-o', '--out', required=pool, help='the dir the results dir is created in.')
+    parser.add_argument('--results-dir-name', default=DEFAULT_RESULTS_DIR_NAME, help='the results dir, within [--out].')
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX, help='prepended to the results files names.')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='the png graphs resolution.')
+    parser.add_argument('--color', default=DEFAULT_CLR, help='the graphs color.')
+    parser.add_argument('--raw', action='store_true', help='also save the raw files, un-interpreted sheets and svg graphs.')
+    parser.add_argument('--transparent', action='store_true', help='transparent png graphs.')
+    if pool:
+        parser.add_argument('--workers', type=int, default=0, help='worker processes, 0 uses every core, 1 runs in this one.')
+        parser.add_argument('--chunk-size', type=int, default=0, help='samples handed to a worker at once, 0 picks one.')
+        parser.add_argument('-q', '--quiet', action='store_true', help='only print the errors and the final stats.')
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """
+    The command line, a sub command per headless mode.
+    """
+    _parser = argparse.ArgumentParser(prog='auto_gsa.py', description='AutoGSA, grain size analysis; no arguments starts the gui.')
+    _commands = _parser.add_subparsers(dest='command', required=True)
+
+    _batch = _commands.add_parser('batch', help='analyze and export samples headless.',
+                                  description='Analyzes and exports the samples, as the gui export does, without a display.')
+    _batch.add_argument('inputs', nargs='+', help='sample files, dirs of samples or globs, quoted to leave them to auto_gsa, ** recurses.')
+    # the modes by their names, the gui labels have spaces.
+    _batch.add_argument('--mode', default=ExportMode.PER_SAMPLE.name.lower(), choices=[mode.name.lower() for mode in ExportMode],
+                        help='what the export produces, see [typedefs.ExportMode].')
+    _batch.add_argument('--table-format', default=TableFormat.CSV.value, choices=[format_.value for format_ in TableFormat],
+                        help='the format of the summary tables.')
+    _batch.add_argument('--columnar-format', default=ColumnarFormat.PARQUET.value, choices=[format_.value for format_ in ColumnarFormat],
+                        help='the format of the columnar export.')
+    _batch.add_argument('--group-by', default=GroupBy.SUBFOLDER.value, choices=[group.value for group in GroupBy],
+                        help='how the samples are grouped for the group envelopes.')
+    _add_export_arguments(_batch)
+
+    _watch = _commands.add_parser('watch', help='analyze and export samples as they land in a dir.',
+                                  description='Watches a dir, exporting every new or changed sample, per sample, once it\'s fully written, '
+                                              'and appending its stats to a running summary table, see [services.watcher].')
+    _watch.add_argument('dir', help='the dir to watch.')
+    _watch.add_argument('--interval', type=float, default=None, help='seconds between scans, while files change.')
+    _watch.add_argument('--max-interval', type=float, default=None, help='seconds between scans, backed off to, while nothing changes.')
+    _watch.add_argument('--debounce', type=float, default=None, help='seconds a file is left unchanged before it\'s taken.')
+    _watch.add_argument('--once', action='store_true', help='process what\'s in the dir, then exit.')
+    _add_export_arguments(_watch)
+
+    # None leaves the service defaults, see [services.server], importing it here would slow every command down.
+    _serve = _commands.add_parser('serve', help='serve the analysis over http.',
+                                  description='Serves the analysis over http, POST /analyze, GET /health, see [services.server].')
+    _serve.add_argument('--host', default=None, help='the address to listen on, localhost by default, 0.0.0.0 for every interface.')
+    _serve.add_argument('--port', type=int, default=None, help='the port to listen on, 0 picks a free one.')
+    _serve.add_argument('--workers', type=int, default=0, help='worker processes, 0 uses every core.')
+    _serve.add_argument('--max-pending', type=int, default=None, help='queued samples past which requests are refused, 503.')
+    _serve.add_argument('--batch-size', type=int, default=None, help='samples mapped over the pool at once.')
+    _serve.add_argument('--batch-wait-ms', type=float, default=None, help='how long a batch waits to fill up.')
+    _serve.add_argument('--cache-size', type=int, default=None, help='results cached, in samples.')
+    _serve.add_argument('-v', '--verbose', action='store_true', help='log every request.')
+
+    _queue = _commands.add_parser('queue', help='a persistent job queue, for campaigns too big for one sitting.',
+                                  description='Queues a job per sample in a local file, runners work through it and resume after a crash '
+                                              'or a reboot, see [models.job_queue].')
+    _queue.add_argument('--db', default=JOBS_DB_PATH, help='the queue file, shared with the gui by default.')
+    _queue_commands = _queue.add_subparsers(dest='queue_command', required=True)
+
+    _submit = _queue_commands.add_parser('submit', help='queue a job per sample.')
+    _submit.add_argument('inputs', nargs='+', help='sample files, dirs of samples or globs, as [batch] takes them.')
+    _submit.add_argument('--kind', default=JobKind.EXPORT.value, choices=[kind.value for kind in JobKind],
+                         help='export the samples, per sample, into [-o], or analyze them alone, see [queue results].')
+    _submit.add_argument('--campaign', default='', help='the campaign name, adding to it if it exists; named after the samples dir otherwise.')
+    _submit.add_argument('--attempts', type=int, default=None, help='how many times a failing job runs before it\'s failed for good.')
+    _add_export_arguments(_submit, pool=False)
+
+    _run = _queue_commands.add_parser('run', help='run the queued jobs, until interrupted.')
+    _run.add_argument('--workers', type=int, default=0, help='worker processes, 0 uses every core, 1 runs in this one.')
+    _run.add_argument('--chunk-size', type=int, default=1, help='jobs handed to a worker at once.')
+    _run.add_argument('--until-empty', action='store_true', help='exit once no job is left queued.')
+    _run.add_argument('-q', '--quiet', action='store_true', help='only print the errors and the final stats.')
+
+    _queue_commands.add_parser('status', help='the campaigns progress, and the live runners.')
+    for _command, _help in (('pause', 'hold the queued jobs'), ('resume', 'queue the held jobs again'),
+                            ('cancel', 'drop the queued and held jobs'), ('retry', 'queue the failed and cancelled jobs again')):
+        _queue_commands.add_parser(_command, help=f'{_help}.').add_argument('campaign', nargs='?', default=None,
+                                                                          help='the campaign, every one if left out.')
+    _results = _queue_commands.add_parser('results', help='save the results of a campaign\'s done jobs.')
+    _results.add_argument('campaign', help='the campaign.')
+    _results.add_argument('-o', '--out', default='', help='the .csv to save into, printed otherwise.')
+
+    _store = _commands.add_parser('store', help='a results store, every project\'s samples, queried by their stats.',
+                                  description='Stores the samples data, stats, method, interpretation and provenance in a local file, '
+                                              'indexed by their stats, see [models.results_store].')
+    _store.add_argument('--db', default=RESULTS_DB_PATH, help='the store file.')
+    _store_commands = _store.add_subparsers(dest='store_command', required=True)
+
+    _add = _store_commands.add_parser('add', help='analyze samples into the store, in bulk.')
+    _add.add_argument('inputs', nargs='+', help='sample files, dirs of samples or globs, as [batch] takes them.')
+    _add.add_argument('--project', default='', help='the project the samples are stored under, named after the samples dir otherwise.')
+    # the moments method and the graphical one, two points is set by the data.
+    _add.add_argument('--method', default=None, choices=[method.name.lower() for method in AnalysisMethod if method is not AnalysisMethod.TWO_POINTS],
+                      help='force an analysis method, picked per sample otherwise.')
+    _add.add_argument('--schema', default=SkewnessSchema.OBSERVATIONAL.name.lower(), choices=[schema.name.lower() for schema in SkewnessSchema],
+                      help='the skewness interpretation schema.')
+    _add.add_argument('--workers', type=int, default=0, help='worker processes, 0 uses every core, 1 runs in this one.')
+    _add.add_argument('--chunk-size', type=int, default=0, help='samples handed to a worker at once, 0 picks one.')
+
+    _find = _store_commands.add_parser('find', help='the stored samples matching filters.',
+                                       description='The stored samples matching every filter, e.g. find std=:0.5 mean=1:2 sorting="poorly sorted".')
+    _find.add_argument('filters', nargs='*', help='[stat]=[min]:[max], either side may be left out, or [label]=[value].')
+    _find.add_argument('--where', default='', help='an sql condition over the result columns, instead of the filters.')
+    _find.add_argument('--project', default=None, help='only the samples of the project.')
+    _find.add_argument('--order-by', default=None, help='a result column, descending if it starts with -, as --order-by=-mean.')
+    _find.add_argument('--limit', type=int, default=None, help='at most as many samples.')
+    _find.add_argument('-o', '--out', default='', help='the .csv to save every result column into, printed otherwise.')
+
+    _store_commands.add_parser('projects', help='the projects stored, and their number of samples.')
+    _store_commands.add_parser('remove', help='forget a project\'s samples.').add_argument('project', help='the project.')
+
+    return _parser
+
+
+def expand_inputs(inputs: Sequence[str]) -> tuple[list[str], list[str]]:
+    """
+    The sample files the [inputs] point at, in order, once each; a dir is its valid files, as the gui lists them, a glob its matches.
+    - -> (sample paths, the inputs that matched nothing).
+    """
+    from mixins.validator import Validator
+
+    _validator = Validator()
+    _paths: dict[str, None] = {}
+    _missing: list[str] = []
+
+    for _input in inputs:
+        if any(char in _input for char in GLOB_CHARS):
+            _found: list[str] = sorted(glob.glob(_input, recursive=True))
+        elif os.path.isdir(_input):
+            _found = [os.path.join(_input, file_) for file_ in sorted(os.listdir(_input))]
+        else:
+            _found = [_input] if os.path.isfile(_input) else []
+
+        # columnar files are many samples, the gui unpacks them on import, see [Validator.val_handle_columnar].
+        _valid: list[str] = [os.path.abspath(path) for path in _found if os.path.isfile(path)
+                             and _validator.val_samples(*os.path.split(path)) and not _validator.val_is_columnar(os.path.basename(path))]
+        if not _valid:
+            _missing.append(_input)
+        _paths.update(dict.fromkeys(_valid))
+
+    return (list(_paths), _missing)
+
+
+def _get_save_obj(args: argparse.Namespace, files_path: str, **kwargs: Any) -> SaveObject:
+    """
+    The export settings, from the command line.
+    - files_path: the samples dir.
+    - kwargs: the settings of the command, the export mode and its formats.
+    - a command without the pool settings leaves them to whoever runs the export, without [-o] the results go in the working dir.
+    """
+    return SaveObject(prefix=args.prefix,
+                      files_path=files_path,
+                      results_path=os.path.abspath(args.out or ''),
+                      results_dir_name=args.results_dir_name,
+                      raw_results_dir_name=DEFAULT_RAW_DIR_NAME,
+                      color=args.color,
+                      dpi=args.dpi,
+                      save_raw_files=args.raw,
+                      interval=(0, []),
+                      transparent=args.transparent,
+                      workers=getattr(args, 'workers', 0),
+                      chunk_size=getattr(args, 'chunk_size', 0),
+                      ordered=True,
+                      **kwargs)
+
+
+def run_batch(args: argparse.Namespace, started: float) -> int:
+    """
+    Exports the samples the [args] point at, printing the progress, the errors and the throughput at the end; a first ctrl+c stops handing out samples, what's done is kept.
+    - started: when the process started, for the startup time.
+    - -> the exit code, 0 if every sample went through, 1 if any failed, 2 if there were no samples.
+    """
+    _paths, _missing = expand_inputs(args.inputs)
+    for _input in _missing:
+        print(f'<!> Warning: no samples in [{_input}]', file=sys.stderr)
+    if not _paths:
+        print('<!> Error: no samples to analyze.', file=sys.stderr)
+        return 2
+
+    from models.manifest import format_clashes, get_name_clashes
+
+    # dirs and globs may pick up samples of the same name, their results would overwrite each other.
+    if ExportMode[args.mode.upper()] is ExportMode.PER_SAMPLE and (_clashes := get_name_clashes(_paths)):
+        print(f'<!> Error: samples exported under the same name, {format_clashes(_clashes)}', file=sys.stderr)
+        return 2
+
+    import matplotlib
+
+    from mixins.exporter import CanExport
+    from models.batch import HEADLESS_BACKEND
+    matplotlib.use(HEADLESS_BACKEND)
+
+    _save_obj: SaveObject = _get_save_obj(args, os.path.commonpath([os.path.dirname(path) for path in _paths]),
+                                          export_mode=ExportMode[args.mode.upper()].value, table_format=args.table_format,
+                                          columnar_format=args.columnar_format, group_by=args.group_by)
+    _exporter: CanExport = CanExport()
+    _workers: int = _exporter._get_pool_params(_save_obj, len(_paths))[0]
+    _failed: list[tuple[str, str]] = []
+    _every: int = max(1, len(_paths)//PROGRESS_STEPS)
+    _cancelled: list[bool] = [False]
+
+    def _on_progress(done: int, total: int, name: str, error: str) -> None:
+        if error:
+            _failed.append((name, error))
+            print(f'<!> Error: {name}: {error}', file=sys.stderr)
+        if not args.quiet and (done % _every == 0 or done == total):
+            print(f'  {done:>{len(str(total))}}/{total} {time.perf_counter()-_start:8.2f}s', flush=True)
+
+    def _on_interrupt(signum: int, frame: FrameType|None) -> None:
+        if _cancelled[0]:
+            raise KeyboardInterrupt
+        _cancelled[0] = True
+        print('<!> Warning: stopping, the samples in flight are finished, ctrl+c again to abort.', file=sys.stderr)
+
+    _startup: float = time.perf_counter()-started
+    if not args.quiet:
+        print(f'{len(_paths)} samples, [{_save_obj.export_mode}], {_workers} workers, into [{_save_obj.get_results_path()}]')
+
+    _previous_handler = signal.signal(signal.SIGINT, _on_interrupt)
+    _start: float = time.perf_counter()
+    try:
+        _saved, _skipped = _exporter.ce_export(_paths, _save_obj, _on_progress, lambda: not _cancelled[0])
+    finally:
+        signal.signal(signal.SIGINT, _previous_handler)
+    _elapsed: float = time.perf_counter()-_start
+
+    _done: int = _saved+_skipped+len(_failed)
+    print(f'{_done}/{len(_paths)} samples in {_elapsed:.2f}s, {_done/_elapsed if _elapsed else 0:.1f} samples/s, '
+          f'{_elapsed/max(1, _done)*1000:.1f}ms/sample, {_workers} workers')
+    print(f'  saved {_saved}, up to date {_skipped}, failed {len(_failed)}, startup {_startup:.2f}s'
+          f'{', cancelled' if _cancelled[0] else ''}')
+
+    return 1 if _failed or _cancelled[0] else 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """
+    Watches the dir, exporting its samples as they land, until interrupted or, with [--once], until it's done; a line per processed batch.
+    - -> the exit code, 1 if any sample failed, 2 if the dir is missing.
+    """
+    if not os.path.isdir(args.dir):
+        print(f'<!> Error: no dir at [{args.dir}]', file=sys.stderr)
+        return 2
+
+    import matplotlib
+
+    from models.batch import HEADLESS_BACKEND
+    from services import watcher
+    matplotlib.use(HEADLESS_BACKEND)
+
+    _save_obj: SaveObject = _get_save_obj(args, os.path.abspath(args.dir), export_mode=ExportMode.PER_SAMPLE.value)
+    _watcher = watcher.FolderWatcher(
+        _save_obj,
+        interval=watcher.DEFAULT_INTERVAL_S if args.interval is None else args.interval,
+        max_interval=watcher.DEFAULT_MAX_INTERVAL_S if args.max_interval is None else args.max_interval,
+        debounce=watcher.DEFAULT_DEBOUNCE_S if args.debounce is None else args.debounce)
+
+    def _on_batch(batch: 'WatchBatch') -> None:
+        _done, _appended, _errors, _elapsed = batch
+        for _name, _error in _errors:
+            print(f'<!> Error: {_name}: {_error}', file=sys.stderr)
+        if not args.quiet:
+            print(f'{time.strftime('%H:%M:%S')} {_done} samples, {_appended} exported, {len(_errors)} failed, '
+                  f'{_elapsed:.2f}s, {_done/_elapsed if _elapsed else 0:.1f} samples/s', flush=True)
+
+    def _on_stop(signum: int, frame: FrameType|None) -> None:
+        _watcher.stop()
+
+    for _signal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(_signal, _on_stop)
+    if not args.quiet:
+        print(f'watching [{_save_obj.files_path}], into [{_save_obj.get_results_path()}], summary [{_watcher.summary_path}]', flush=True)
+
+    _watcher.run(_on_batch, args.once)
+    print(f'{_watcher.processed} samples, {_watcher.failed} failed, {_watcher.scans} scans')
+
+    return 1 if _watcher.failed else 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """
+    Serves the analysis over http until interrupted, see [services.server].
+    - -> the exit code.
+    """
+    from services import server
+
+    _service = server.AnalysisService(
+        workers=args.workers,
+        max_pending=server.DEFAULT_MAX_PENDING if args.max_pending is None else args.max_pending,
+        batch_size=server.DEFAULT_BATCH_SIZE if args.batch_size is None else args.batch_size,
+        batch_wait=server.DEFAULT_BATCH_WAIT_S if args.batch_wait_ms is None else args.batch_wait_ms/1000,
+        cache_size=server.DEFAULT_CACHE_SIZE if args.cache_size is None else args.cache_size)
+    _service.start()
+    server.serve(server.DEFAULT_HOST if args.host is None else args.host,
+                 server.DEFAULT_PORT if args.port is None else args.port, _service, args.verbose)
+
+    return 0
+
+
+def run_queue(args: argparse.Namespace) -> int:
+    """
+    Runs a [queue] sub command, see [models.job_queue] and [services.job_runner]; [run] stops handing out jobs on ctrl+c, the ones in flight are finished.
+    - -> the exit code, 1 if a run had failures, 2 if there was nothing to queue.
+    """
+    from models.job_queue import DEFAULT_MAX_ATTEMPTS, JobQueue
+
+    _queue = JobQueue(args.db)
+    match args.queue_command:
+        case 'submit':
+            _paths, _missing = expand_inputs(args.inputs)
+            for _input in _missing:
+                print(f'<!> Warning: no samples in [{_input}]', file=sys.stderr)
+            if not _paths or (args.kind == JobKind.EXPORT.value and not args.out):
+                print('<!> Error: no samples to queue.' if not _paths else '<!> Error: an export needs [-o].', file=sys.stderr)
+                return 2
+            _save_obj: SaveObject = _get_save_obj(args, os.path.commonpath([os.path.dirname(path) for path in _paths]),
+                                                  export_mode=ExportMode.PER_SAMPLE.value)
+            try:
+                _campaign: str = _queue.submit(_paths, _save_obj, JobKind(args.kind), args.campaign,
+                                               DEFAULT_MAX_ATTEMPTS if args.attempts is None else args.attempts)
+            except ValueError as e:
+                print(f'<!> Error: {e}', file=sys.stderr)
+                return 2
+            print(f'{len(_paths)} jobs queued, campaign [{_campaign}], in [{args.db}]')
+
+        case 'run':
+            import matplotlib
+
+            from models.batch import HEADLESS_BACKEND
+            from services.job_runner import JobRunner
+            matplotlib.use(HEADLESS_BACKEND)
+
+            _runner = JobRunner(args.db, args.workers, args.chunk_size)
+            _start: float = time.perf_counter()
+
+            def _on_progress(done: int, failed: int, path: str, error: str) -> None:
+                if error:
+                    print(f'<!> Error: {os.path.basename(path)}: {error}', file=sys.stderr)
+                if not args.quiet and (done+failed) % PROGRESS_STEPS == 0:
+                    print(f'  {done} done, {failed} failed, {time.perf_counter()-_start:8.2f}s', flush=True)
+
+            def _on_stop(signum: int, frame: FrameType|None) -> None:
+                _runner.stop()
+
+            for _signal in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(_signal, _on_stop)
+            if not args.quiet:
+                print(f'runner [{_runner.runner_id}], {_runner.workers} workers, on [{args.db}]', flush=True)
+
+            _done, _failed = _runner.run(_on_progress, args.until_empty)
+            _elapsed: float = time.perf_counter()-_start
+            print(f'{_done} done, {_failed} failed, in {_elapsed:.2f}s, {(_done+_failed)/_elapsed if _elapsed else 0:.1f} jobs/s')
+            return 1 if _failed else 0
+
+        case 'status':
+            import pandas as pd
+
+            with pd.option_context('display.max_columns', None, 'display.width', None, 'display.max_colwidth', 48):
+                print(_queue.get_progress().to_string(index=False, float_format='{:.1f}'.format))
+            _runners: list[str] = _queue.get_live_runners()
+            print(f'{len(_runners)} live runners{': ' if _runners else ''}{', '.join(_runners)}')
+
+        case 'pause' | 'resume' | 'cancel' | 'retry':
+            _changed: int = getattr(_queue, args.queue_command)(args.campaign)
+            print(f'{args.queue_command}: {_changed} jobs, {f'campaign [{args.campaign}]' if args.campaign else 'every campaign'}')
+
+        case 'results':
+            _frame = _queue.get_results(args.campaign)
+            if args.out:
+                _frame.to_csv(args.out, index=False)
+                print(f'{len(_frame)} rows saved into [{args.out}]')
+            else:
+                print(_frame.to_string(index=False))
+
+    return 0
+
+
+def _parse_filters(filters: Sequence[str]) -> dict[str, tuple[float|None, float|None]|str]:
+    """
+    The [store find] filters, [stat]=[min]:[max] as a (min, max) bound, [label]=[value] as is.
+    """
+    _bounds: dict[str, tuple[float|None, float|None]|str] = {}
+    for _filter in filters:
+        _column, _, _value = _filter.partition('=')
+        _low, _colon, _high = _value.partition(':')
+        try:
+            _bounds[_column] = (float(_low) if _low else None, float(_high) if _high else None) if _colon else _value
+        except ValueError:
+            _bounds[_column] = _value
+    return _bounds
+
+
+def run_store(args: argparse.Namespace) -> int:
+    """
+    Runs a [store] sub command, see [models.results_store].
+    - -> the exit code, 1 if any sample failed, 2 if there was nothing to store or the query is invalid.
+    """
+    import sqlite3
+
+    from models.results_store import ResultsStore
+
+    match args.store_command:
+        case 'add':
+            from services.api import store_many
+
+            _paths, _missing = expand_inputs(args.inputs)
+            for _input in _missing:
+                print(f'<!> Warning: no samples in [{_input}]', file=sys.stderr)
+            if not _paths:
+                print('<!> Error: no samples to store.', file=sys.stderr)
+                return 2
+
+            _project: str = args.project or os.path.basename(os.path.commonpath([os.path.dirname(path) for path in _paths]))
+            _start: float = time.perf_counter()
+            _stored, _skipped, _errors = store_many(_paths, args.db, _project, args.workers,
+                                                    AnalysisMethod[args.method.upper()] if args.method else None,
+                                                    SkewnessSchema[args.schema.upper()], args.chunk_size)
+            _elapsed: float = time.perf_counter()-_start
+            for _name, _error in _errors:
+                print(f'<!> Error: {_name}: {_error}', file=sys.stderr)
+            print(f'{len(_paths)} samples in {_elapsed:.2f}s, {len(_paths)/_elapsed if _elapsed else 0:.1f} samples/s, into [{args.db}], '
+                  f'project [{_project}]')
+            print(f'  stored {_stored}, already stored {_skipped}, failed {len(_errors)}')
+            return 1 if _errors else 0
+
+        case 'find':
+            _store = ResultsStore(args.db)
+            _start = time.perf_counter()
+            try:
+                if args.where and args.filters:
+                    raise ValueError('either filters or [--where], not both')
+                _found = _store.query(args.where, (), args.project, args.limit, args.order_by) if args.where \
+                    else _store.find(args.project, None, args.limit, args.order_by, **_parse_filters(args.filters))
+            except (ValueError, sqlite3.Error) as e:
+                print(f'<!> Error: {e}', file=sys.stderr)
+                return 2
+            _elapsed = time.perf_counter()-_start
+
+            if args.out:
+                _found.to_csv(args.out, index=False)
+                print(f'{len(_found)} samples saved into [{args.out}]')
+            else:
+                print(_found[FOUND_COLUMNS].to_string(index=False))
+            print(f'{len(_found)} samples in {_elapsed*1000:.1f}ms', file=sys.stderr)
+
+        case 'projects':
+            print(ResultsStore(args.db).get_projects().to_string(index=False))
+
+        case 'remove':
+            print(f'removed {ResultsStore(args.db).remove_project(args.project)} samples of [{args.project}]')
+
+    return 0
+
+
+def main(argv: Sequence[str]|None = None, started: float|None = None) -> int:
+    """
+    Runs the command line, [argv] without the program name, sys.argv otherwise.
+    - started: when the process started, now otherwise.
+    - -> the exit code.
+    """
+    _started: float = time.perf_counter() if started is None else started
+    _args = _get_parser().parse_args(argv)
+
+    match _args.command:
+        case 'batch':
+            return run_batch(_args, _started)
+        case 'watch':
+            return run_watch(_args)
+        case 'serve':
+            return run_serve(_args)
+        case 'queue':
+            return run_queue(_args)
+        case 'store':
+            return run_store(_args)
+
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
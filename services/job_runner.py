@@ -0,0 +1,217 @@
+"""
+The queue runner, works through the persistent job queue, see [models.job_queue], until stopped, or until it's empty: python auto_gsa.py queue run.
+- jobs are claimed a few at a time, as the pool of worker processes pulls them, so runners sharing the queue split it between them.
+- the runner beats while it works, if it dies, the jobs it held go back to the queue once its heartbeat is stale, a restarted runner picks them up.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, Final
+
+from mixins.exporter import CanExport, _export_sample, _get_manifest_key
+from models import ExportManifest
+from models.batch import summarize_path
+from models.job_queue import STALE_RUNNER_S, FinishedJob, JobQueue, QueuedJob, get_runner_id
+from models.manifest import ManifestEntry
+from typedefs import JobKind, JobState, SaveObject
+
+# Constants:
+# a few beats per stale period, a busy disk delaying one isn't taken for a death.
+HEARTBEAT_S: Final[float] = STALE_RUNNER_S/6
+# jobs claimed at once, per worker, few enough for other runners to get their share.
+CLAIMS_PER_WORKER: Final[int] = 4
+# the outcomes are recorded in batches, one transaction each, at least once a second while jobs finish.
+FINISH_EVERY: Final[int] = 32
+FINISH_EVERY_S: Final[float] = 1.0
+# polling an empty queue backs off.
+IDLE_POLL_S: Final[float] = .5
+MAX_IDLE_POLL_S: Final[float] = 8.0
+IN_FLIGHT_POLL_S: Final[float] = .05
+
+# (job id, kind, sample path, settings, the sample's manifest entry)
+type RunnerJob = tuple[int, JobKind, str, SaveObject, ManifestEntry|None]
+# (job id, manifest key, error massage, seconds, result, the new manifest entry)
+type RunnerResult = tuple[int, str, str, float, Any, ManifestEntry|None]
+# (done, failed, sample path, error massage)
+type RunnerProgress = Callable[[int, int, str, str], None]
+
+
+def _run_job(job: RunnerJob) -> RunnerResult:
+    """
+    The worker side of the runner, an analyze job summarizes the sample, an export one exports it, as [_export_sample] does, unless it's up to date.
+    - -> (job id, manifest key, error massage, seconds, result, the new manifest entry), the result is the summary row, or the written files.
+    """
+    _id, _kind, _path, _save_obj, _entry = job
+    _start: float = time.perf_counter()
+
+    if _kind is JobKind.ANALYZE:
+        _, _row, _error = summarize_path(_path)
+        return (_id, '', _error, time.perf_counter()-_start, _row, None)
+
+    _key, _, _error, _new_entry = _export_sample((_path, _save_obj, _entry))
+    _result: dict[str, Any] = {'artifacts': _new_entry['artifacts'] if _new_entry else [],
+                               'up_to_date': not _error and _new_entry is None}
+    return (_id, _key, _error, time.perf_counter()-_start, _result, _new_entry)
+
+
+def spawn_runner(db_path: str, workers: int = 0) -> subprocess.Popen:
+    """
+    Starts a runner in a process of its own, detached, it outlives the caller, the gui say, and exits once the queue is empty.
+    """
+    _root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _args: list[str] = [sys.executable, '-m', 'services.cli', 'queue', '--db', db_path, 'run', '--until-empty', '--workers', str(workers)]
+    if os.name == 'nt':
+        return subprocess.Popen(_args, cwd=_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                creationflags=subprocess.DETACHED_PROCESS|subprocess.CREATE_NEW_PROCESS_GROUP)
+    return subprocess.Popen(_args, cwd=_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+class JobRunner(CanExport):
+    """
+    Works through the persistent job queue over a pool of worker processes.
+    - functions:
+    - `run`: claims and runs jobs until stopped, or until the queue is empty.
+    - `stop`: stops [run], the jobs in flight are finished, the claimed ones that didn't start go back to the queue.
+    """
+    def __init__(self, db_path: str, workers: int = 0, chunk_size: int = 1) -> None:
+        """
+        Works through the persistent job queue over a pool of worker processes.
+        - db_path: the queue file.
+        - workers: the number of worker processes, 0 uses every core, 1 runs the jobs in this process.
+        - chunk_size: jobs handed to a worker at once.
+        """
+        self.queue = JobQueue(db_path)
+        self.runner_id: str = get_runner_id()
+        # the pool settings alone, every job carries its campaign's.
+        self.save_obj = SaveObject(workers=workers, chunk_size=max(1, chunk_size))
+        self.workers: int = self._get_pool_params(self.save_obj, sys.maxsize)[0]
+
+        # {results dir: manifest}, of the export campaigns run so far.
+        self._manifests: dict[str, ExportManifest] = {}
+        # {job id: (sample path, results dir)}, of the jobs in flight, the dir is '' for an analyze job.
+        self._in_flight: dict[int, tuple[str, str]] = {}
+        self._stop = threading.Event()
+        self._beating = threading.Event()
+        self._claimed: int = 0
+        self._recorded: int = 0
+
+        # Metrics:
+        self.done: int = 0
+        self.failed: int = 0
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.runner_id=}, {self.workers=}, {self.done=}, {self.failed=})'
+
+    def _beat(self) -> None:
+        while not self._beating.wait(HEARTBEAT_S):
+            self.queue.beat(self.runner_id)
+
+    def _get_manifest(self, save_obj: SaveObject) -> ExportManifest:
+        _results_path: str = save_obj.get_results_path()
+        if _results_path not in self._manifests:
+            os.makedirs(_results_path, exist_ok=True)
+            self._manifests[_results_path] = ExportManifest(_results_path)
+        return self._manifests[_results_path]
+
+    def _to_runner_job(self, job: QueuedJob) -> RunnerJob:
+        _id, _kind, _path, _save_obj = job
+        if _kind is not JobKind.EXPORT:
+            self._in_flight[_id] = (_path, '')
+            return (_id, _kind, _path, _save_obj, None)
+        # the entries are looked up as the jobs are handed out, so they see what was recorded up to then.
+        self._in_flight[_id] = (_path, _save_obj.get_results_path())
+        return (_id, _kind, _path, _save_obj, self._get_manifest(_save_obj).get_entry(_get_manifest_key(_path)))
+
+    def _claimed_jobs(self, until_empty: bool) -> Iterator[RunnerJob]:
+        """
+        Claims the jobs as the pool pulls them, a few at a time; an empty queue is polled, backing off, or, [until_empty], ends the jobs once none is running, here or elsewhere, failed ones and the ones of dead runners may come back.
+        """
+        _poll: float = IDLE_POLL_S
+
+        while not self._stop.is_set():
+            # the jobs recorded before the claim, so one requeued after it isn't missed.
+            _recorded: int = self._recorded
+            _jobs: list[QueuedJob] = self.queue.claim(self.runner_id, self.workers*CLAIMS_PER_WORKER)
+            if not _jobs:
+                if until_empty and _recorded < self._claimed:
+                    # failed jobs in flight go back to the queue once recorded.
+                    while self._recorded == _recorded and not self._stop.wait(IN_FLIGHT_POLL_S):
+                        pass
+                    continue
+                # the jobs running elsewhere come back if their runner died.
+                if until_empty and not self.queue.get_counts()[JobState.RUNNING]:
+                    return
+                self.queue.recover()
+                self._stop.wait(_poll)
+                _poll = min(_poll*2, MAX_IDLE_POLL_S)
+                continue
+
+            _poll = IDLE_POLL_S
+            self._claimed += len(_jobs)
+            for _ind, _job in enumerate(_jobs):
+                if self._stop.is_set():
+                    _unsent: list[int] = [job[0] for job in _jobs[_ind:]]
+                    self.queue.release(self.runner_id, _unsent)
+                    self._claimed -= len(_unsent)
+                    return
+                yield self._to_runner_job(_job)
+
+    def _record(self, finished: list[FinishedJob]) -> None:
+        """
+        Saves the manifests, then records the outcomes, a crash in between reruns the jobs, skipped as up to date; the outcomes of jobs taken back from this runner, while it was taken for dead, are dropped.
+        """
+        for _manifest in self._manifests.values():
+            _manifest.save()
+        self.queue.finish(self.runner_id, finished)
+        self._recorded += len(finished)
+        finished.clear()
+
+    def run(self, on_progress: RunnerProgress|None = None, until_empty: bool = False) -> tuple[int, int]:
+        """
+        Claims and runs jobs until [stop] is called, or, [until_empty], until no job is left queued; the jobs of dead runners are recovered first.
+        - on_progress: called after every job with (done, failed, sample path, error massage), failed jobs may be retried later.
+        - -> (the number of done jobs, the number of failed ones).
+        """
+        self.queue.register_runner(self.runner_id)
+        self.queue.recover()
+        _beater = threading.Thread(target=self._beat, daemon=True)
+        _beater.start()
+
+        _finished: list[FinishedJob] = []
+        _flushed_at: float = time.perf_counter()
+        try:
+            for _id, _key, _error, _elapsed, _result, _entry in self._map_gated(
+                    _run_job, self._claimed_jobs(until_empty), self.workers, self.save_obj, None, False):
+                _path, _results_path = self._in_flight.pop(_id)
+                if _entry:
+                    self._manifests[_results_path].record(_key, _entry)
+
+                _finished.append((_id, _error, _elapsed, _result))
+                if _error:
+                    self.failed += 1
+                else:
+                    self.done += 1
+                if on_progress:
+                    on_progress(self.done, self.failed, _path, _error)
+
+                # nothing in flight, the queue may be empty, recorded now so it's seen as such.
+                if len(_finished) >= FINISH_EVERY or time.perf_counter()-_flushed_at >= FINISH_EVERY_S \
+                        or self._recorded+len(_finished) >= self._claimed:
+                    self._record(_finished)
+                    _flushed_at = time.perf_counter()
+        finally:
+            if _finished:
+                self._record(_finished)
+            self._beating.set()
+            self.queue.unregister_runner(self.runner_id)
+
+        return (self.done, self.failed)
+
+    def stop(self) -> None:
+        """
+        Stops [run], the jobs in flight are finished, the claimed ones that didn't start go back to the queue.
+        """
+        self._stop.set()
@@ -0,0 +1,477 @@
+"""
+The http analysis service, many workstations sharing one analysis box: python auto_gsa.py serve.
+- POST /analyze: a sample csv, as a sample file is, or json, a [[phi, wht], ...] array, or {"samples": [{"name", "data"}, ...], options}; the options go in the query string as well, see [AnalysisOptions].
+- GET /health: the service state, its queue, and its cache stats.
+- the samples of all the requests are queued, batched and mapped over a pool of worker processes; identical samples in flight are analyzed once, the results are cached.
+- backpressure: past [max_pending] queued samples, requests are refused with a 503 and a Retry-After, not queued without bound.
+"""
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import queue
+import signal
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import FrameType
+from typing import Any, Final
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from mixins.defaults import DEFAULT_CLR
+from mixins.saver import GRAPH_TITLES, CanSave
+from models import Analyzer, Cache
+from models.batch import analyze_source, get_pool
+from typedefs import AnalysisMethod, GraphType, SkewnessSchema
+
+# Constants:
+# server
+DEFAULT_HOST: Final[str] = '127.0.0.1'
+DEFAULT_PORT: Final[int] = 8765
+MAX_BODY_BYTES: Final[int] = 8 << 20
+REQUEST_TIMEOUT_S: Final[float] = 120.0
+RETRY_AFTER_S: Final[int] = 1
+
+# queue, batching the samples of concurrent requests into one pool map.
+DEFAULT_MAX_PENDING: Final[int] = 2048
+DEFAULT_BATCH_SIZE: Final[int] = 64
+DEFAULT_BATCH_WAIT_S: Final[float] = .005
+CHUNKS_PER_WORKER: Final[int] = 2
+
+# cache
+DEFAULT_CACHE_SIZE: Final[int] = 10_000
+
+# graphs, by the names of the exported graph files.
+GRAPH_NAMES: Final[dict[str, GraphType]] = {title.lower().replace(' ', '_'): graph_type for graph_type, title in GRAPH_TITLES.items()}
+DEFAULT_GRAPH_DPI: Final[int] = 100
+MAX_GRAPH_DPI: Final[int] = 300
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when the queue can't take the samples of a request, the client should retry later.
+    """
+
+
+@dataclass(frozen=True)
+class AnalysisOptions():
+    """
+    How the samples of a request are analyzed and rendered.
+    - `method`: the analysis method name, 'graphical' or 'moments', '' picks it, see [Analyzer].
+    - `schema`: the skewness schema name, see [SkewnessSchema].
+    - `graphs`: the graphs to render as base64 pngs, [GRAPH_NAMES], none by default.
+    - `color`, `dpi`, `transparent`: as in the SaveObject.
+    """
+    method: str = ''
+    schema: str = SkewnessSchema.OBSERVATIONAL.name.lower()
+    graphs: tuple[str,...] = ()
+    color: str = DEFAULT_CLR
+    dpi: int = DEFAULT_GRAPH_DPI
+    transparent: bool = False
+
+    @classmethod
+    def from_mapping(cls, options: Mapping[str, Any]) -> 'AnalysisOptions':
+        """
+        The options from a json body or a query string, validated; raises a ValueError naming the bad one.
+        """
+        _graphs: Any = options.get('graphs', ())
+        _graphs = tuple(_graphs.split(',') if isinstance(_graphs, str) else _graphs)
+        _options = cls(method=str(options.get('method', '')).lower(),
+                       schema=str(options.get('schema', cls.schema)).lower(),
+                       graphs=tuple(graph for graph in _graphs if graph),
+                       color=str(options.get('color', cls.color)),
+                       dpi=int(options.get('dpi', cls.dpi)),
+                       transparent=str(options.get('transparent', '')).lower() in ('1', 'true', 'yes'))
+
+        if _options.method and _options.method.upper() not in (AnalysisMethod.GRAPHICAL.name, AnalysisMethod.MOMENTS.name):
+            raise ValueError(f'unknown method [{_options.method}], graphical or moments')
+        if _options.schema.upper() not in SkewnessSchema.__members__:
+            raise ValueError(f'unknown schema [{_options.schema}], one of {[schema.name.lower() for schema in SkewnessSchema]}')
+        if _unknown := set(_options.graphs)-set(GRAPH_NAMES):
+            raise ValueError(f'unknown graphs {sorted(_unknown)}, of {list(GRAPH_NAMES)}')
+        if not 0 < _options.dpi <= MAX_GRAPH_DPI:
+            raise ValueError(f'dpi must be within (0, {MAX_GRAPH_DPI}]')
+
+        return _options
+
+    def get_method(self) -> AnalysisMethod|None:
+        return AnalysisMethod[self.method.upper()] if self.method else None
+
+    def get_schema(self) -> SkewnessSchema:
+        return SkewnessSchema[self.schema.upper()]
+
+
+type AnalysisJob = tuple[str, pd.DataFrame, AnalysisOptions]
+type AnalysisResult = dict[str, Any]
+
+
+def _to_json(value: Any) -> Any:
+    """
+    NaNs, which json lacks, as nulls, numpy scalars as python ones.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _analyze_job(job: AnalysisJob) -> AnalysisResult:
+    """
+    The worker side of the service, analyzes a sample, and renders its graphs if asked to; errors are returned, not raised, to not bring the pool down.
+    - job: (sample name, sample data, as a sample file holds it, options).
+    - -> the summary row, see [models.batch.summarize], the [graphs] as base64 pngs, if any, and the [error] massage.
+    """
+    _name, _data, _options = job
+    _name, _data, _row, _, _error = analyze_source((_name, _data), _options.get_method(), _options.get_schema())
+    if _row is None:
+        return {'sample': _name, 'error': _error}
+    _result: AnalysisResult = {key: _to_json(value) for key, value in _row.items()}
+
+    try:
+        if _options.graphs:
+            # [analyze_source] keeps no analysis, the graphs analyze its data again.
+            _ana = Analyzer(_data, _options.get_method(), _options.get_schema())
+            _saver = CanSave()
+            _prepared = _saver.cs_prepare_graphs(_name.capitalize(), _ana)
+            _result['graphs'] = {graph: base64.b64encode(_saver.cs_render_preview(_prepared[GRAPH_NAMES[graph]], _options.color,
+                                                                                  _options.transparent, _options.dpi)).decode()
+                                 for graph in _options.graphs}
+    except Exception as e:
+        return {'sample': _name, 'error': f'{type(e).__name__}: {e}'}
+
+    _result['error'] = ''
+    return _result
+
+
+class AnalysisService():
+    """
+    Queues the samples of concurrent requests, maps them in batches over a pool of worker processes and caches the results.
+    - functions:
+    - `start`, `close`: the pool and the dispatcher thread.
+    - `submit`: queues samples, -> a future per sample; raises [ServiceBusy] past [max_pending].
+    - `get_state`: the queue and cache stats.
+    """
+    def __init__(self, workers: int = 0, max_pending: int = DEFAULT_MAX_PENDING, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_wait: float = DEFAULT_BATCH_WAIT_S, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Queues the samples of concurrent requests, maps them in batches over a pool of worker processes and caches the results.
+        - workers: the pool size, 0 uses every core.
+        - max_pending: the samples queued or in the workers, past it [submit] refuses.
+        - batch_size, batch_wait: a batch is handed to the pool once it's [batch_size] samples, or [batch_wait] seconds after its first.
+        - cache_size: the results kept, in entries, the oldest go first.
+        """
+        self.workers: int = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+
+        self._queue: queue.Queue[tuple[str, AnalysisJob]|None] = queue.Queue()
+        # {cache key: future}, a sample already in flight isn't queued again.
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # keyed by content, with no source file, so nothing registers in the shared dependents.
+        self._cache = Cache(cache_size, name='http results')
+        self._pool: Any = None
+        self._dispatcher: threading.Thread|None = None
+
+        # Metrics:
+        self.batches: int = 0
+        self.analyzed: int = 0
+        self.refused: int = 0
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.workers=}, {len(self._in_flight)=})'
+
+    def start(self) -> None:
+        """
+        Starts the worker pool and the dispatcher thread.
+        """
+        self._pool = get_pool(self.workers)
+        self._dispatcher = threading.Thread(target=self._dispatch, name='dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def close(self) -> None:
+        """
+        Stops the dispatcher, then the pool, the samples still queued fail.
+        """
+        self._queue.put(None)
+        if self._dispatcher:
+            self._dispatcher.join()
+        if self._pool:
+            self._pool.terminate()
+            self._pool.join()
+        with self._lock:
+            for _future in self._in_flight.values():
+                if not _future.done():
+                    _future.set_exception(ServiceBusy('the service is shutting down'))
+            self._in_flight.clear()
+
+    @staticmethod
+    def get_key(name: str, payload: bytes, options: AnalysisOptions) -> str:
+        """
+        The cache key of a sample, its [name] and the [payload] it came as, raw, and the [options].
+        """
+        _hash = hashlib.blake2b(repr((name, options)).encode(), digest_size=16)
+        _hash.update(payload)
+        return _hash.hexdigest()
+
+    def submit(self, jobs: Sequence[tuple[str, AnalysisJob]]) -> tuple[list[Future], int]:
+        """
+        Queues the [jobs], (cache key, job), all or none.
+        - -> (a future per job, in order, the number of cached ones); raises [ServiceBusy] if they'd go past [max_pending].
+        """
+        _futures: list[Future] = []
+        _new: dict[str, tuple[AnalysisJob, Future]] = {}
+        _cached: int = 0
+
+        with self._lock:
+            for _key, _job in jobs:
+                if self._cache.check(_key):
+                    _future: Future = Future()
+                    _future.set_result(self._cache.get(_key))
+                    _cached += 1
+                elif _key in self._in_flight or _key in _new:
+                    _future = self._in_flight[_key] if _key in self._in_flight else _new[_key][1]
+                else:
+                    _future = Future()
+                    _new[_key] = (_job, _future)
+                _futures.append(_future)
+
+            if len(self._in_flight)+len(_new) > self.max_pending:
+                self.refused += 1
+                raise ServiceBusy(f'{len(self._in_flight)} samples pending, retry later')
+
+            for _key, (_job, _future) in _new.items():
+                self._in_flight[_key] = _future
+                self._queue.put((_key, _job))
+
+        return (_futures, _cached)
+
+    def _dispatch(self) -> None:
+        """
+        The dispatcher thread, gathers the queued samples into batches and maps each over the pool, the results are delivered from the pool's result thread.
+        """
+        while True:
+            _first = self._queue.get()
+            if _first is None:
+                return
+            _batch: list[tuple[str, AnalysisJob]] = [_first]
+            _deadline: float = time.perf_counter()+self.batch_wait
+
+            while len(_batch) < self.batch_size:
+                try:
+                    _next = self._queue.get(timeout=max(0.0, _deadline-time.perf_counter()))
+                except queue.Empty:
+                    break
+                if _next is None:
+                    self._queue.put(None)
+                    break
+                _batch.append(_next)
+
+            _keys: list[str] = [key for key, _ in _batch]
+            _chunk_size: int = max(1, len(_batch)//(self.workers*CHUNKS_PER_WORKER))
+            self.batches += 1
+            self._pool.map_async(_analyze_job, [job for _, job in _batch], _chunk_size,
+                                 callback=lambda results, keys=_keys: self._deliver(keys, results),
+                                 error_callback=lambda error, keys=_keys: self._fail(keys, error))
+
+    def _deliver(self, keys: list[str], results: list[AnalysisResult]) -> None:
+        """
+        Caches the [results] of a batch, failed samples aside, as they may be retried, and resolves their futures.
+        """
+        with self._lock:
+            for _key, _result in zip(keys, results):
+                if not _result['error']:
+                    self._cache.add(_key, _result)
+                _future: Future|None = self._in_flight.pop(_key, None)
+                if _future and not _future.done():
+                    _future.set_result(_result)
+            self.analyzed += len(results)
+
+    def _fail(self, keys: list[str], error: BaseException) -> None:
+        """
+        Fails the futures of a batch the pool couldn't run.
+        """
+        with self._lock:
+            for _key in keys:
+                _future: Future|None = self._in_flight.pop(_key, None)
+                if _future and not _future.done():
+                    _future.set_exception(error)
+
+    def get_state(self) -> dict[str, Any]:
+        """
+        The service metrics, its queue and its cache stats.
+        """
+        with self._lock:
+            return {'workers': self.workers,
+                    'pending': len(self._in_flight),
+                    'max_pending': self.max_pending,
+                    'batches': self.batches,
+                    'analyzed': self.analyzed,
+                    'refused': self.refused,
+                    'cache': self._cache.stats().to_dict()}
+
+
+def _parse_samples(body: bytes, content_type: str, query: Mapping[str, str]) -> tuple[list[tuple[str, pd.DataFrame, bytes]], dict[str, Any]]:
+    """
+    The samples of a request body, (name, data, raw payload), and the options it carries; raises a ValueError if it's malformed.
+    - csv: a sample, named by the [name] query, laid out as a sample file is.
+    - json: a [[phi, wht], ...] array, a sample named by the [name] query, or {"samples": [{"name", "data"}, ...]} and options.
+    """
+    if content_type == 'text/csv':
+        return ([(query.get('name', 'sample.csv'), pd.read_csv(io.BytesIO(body)), body)], {})
+    if content_type != 'application/json':
+        raise ValueError(f'unsupported content type [{content_type}], text/csv or application/json')
+
+    _body: Any = json.loads(body)
+    _options: dict[str, Any] = {}
+    if isinstance(_body, list):
+        _body = {'samples': [{'name': query.get('name', 'sample'), 'data': _body}]}
+    if not isinstance(_body, dict) or not isinstance(_body.get('samples'), list):
+        raise ValueError('expected a [[phi, wht], ...] array or {"samples": [{"name", "data"}, ...]}')
+
+    _options = {key: value for key, value in _body.items() if key != 'samples'}
+    _samples: list[tuple[str, pd.DataFrame, bytes]] = []
+    for _ind, _sample in enumerate(_body['samples']):
+        if not isinstance(_sample, dict):
+            raise ValueError(f'sample [{_ind}]: expected {{"name", "data"}}')
+        _data = np.asarray(_sample.get('data', []), dtype=np.float64)
+        if _data.ndim != 2 or 2 not in _data.shape:
+            raise ValueError(f'sample [{_ind}]: expected [[phi, wht], ...]')
+        _samples.append((str(_sample.get('name', f'sample_{_ind}')), pd.DataFrame(_data), _data.tobytes()))
+
+    return (_samples, _options)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    The request handler, a thread per request, the analysis is left to the [AnalysisService] of the server.
+    """
+    server: 'AnalysisServer'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, payload: Mapping[str, Any], headers: Mapping[str, str] = {}) -> None:
+        _body: bytes = json.dumps(payload, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_body)))
+        for _header, _value in headers.items():
+            self.send_header(_header, _value)
+        self.end_headers()
+        self.wfile.write(_body)
+
+    def _send_error(self, status: HTTPStatus, massage: str, headers: Mapping[str, str] = {}) -> None:
+        self._send_json(status, {'error': massage}, headers)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == '/health':
+            self._send_json(HTTPStatus.OK, {'status': 'ok', **self.server.service.get_state()})
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f'unknown path [{self.path}], GET /health or POST /analyze')
+
+    def _get_length(self) -> int:
+        """
+        The body length, raises a ValueError if the Content-Length header isn't a length.
+        """
+        _length: int = int(self.headers.get('Content-Length', 0))
+        if _length < 0:
+            raise ValueError(f'invalid Content-Length [{_length}]')
+        return _length
+
+    def do_POST(self) -> None:
+        _url = urlsplit(self.path)
+
+        if _url.path != '/analyze':
+            self._send_error(HTTPStatus.NOT_FOUND, f'unknown path [{_url.path}], POST /analyze')
+            return
+        try:
+            _length: int = self._get_length()
+        except ValueError as e:
+            # the body's end is unknown, the connection can't be reused.
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, f'{type(e).__name__}: {e}')
+            return
+        if _length > MAX_BODY_BYTES:
+            # the body is left unread, the connection can't be reused.
+            self.close_connection = True
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'the body is over {MAX_BODY_BYTES} bytes')
+            return
+
+        _start: float = time.perf_counter()
+        _query: dict[str, str] = {key: values[-1] for key, values in parse_qs(_url.query).items()}
+        try:
+            _content_type: str = self.headers.get('Content-Type', 'application/json').split(';')[0].strip()
+            _samples, _body_options = _parse_samples(self.rfile.read(_length), _content_type, _query)
+            _options = AnalysisOptions.from_mapping({**_query, **_body_options})
+        except (ValueError, TypeError, AttributeError, KeyError, pd.errors.ParserError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, f'{type(e).__name__}: {e}')
+            return
+
+        _service: AnalysisService = self.server.service
+        if len(_samples) > _service.max_pending:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'{len(_samples)} samples, over the {_service.max_pending} the service queues, split them')
+            return
+        try:
+            _futures, _cached = _service.submit([(_service.get_key(name, payload, _options), (name, data, _options))
+                                                for name, data, payload in _samples])
+            _results: list[AnalysisResult] = [future.result(REQUEST_TIMEOUT_S) for future in _futures]
+        except ServiceBusy as e:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {'Retry-After': str(RETRY_AFTER_S)})
+            return
+        except FutureTimeoutError:
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT, f'the analysis took over {REQUEST_TIMEOUT_S}s')
+            return
+
+        self._send_json(HTTPStatus.OK, {'results': _results, 'cached': _cached,
+                                        'elapsed_ms': round((time.perf_counter()-_start)*1000, 3)})
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    The http server, a thread per request, sharing one [AnalysisService].
+    """
+    daemon_threads = True
+    # the default 5 drops connections under a burst of clients.
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], service: AnalysisService, verbose: bool = False) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, service: AnalysisService|None = None,
+          verbose: bool = False) -> None:
+    """
+    Serves until interrupted, or terminated, then closes the service.
+    - service: the started [AnalysisService], one with the defaults otherwise.
+    """
+    def _on_terminate(signum: int, frame: FrameType|None) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _on_terminate)
+    _service: AnalysisService = service or AnalysisService()
+    if _service._pool is None:
+        _service.start()
+
+    with AnalysisServer((host, port), _service, verbose) as server:
+        print(f'serving on http://{host}:{server.server_address[1]}, {_service.workers} workers, ctrl+c to stop', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            _service.close()
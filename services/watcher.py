@@ -0,0 +1,209 @@
+"""
+The watch folder mode, a station drops samples into a dir all day, they're analyzed and exported as they land: python auto_gsa.py watch [dir] -o [out dir].
+- the dir is polled, os.scandir and the (mtime, size) of every file, no OS specific api; a file is only taken once it's been left alone for [debounce] seconds, so partially written files are never read.
+- the settled samples of a scan are exported together, over a pool of worker processes, and their stats appended to a running summary table.
+- polling backs off while nothing changes, so an idle watch costs next to nothing.
+"""
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Final
+
+import pandas as pd
+
+from mixins.exporter import CanExport, _get_manifest_key, _save_sample
+from mixins.validator import Validator
+from models import ExportManifest
+from models.batch import SUMMARY_COLUMNS, SummaryRow, summarize
+from models.manifest import PARTIAL_SUFFIX, ManifestEntry
+from typedefs import SaveObject
+
+# Constants:
+# polling
+DEFAULT_INTERVAL_S: Final[float] = 1.0
+DEFAULT_MAX_INTERVAL_S: Final[float] = 8.0
+DEFAULT_DEBOUNCE_S: Final[float] = 2.0
+
+# files never taken as samples, hidden, temporary or partially written ones, office lock files.
+IGNORED_PREFIXES: Final[tuple[str,...]] = ('.', '~$')
+IGNORED_SUFFIXES: Final[tuple[str,...]] = ('.tmp', '.crdownload', '.partial')
+
+# summary
+WATCH_SUMMARY_SUFFIX: Final[str] = '_watch_summary.csv'
+WATCH_COLUMNS: Final[tuple[str,...]] = ('processed_at', 'source', *SUMMARY_COLUMNS)
+
+type FileStat = tuple[int, int] # (mtime_ns, size)
+type WatchedSample = tuple[str, str, str, ManifestEntry|None, SummaryRow|None]
+# (samples processed, rows appended, errors as (sample name, error massage), seconds)
+type WatchBatch = tuple[int, int, list[tuple[str, str]], float]
+
+
+def _watch_sample(job: tuple[str, SaveObject, ManifestEntry|None]) -> WatchedSample:
+    """
+    The worker side of the watch, exports the sample, as [_export_sample] does, then summarizes the analysis it was saved from, unless it was skipped as up to date; the sample is read and analyzed once.
+    - -> (manifest key, sample name, error massage, the new manifest entry, summary row), the entry and row are None if the sample was skipped or failed.
+    """
+    _key, _name, _error, _entry, _ana = _save_sample(job)
+    if _error or _entry is None or _ana is None:
+        return (_key, _name, _error, None, None)
+
+    try:
+        _row: SummaryRow = summarize(_name, _ana)
+    except Exception as e:
+        return (_key, _name, f'{type(e).__name__}: {e}', _entry, None)
+    return (_key, _name, '', _entry, _row)
+
+
+class FolderWatcher(CanExport):
+    """
+    Watches a dir for new or changed samples, exports the settled ones, in parallel, and appends their stats to a running summary table.
+    - functions:
+    - `scan`: polls the dir once, -> the settled new or changed samples.
+    - `process`: exports samples, and appends their rows to the summary.
+    - `run`: scans and processes until stopped.
+    - `stop`: stops [run], the samples in flight are finished.
+    """
+    def __init__(self, save_obj: SaveObject, interval: float = DEFAULT_INTERVAL_S, max_interval: float = DEFAULT_MAX_INTERVAL_S,
+                 debounce: float = DEFAULT_DEBOUNCE_S) -> None:
+        """
+        Watches a dir for new or changed samples, exports the settled ones, in parallel, and appends their stats to a running summary table.
+        - save_obj: the export settings, [files_path] is the watched dir; the results dir, if within it, isn't watched.
+        - interval, max_interval: seconds between scans, doubled up to [max_interval] while nothing changes, back to [interval] once something does.
+        - debounce: seconds a file has to be left unchanged before it's taken.
+        """
+        self.save_obj = save_obj
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.debounce = debounce
+        self.summary_path: str = self._get_project_file_path(save_obj, WATCH_SUMMARY_SUFFIX)
+
+        self._validator = Validator()
+        self._results_dir: str = os.path.normcase(os.path.abspath(save_obj.get_results_path()))
+        # {path: stat}, the stat each file was last processed at, failed ones included, they're retried once changed.
+        self._seen: dict[str, FileStat] = {}
+        # {path: (stat, since)}, files changing or waiting out the debounce.
+        self._pending: dict[str, tuple[FileStat, float]] = {}
+        self._stop = threading.Event()
+
+        # Metrics:
+        self.scans: int = 0
+        self.processed: int = 0
+        self.failed: int = 0
+
+    def __repr__(self) -> str:
+        return f'{__class__.__name__} ({self.save_obj.files_path=}, {len(self._seen)=}, {len(self._pending)=})'
+
+    def _is_candidate(self, entry: os.DirEntry) -> bool:
+        """
+        Is the dir [entry] a sample file to watch, by its name alone.
+        """
+        _name: str = entry.name
+        _lower: str = _name.lower()
+        return (not _name.startswith(IGNORED_PREFIXES) and not _lower.endswith(IGNORED_SUFFIXES)
+                and PARTIAL_SUFFIX not in _name and entry.is_file()
+                and self._validator.val_samples(os.path.dirname(entry.path), _name)
+                and not self._validator.val_is_columnar(_name))
+
+    def scan(self, now: float|None = None) -> list[str]:
+        """
+        Polls the watched dir once.
+        - now: the monotonic time to debounce against, now otherwise.
+        - -> the samples that are new or changed since they were last processed and have been left alone for [debounce] seconds, by name.
+        """
+        _now: float = time.monotonic() if now is None else now
+        _found: dict[str, FileStat] = {}
+        self.scans += 1
+
+        with os.scandir(self.save_obj.files_path) as entries:
+            for _entry in entries:
+                if os.path.normcase(os.path.abspath(_entry.path)) == self._results_dir or not self._is_candidate(_entry):
+                    continue
+                try:
+                    _stat: os.stat_result = _entry.stat()
+                except OSError:
+                    # gone between the listing and the stat.
+                    continue
+                _found[_entry.path] = (_stat.st_mtime_ns, _stat.st_size)
+
+        # deleted files are forgotten, a file dropped again under the same name is a new one.
+        for _path in set(self._seen)-set(_found):
+            del self._seen[_path]
+        for _path in set(self._pending)-set(_found):
+            del self._pending[_path]
+
+        _settled: list[str] = []
+        for _path, _stat in _found.items():
+            if self._seen.get(_path) == _stat:
+                continue
+            _since: float = self._pending[_path][1] if self._pending.get(_path, (None,))[0] == _stat else _now
+            if _now-_since >= self.debounce:
+                # a 0 debounce takes a file the scan it's found, before it was ever pending.
+                self._pending.pop(_path, None)
+                self._seen[_path] = _stat
+                _settled.append(_path)
+            else:
+                self._pending[_path] = (_stat, _since)
+
+        return sorted(_settled)
+
+    def process(self, paths: list[str]) -> WatchBatch:
+        """
+        Exports the samples at [paths] over the pool, as [ce_export_all] does, recording them in the results manifest, so the up to date ones are skipped, then appends the rows of the exported ones to the summary table.
+        - -> (samples processed, rows appended, errors, seconds).
+        """
+        _start: float = time.perf_counter()
+        _manifest = ExportManifest(self.save_obj.get_results_path())
+        _jobs = ((path, self.save_obj, _manifest.get_entry(_get_manifest_key(path))) for path in paths)
+        _rows: list[dict] = []
+        _errors: list[tuple[str, str]] = []
+        _done: int = 0
+        _stamp: str = pd.Timestamp.now().isoformat(timespec='seconds')
+
+        try:
+            for _key, _name, _error, _entry, _row in self._map_gated(_watch_sample, _jobs, len(paths), self.save_obj,
+                                                                     lambda: not self._stop.is_set(), False):
+                _done += 1
+                if _error:
+                    _errors.append((_name, _error))
+                if _entry:
+                    _manifest.record(_key, _entry)
+                if _row:
+                    _rows.append({'processed_at': _stamp, 'source': _entry['source'] if _entry else '', **_row})
+        finally:
+            _manifest.save()
+            if _rows:
+                _exists: bool = os.path.isfile(self.summary_path)
+                pd.DataFrame(_rows, columns=list(WATCH_COLUMNS)).to_csv(self.summary_path, mode='a', header=not _exists, index=False)
+
+        self.processed += _done
+        self.failed += len(_errors)
+        return (_done, len(_rows), _errors, time.perf_counter()-_start)
+
+    def run(self, on_batch: Callable[[WatchBatch], None]|None = None, once: bool = False) -> None:
+        """
+        Scans and processes until [stop] is called.
+        - on_batch: called after every processed batch.
+        - once: process what's there, waiting out the debounce of the files changing, then return.
+        """
+        os.makedirs(self.save_obj.get_results_path(), exist_ok=True)
+        _interval: float = self.interval
+
+        while not self._stop.is_set():
+            _paths: list[str] = self.scan()
+            if _paths:
+                _batch: WatchBatch = self.process(_paths)
+                if on_batch:
+                    on_batch(_batch)
+            if once and not self._pending:
+                return
+
+            # back off while nothing changes, files waiting out the debounce are checked as soon as it's over.
+            _interval = self.interval if _paths or self._pending else min(_interval*2, self.max_interval)
+            self._stop.wait(min(_interval, self.debounce) if self._pending else _interval)
+
+    def stop(self) -> None:
+        """
+        Stops [run], the samples handed out to the workers are finished first.
+        """
+        self._stop.set()
@@ -35,12 +35,14 @@ class ColorPicker(ctk.CTkFrame, Observer, HasToolTip):
         An (RGB) color picker.
     Note: all masters should have on_preview_press(color) function, assertion enforced.
     """
-    def __init__(self, master: ctk.CTkFrame) -> None:
+    def __init__(self, master: ctk.CTkFrame, command: Callable[[str], None]|None = None) -> None:
         """
         An (RGB) color picker.
         Note: all masters should have on_preview_press(color) function, assertion enforced.
+        - command: called with the color as the sliders move, before it's picked, for live previews.
         """
         super().__init__(master)
+        self._command: Callable[[str], None]|None = None
 
         self.columnconfigure(0, weight=1, uniform='a')
         self.columnconfigure(1, weight=2, uniform='a')
@@ -65,6 +67,7 @@ class ColorPicker(ctk.CTkFrame, Observer, HasToolTip):
         self._b: ctk.IntVar = ctk.IntVar(self, value=self._default_rgb[2])
 
         self._set_color((self._r,self._g,self._b))
+        self._command = command
 
         _r_slider = ColorSlider(self, 'r', self._r,
                     lambda _: self._set_color((self._r,self._g,self._b)))
@@ -138,6 +141,9 @@ class ColorPicker(ctk.CTkFrame, Observer, HasToolTip):
         if self._preview.cget('border_color') != BORDER_COLOR_INACTIVE:
             self._preview.configure(border_color=BORDER_COLOR_INACTIVE)
 
+        if self._command:
+            self._command(self._color)
+
     def _on_preview_btn_press(self, color: str) -> None:
         """
         Picks the color and broadcasts [Signal.COLOR].
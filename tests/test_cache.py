@@ -0,0 +1,110 @@
+"""
+The cache freshness and the dependency graph between caches, as the file and analysis panels use them.
+- usage: python -m unittest discover tests
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from models import Analyzer, Cache, Sample
+
+# Constants:
+PHI: tuple[float,...] = (-1.0, -0.5, 0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0)
+
+
+def _write_sample(path: str, weights: tuple[float,...]) -> None:
+    """
+    Writes a sample file, a new mtime each time, as an edit in place would.
+    """
+    with open(path, 'w') as f:
+        f.write('phi,wht\n'+''.join(f'{phi},{wht}\n' for phi, wht in zip(PHI, weights)))
+    _stat: os.stat_result = os.stat(path)
+    os.utime(path, ns=(_stat.st_atime_ns, time.time_ns()+1_000_000_000))
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        # as the panels make them.
+        self.samples = Cache(2, hash_content=True, name='samples')
+        self.analyzers = Cache(50, hash_content=True, name='analyzers')
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir.name, name)
+
+    def _get_sample(self, path: str) -> Sample:
+        """
+        As [FilePanel._get_sample].
+        """
+        if self.samples.check(path):
+            return self.samples.get(path)
+        _sample = Sample(path)
+        self.samples.add(path, _sample, source=path)
+        return _sample
+
+    def _get_analyzer(self, path: str) -> Analyzer:
+        """
+        As [AnalysisPanel._update_analyzer].
+        """
+        _sample: Sample = self._get_sample(path)
+        if self.analyzers.check(path):
+            return self.analyzers.get(path)
+        _ana = Analyzer(_sample.get_data())
+        self.analyzers.add(path, _ana, source=path, depends_on=((self.samples, path),))
+        return _ana
+
+    def test_hit_until_edited(self) -> None:
+        _path: str = self._path('a.csv')
+        _write_sample(_path, (1, 2, 8, 20, 30, 20, 10, 6, 3))
+        _ana: Analyzer = self._get_analyzer(_path)
+
+        self.assertIs(self._get_analyzer(_path), _ana)
+        _write_sample(_path, (20, 30, 20, 10, 6, 3, 1, 1, 9))
+        self.assertFalse(self.samples.check(_path))
+        self.assertFalse(self.analyzers.check(_path))
+
+    def test_evict_edit_recheck(self) -> None:
+        _a, _b, _c = self._path('a.csv'), self._path('b.csv'), self._path('c.csv')
+        for _path in (_a, _b, _c):
+            _write_sample(_path, (1, 2, 8, 20, 30, 20, 10, 6, 3))
+        _old_mean: float = float(self._get_analyzer(_a).get_stats().mean)
+
+        # a is evicted from the samples cache, its analysis goes with it.
+        self._get_analyzer(_b)
+        self._get_analyzer(_c)
+        self.assertNotIn(_a, self.samples.data)
+        self.assertNotIn(_a, self.analyzers.data)
+        self.assertNotIn(_a, self.samples.dependents)
+
+        _write_sample(_a, (20, 30, 20, 10, 6, 3, 1, 1, 9))
+        self._get_sample(_a)
+        self.assertFalse(self.analyzers.check(_a))
+        self.assertNotAlmostEqual(float(self._get_analyzer(_a).get_stats().mean), _old_mean)
+
+    def test_stale_analysis_without_its_sample(self) -> None:
+        _path: str = self._path('a.csv')
+        _write_sample(_path, (1, 2, 8, 20, 30, 20, 10, 6, 3))
+        self._get_analyzer(_path)
+
+        # the sample entry gone without the edge firing, the analysis still tells it's stale by its own fingerprint.
+        self.samples.remove(_path)
+        _write_sample(_path, (20, 30, 20, 10, 6, 3, 1, 1, 9))
+        self.assertFalse(self.analyzers.check(_path))
+
+    def test_graph_bounded(self) -> None:
+        for _ind in range(10):
+            _path: str = self._path(f's{_ind}.csv')
+            _write_sample(_path, (1, 2, 8, 20, 30, 20, 10, 6, 3))
+            self._get_analyzer(_path)
+
+        self.assertEqual(len(self.samples.dependents), self.samples.size())
+        self.assertEqual(set(self.analyzers.data), set(self.samples.data))
+        self.assertEqual(self.samples.evictions, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+The job queue state machine, on a scratch queue, no samples are read: submit, claim, a runner dying, recover, finish, release, retry.
+- usage: python -m unittest discover tests
+- a runner dies by not beating, it's taken for dead by [recover], its jobs go back to the queue or fail once out of attempts, its late outcomes are dropped.
+"""
+import os
+import tempfile
+import time
+import unittest
+from typing import Final
+
+from models import JobQueue
+from models.job_queue import LOST_RUNNER_ERROR
+from typedefs import JobKind, JobState, SaveObject
+
+# Constants:
+MAX_ATTEMPTS: Final[int] = 2
+N_JOBS: Final[int] = 3
+STALE_AFTER_S: Final[float] = 0.05 # a runner that hasn't beaten since is dead.
+RUNNER_A: Final[str] = 'host:1:0'
+RUNNER_B: Final[str] = 'host:2:0'
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self._dir.name, 'queue.sqlite'))
+        self.campaign: str = self.queue.submit([os.path.join(self._dir.name, f'sample_{ind}.csv') for ind in range(N_JOBS)],
+                                               SaveObject(files_path=self._dir.name), JobKind.ANALYZE, 'test', MAX_ATTEMPTS)
+        self.ids: list[int] = sorted(self._get_jobs())
+        self.queue.register_runner(RUNNER_A)
+
+    def tearDown(self) -> None:
+        self.queue.close()
+        self._dir.cleanup()
+
+    def _get_jobs(self) -> dict[int, tuple[JobState, int, str|None, str]]:
+        """
+        -> {job id: (state, attempts, runner, error)}.
+        """
+        return {id_: (JobState(state), attempts, runner, error)
+                for id_, state, attempts, runner, error in self.queue._read('SELECT id, state, attempts, runner, error FROM jobs ORDER BY id')}
+
+    def _kill(self) -> int:
+        """
+        Every runner registered so far stops beating, then a live one recovers; -> the number of jobs recovered.
+        """
+        time.sleep(STALE_AFTER_S*2)
+        return self.queue.recover(STALE_AFTER_S)
+
+    def test_submit_claim(self) -> None:
+        self.assertEqual(self.queue.get_counts(self.campaign)[JobState.QUEUED], N_JOBS)
+        self.assertEqual(len(self.queue.claim(RUNNER_A, N_JOBS)), N_JOBS)
+        self.assertTrue(all(job[:3] == (JobState.RUNNING, 1, RUNNER_A) for job in self._get_jobs().values()))
+        self.assertEqual(self.queue.claim(RUNNER_A, N_JOBS), [])
+
+    def test_release_restores_attempt(self) -> None:
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self.queue.release(RUNNER_A, [self.ids[-1]])
+        self.assertEqual(self._get_jobs()[self.ids[-1]][:3], (JobState.QUEUED, 0, None))
+
+    def test_recover_requeues(self) -> None:
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self.assertEqual(self._kill(), N_JOBS)
+        self.assertNotIn(RUNNER_A, self.queue.get_live_runners())
+        for _state, _attempts, _, _error in self._get_jobs().values():
+            self.assertEqual((_state, _attempts, _error), (JobState.QUEUED, 1, LOST_RUNNER_ERROR))
+
+    def test_finish(self) -> None:
+        _first, _second, _third = self.ids
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self.queue.finish(RUNNER_A, [(_first, '', 0.1, {'sample': 'sample_0'}), (_second, 'ValueError: bad', 0.1, None)])
+        _jobs = self._get_jobs()
+        self.assertEqual(_jobs[_first][0], JobState.DONE)
+        self.assertEqual(_jobs[_second][:2], (JobState.QUEUED, 1))
+        self.assertEqual(_jobs[_third][0], JobState.RUNNING)
+        # a finished job isn't recorded twice.
+        self.assertEqual(self.queue.finish(RUNNER_A, [(_first, 'RuntimeError: twice', 0.1, None)]), 0)
+        self.assertEqual(self._get_jobs()[_first][0], JobState.DONE)
+
+    def test_max_attempts(self) -> None:
+        _first, _second, _ = self.ids
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self.queue.finish(RUNNER_A, [(_first, 'ValueError: bad', 0.1, None)])
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self.queue.finish(RUNNER_A, [(_first, 'ValueError: bad', 0.1, None)])
+        self.assertEqual(self._get_jobs()[_first][:2], (JobState.FAILED, MAX_ATTEMPTS))
+
+        # the last attempt dies with its runner.
+        self._kill()
+        self.queue.register_runner(RUNNER_B)
+        self.queue.claim(RUNNER_B, N_JOBS)
+        self.assertEqual(self._get_jobs()[_second][:2], (JobState.RUNNING, MAX_ATTEMPTS))
+        self._kill()
+        self.assertEqual(self._get_jobs()[_second], (JobState.FAILED, MAX_ATTEMPTS, RUNNER_B, LOST_RUNNER_ERROR))
+
+        self.assertEqual(self.queue.retry(self.campaign), N_JOBS)
+        self.assertTrue(all(job[:2] == (JobState.QUEUED, 0) for job in self._get_jobs().values()))
+
+    def test_late_outcomes_dropped(self) -> None:
+        _first, _second, _ = self.ids
+        self.queue.claim(RUNNER_A, N_JOBS)
+        self._kill()
+
+        # the dead runner wakes up, before and after another runner claims its jobs.
+        self.assertEqual(self.queue.finish(RUNNER_A, [(_first, '', 0.1, {})]), 0)
+        self.assertEqual(self._get_jobs()[_first][0], JobState.QUEUED)
+
+        self.queue.register_runner(RUNNER_B)
+        self.queue.claim(RUNNER_B, N_JOBS)
+        self.assertEqual(self.queue.finish(RUNNER_A, [(_first, '', 0.1, {}), (_second, 'RuntimeError: late', 0.1, None)]), 0)
+        self.queue.release(RUNNER_A, [_first])
+        _jobs = self._get_jobs()
+        self.assertEqual(_jobs[_first][:3], (JobState.RUNNING, 2, RUNNER_B))
+        self.assertEqual(_jobs[_second][:3], (JobState.RUNNING, 2, RUNNER_B))
+
+        self.assertEqual(self.queue.finish(RUNNER_B, [(_first, '', 0.1, {})]), 1)
+        self.assertEqual(self._get_jobs()[_first][0], JobState.DONE)
+
+    def test_runner_drops_late_outcomes(self) -> None:
+        from services.job_runner import JobRunner
+
+        _first, _, _ = self.ids
+        _runner = JobRunner(self.queue.path, workers=1)
+        try:
+            self.queue.register_runner(_runner.runner_id)
+            self.queue.claim(_runner.runner_id, N_JOBS)
+            self._kill()
+            self.queue.register_runner(RUNNER_B)
+            self.queue.claim(RUNNER_B, N_JOBS)
+
+            _runner._record([(_first, '', 0.1, {'sample': 'sample_0'})])
+            self.assertEqual(self._get_jobs()[_first][:3], (JobState.RUNNING, 2, RUNNER_B))
+        finally:
+            _runner.queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
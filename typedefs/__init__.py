@@ -1,5 +1,19 @@
 """
 A container for custom types.
+- the combo types are loaded on first use, they pull in the models and tkinter, headless code never needs them.
 """
+from typing import TYPE_CHECKING, Any
+
 from .base_types import *
-from .combo_types import *
+
+if TYPE_CHECKING:
+    from .combo_types import *
+
+_COMBO_TYPES: tuple[str,...] = ('GraphParameters', 'SignalSchema', 'Signal')
+
+
+def __getattr__(name: str) -> Any:
+    if name in _COMBO_TYPES:
+        from . import combo_types
+        return getattr(combo_types, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,18 +1,24 @@
 import os
+from collections.abc import Callable
 from copy import copy
-from dataclasses import dataclass
-from typing import Any, Self, Literal
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Self, Literal
 
-import customtkinter as ctk
 import numpy as np
 import pandas as pd
 
 from .enums import *
 
+if TYPE_CHECKING:
+    import customtkinter as ctk
+
 type ImportCacheElement = tuple[str, ctk.CTkFrame, ctk.CTkCheckBox, ctk.CTkLabel, ctk.CTkLabel]
 type PlotData = tuple[PlotInput, PlotInput, SamplePoints, AnalysisMethod]
 type SamplePoints = list[tuple[float, float]]
 type PlotInput = pd.Series[Any]|np.ndarray[Any, Any]
+type SourceFingerprint = tuple[int, int, str]
+type ExportProgress = Callable[[int, int, str, str], None] # (done, total, sample name, error massage)
+type ExportGate = Callable[[], bool] # blocks while paused, False cancels
 
 
 @dataclass
@@ -61,6 +67,92 @@ class StatsInterpretation():
             )
         return _frame
 
+@dataclass
+class CacheStats():
+    """
+    An object holding the metrics of a Cache instance.
+    - `name`: the cache name.
+    - `limit`: the size limit, in entries.
+    - `entries`: the current number of entries.
+    - `hits`: lookups that found a fresh entry.
+    - `misses`: lookups that didn't.
+    - `hit_rate`: hits/(hits+misses).
+    - `evictions`: entries dropped due to the size limit.
+    - `est_bytes`: an estimation of the memory held by the entries.
+    """
+    name: str = ''
+    limit: int = 0
+    entries: int = 0
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    evictions: int = 0
+    est_bytes: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.__dict__
+
+    def to_frame(self) -> pd.DataFrame:
+        _frame = pd.DataFrame(
+            {'metric': list(self.__dict__.keys()),
+             'values': list(self.__dict__.values())}
+            )
+        return _frame
+
+@dataclass
+class Artifact():
+    """
+    A file an export produces.
+    - `kind`: what the file is.
+    - `path`: where it's written.
+    - `graph_type`: the graph it holds, graphs only.
+    - `est_bytes`: an estimation of its size.
+    """
+    kind: ArtifactKind
+    path: str
+    graph_type: GraphType|None = None
+    est_bytes: int = 0
+
+@dataclass
+class ExportPlan():
+    """
+    What exporting a sample produces, every artifact once, and the dirs to create beforehand.
+    - `sample_name`: the sample name.
+    - `results_dir_path`: the artifacts paths are reported relative to it.
+    - `dirs`: the dirs to create.
+    - `artifacts`: the unique files to write, in writing order.
+    """
+    sample_name: str = ''
+    results_dir_path: str = ''
+    dirs: list[str] = field(default_factory=list)
+    artifacts: list[Artifact] = field(default_factory=list)
+
+    def get_rel_paths(self) -> list[str]:
+        """
+        Returns the artifacts paths, relative to the results dir.
+        """
+        return sorted(os.path.relpath(artifact.path, self.results_dir_path) for artifact in self.artifacts)
+
+    def get_est_bytes(self) -> int:
+        """
+        Returns the estimated size of all the artifacts.
+        """
+        return sum(artifact.est_bytes for artifact in self.artifacts)
+
+@dataclass
+class PreparedGraph():
+    """
+    A graph ready to be rendered at any resolution, prepared once per sample, rendered as a low resolution preview then, only when exporting, at full resolution.
+    - `graph_type`: the graph type.
+    - `plot_data`: as [Analyzer.get_plot_data] returns it.
+    - `title`: the graph title.
+    - `size`: the figure size in inches.
+    """
+    graph_type: GraphType
+    plot_data: PlotData
+    title: str = ''
+    size: tuple[float, float] = (6.4, 4.8)
+
 #! is This really needed??
 @dataclass
 class DefaultObj():
@@ -74,7 +166,9 @@ class DefaultObj():
 ATRRIBS = Literal['prefix','files_path',
                   'results_path','results_dir_name',
                   'raw_results_dir_name','color','dpi',
-                  'save_raw_files','interval','transparent']
+                  'save_raw_files','interval','transparent',
+                  'workers','chunk_size','ordered','export_mode','table_format','columnar_format',
+                  'group_by']
 @dataclass
 class SaveObject(DefaultObj):
     """
@@ -89,6 +183,13 @@ class SaveObject(DefaultObj):
     - `save_raw_files`: If true a non interpreted spreadsheet would be exported as well.
     - `interval`: To inclusively export files between [start, end].
     - `transparent`: Sets the graph background to transparent.
+    - `workers`: The number of worker processes to export with, 0 uses every core.
+    - `chunk_size`: The number of samples handed to a worker at once, 0 picks one based on the workload.
+    - `ordered`: If true, samples are reported in the order of the files list, otherwise as they finish.
+    - `export_mode`: What the export produces, an ExportMode value.
+    - `table_format`: The format of the stats only summary table, a TableFormat value.
+    - `columnar_format`: The format of the columnar data export, a ColumnarFormat value.
+    - `group_by`: How the samples are grouped for the group envelopes, a GroupBy value.
     """
     prefix: str = ''
     files_path: str = ''
@@ -100,6 +201,13 @@ class SaveObject(DefaultObj):
     save_raw_files: bool = False
     interval: tuple[int,list[int|None]] = (0,[])
     transparent: bool = False
+    workers: int = 0
+    chunk_size: int = 0
+    ordered: bool = True
+    export_mode: str = 'per sample'
+    table_format: str = 'csv'
+    columnar_format: str = 'parquet'
+    group_by: str = 'subfolder'
 
     def see(self, attrib: ATRRIBS) -> str:
         """
@@ -127,6 +235,13 @@ class SaveObject(DefaultObj):
         - `save_raw_files`: If true a non interpreted spreadsheet would be exported as well.
         - `interval`: To inclusively export files between [start, end].
         - `transparent`: Sets the graph background to transparent.
+        - `workers`: The number of worker processes to export with, 0 uses every core.
+        - `chunk_size`: The number of samples handed to a worker at once, 0 picks one based on the workload.
+        - `ordered`: If true, samples are reported in the order of the files list, otherwise as they finish.
+        - `export_mode`: What the export produces, an ExportMode value.
+        - `table_format`: The format of the stats only summary table, a TableFormat value.
+        - `columnar_format`: The format of the columnar data export, a ColumnarFormat value.
+        - `group_by`: How the samples are grouped for the group envelopes, a GroupBy value.
         """
         for k, v in kwargs.items():
             if hasattr(self, k):
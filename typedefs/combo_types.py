@@ -17,11 +17,13 @@ class GraphParameters():
     - `sample_name`: str.
     - `graph_type`: from the enum [GraphType].
     - `graph_color`: str.
+    - `source`: the sample's source path, the graphs are invalidated when it changes.
     """
     analyzer: Analyzer = Analyzer()
     sample_name: str = ''
     graph_type: GraphType|None = GraphType.HIST
     graph_color: str = ''
+    source: str = ''
 
     def __bool__(self) -> bool:
         return bool(self.sample_name)
@@ -40,6 +42,7 @@ class GraphParameters():
         - `sample_name`: str.
         - `graph_type`: GraphType.
         - `graph_color`: str.
+        - `source`: str.
         """
         for k, v in kwargs.items():
             if hasattr(self, k):
@@ -66,12 +69,14 @@ class Signal(Enum):
     - `EXPORTED`: signals [FilePanel] the end of the exporting process.
     - `EXPAND`: signals the [MainPanel] to expand a Widget.
     - `COLOR`: signals the [FilePanel] to update the [SaveObject] color.
+    - `OVERLAY`: signals the [AnalysisPanel] to overlay a selection of samples, their paths, showing the data of a [Sample], the last.
     """
     LOG = SignalSchema('log', (str, LogMsgType|None))
     ANALYZE = SignalSchema('analyze', (Sample, SaveObject, GraphType|None))
     EXPORTED = SignalSchema('exported', ())
     EXPAND = SignalSchema('expand', (Widget,))
     COLOR = SignalSchema('color', (str,))
+    OVERLAY = SignalSchema('overlay', (list, SaveObject, Sample))
 
     def __lt__(self, other) -> bool:
         return len(self.value.args) < len(other)
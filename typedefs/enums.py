@@ -38,9 +38,13 @@ class FileFormat(Enum):
     An Enum representing the data file's formats:
     - `EXCEL`: .xlsx excel file.
     - `CSV`: .csv comma separated values file.
+    - `PARQUET`, `FEATHER`, `HDF5`: columnar files of many samples, see [ColumnarFormat].
     """
     EXCEL = 'xlsx'
     CSV = 'csv'
+    PARQUET = 'parquet'
+    FEATHER = 'feather'
+    HDF5 = 'h5'
 
 
 class AnalysisMethod(Enum):
@@ -64,4 +68,114 @@ class SkewnessSchema(Enum):
     """
     ANASEDI = 0
     FOLKWARD57 = 1
-    OBSERVATIONAL = 3
\ No newline at end of file
+    OBSERVATIONAL = 3
+
+class ExportEvent(Enum):
+    """
+    An Enum representing the events an export worker posts to its queue:
+    - `PROGRESS`: a sample is done, (done, total, sample name, error massage).
+    - `LOG`: a massage to log, (massage, LogMsgType).
+    - `DONE`: the export is over, (saved, skipped, cancelled).
+    - `PLAN`: the dry run report, (report frame,).
+    """
+    PROGRESS = 0
+    LOG = 1
+    DONE = 2
+    PLAN = 3
+
+class ExportMode(Enum):
+    """
+    An Enum representing what an export produces:
+    - `PER_SAMPLE`: a spreadsheet and graphs per sample.
+    - `WORKBOOK`: one project workbook, a summary sheet and a long format data sheet.
+    - `WORKBOOK_SHEETS`: one project workbook, a summary sheet and a data sheet per sample.
+    - `STATS`: one summary table, no graphs nor data.
+    - `COLUMNAR`: columnar files, the samples data in long format and the summary table.
+    - `REPORT`: one pdf, a page per sample, its graphs and stats, then the summary.
+    - `DIAGRAMS`: one summary table and the dataset diagrams, the stats of all the samples against each other and their texture ternaries.
+    - `ENVELOPES`: the percentile envelopes of the cumulative curves of every group of samples, as a table and a graph.
+    """
+    PER_SAMPLE = 'per sample'
+    WORKBOOK = 'project workbook'
+    WORKBOOK_SHEETS = 'workbook, sheet per sample'
+    STATS = 'stats only'
+    COLUMNAR = 'columnar data'
+    REPORT = 'pdf report'
+    DIAGRAMS = 'stats diagrams'
+    ENVELOPES = 'group envelopes'
+
+
+class GroupBy(Enum):
+    """
+    An Enum representing how the samples are grouped, for the group envelopes:
+    - `SUBFOLDER`: by the folder holding the sample, relative to the files dir.
+    - `PREFIX`: by the sample name, without its trailing number, [core_a-12] -> [core_a].
+    """
+    SUBFOLDER = 'subfolder'
+    PREFIX = 'name prefix'
+
+
+class TableFormat(Enum):
+    """
+    An Enum representing the formats of an exported summary table:
+    - `CSV`: .csv comma separated values file.
+    - `EXCEL`: .xlsx excel file.
+    - `PARQUET`: .parquet columnar file, needs pyarrow.
+    """
+    CSV = 'csv'
+    EXCEL = 'xlsx'
+    PARQUET = 'parquet'
+
+
+class ColumnarFormat(Enum):
+    """
+    An Enum representing the formats of the columnar export, read back by the importer as well:
+    - `PARQUET`: .parquet, a file per table, needs pyarrow.
+    - `FEATHER`: .feather, arrow IPC, a file per table, needs pyarrow.
+    - `HDF5`: .h5, one file holding every table, needs pytables.
+    """
+    PARQUET = 'parquet'
+    FEATHER = 'feather'
+    HDF5 = 'h5'
+
+
+class ArtifactKind(Enum):
+    """
+    An Enum representing the files a per sample export produces, by extension:
+    - `SHEET`: the interpreted spreadsheet.
+    - `GRAPH`: a graph image, one per GraphType.
+    - `RAW_GRAPH`: a vector graph, one per GraphType, with the raw files.
+    - `RAW_DATA`: the non interpreted data, with the raw files.
+    """
+    SHEET = 'xlsx'
+    GRAPH = 'png'
+    RAW_GRAPH = 'svg'
+    RAW_DATA = 'csv'
+
+
+class JobState(Enum):
+    """
+    An Enum representing the states of a queued job:
+    - `QUEUED`: waiting for a runner, retried jobs go back to it.
+    - `PAUSED`: held, not handed out until resumed.
+    - `RUNNING`: claimed by a runner, back to queued if the runner dies.
+    - `DONE`: finished.
+    - `FAILED`: out of attempts, its last error kept.
+    - `CANCELLED`: dropped before it ran.
+    """
+    QUEUED = 'queued'
+    PAUSED = 'paused'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+
+class JobKind(Enum):
+    """
+    An Enum representing what a queued job does, to one sample:
+    - `EXPORT`: analyzes and exports it, per sample, its results recorded in the results manifest.
+    - `ANALYZE`: analyzes it, its summary row kept with the job.
+    """
+    EXPORT = 'export'
+    ANALYZE = 'analyze'
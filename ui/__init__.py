@@ -2,5 +2,6 @@
 The User Interface module.
 """
 
+from .app import App
 from .themes import Styles
 from .widgets import MainPanel
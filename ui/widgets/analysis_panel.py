@@ -1,15 +1,21 @@
+import io
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 from typing import Callable, Final, overload
 
 import customtkinter as ctk
-import matplotlib.pyplot as plt
 import pandas as pd
 from matplotlib.axes import Axes
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
 
 from mixins import CanPlot, HasToolTip, Observer
-from models import Analyzer, Cache, Sample
+from mixins.plotter import FigureTemplate
+from models import Analyzer, Cache, CurveOverlay, Sample
+from models.overlay import OVERLAY_POINTS, load_overlay
 from shared_widgets import ColorPicker
 from typedefs import (AnalysisMethod, GraphParameters, GraphType, PlotData,
                       SampleStats, SaveObject, Signal, StatsInterpretation)
@@ -21,6 +27,20 @@ STATS_NOTE_FONT: Final[tuple[str, int, str]] = ('Arial', 14, 'bold')
 # colors
 GRAPH_COLOR_DEFAULT: Final[str] = '#1f7bb4'
 
+# graphs, on screen
+GRAPH_DPI: Final[int] = 100 # as FigureCanvasTkAgg drew them, the export renders at the SaveObject dpi.
+DEFAULT_GRAPH_SIZE: Final[tuple[int, int]] = (640, 480)
+GRAPH_MARGIN: Final[int] = 4 # px, keeps the images from pushing the frame to grow.
+REFRESH_DELAY_MS: Final[int] = 150
+
+# graphs cache, compressed pngs, tens of KBs each, so browsing stays in constant memory.
+GRAPHS_CACHE_LIMIT: Final[int] = 200
+PNG_COMPRESS_LEVEL: Final[int] = 1 # the fastest, the images are mostly flat colors anyway.
+
+# overlay
+OVERLAY_TITLE: Final[str] = 'Cumulative Curves'
+OVERLAY_POLL_MS: Final[int] = 50
+
 # customization bar
 CUST_BAR_PARAMS: Final[tuple[float, float, float]] =  (.3, .25, .04)
 
@@ -32,12 +52,13 @@ class AnalysisPanel(ctk.CTkFrame, Observer):
         - displays the sample graphs [graph_panel: ctk.CTkLabel].
         - displays the sample data and the analysis result [data_panel: AnalysisBook]
     """
-    def __init__(self, master: ctk.CTkFrame) -> None:
+    def __init__(self, master: ctk.CTkFrame, samples_cache: Cache|None = None) -> None:
         """
         CTkFrame:
         The class that handles viewing and analyzing the data.
             - display the sample graphs [graph_panel: ctk.CTkLabel].
             - display the sample data and the analysis result [data_panel: AnalysisBook]
+            - samples_cache: the cache the samples come from, keyed by their path, the analyzers go stale with them.
         """
         super().__init__(master)
 
@@ -46,6 +67,12 @@ class AnalysisPanel(ctk.CTkFrame, Observer):
         self._current_sample: Sample = Sample()
         self._analyzer: Analyzer = Analyzer()
 
+        # Cache, analysis results depend on the cached sample of the same source:
+        self._samples_cache: Cache|None = samples_cache
+        self._analyzers_cache: Cache = Cache(50, hash_content=True, name='analyzers')
+        # the overlay loading, counted, a later analysis or overlay makes the one loading moot.
+        self._overlay_job: int = 0
+
         self._graph_panel: GraphPanel = GraphPanel(self)
         self._data_panel: DataPanel = DataPanel(self)
 
@@ -65,8 +92,20 @@ class AnalysisPanel(ctk.CTkFrame, Observer):
         """
         Creates an Analyzer object for the given [sample].
         """
-        if self._current_sample != sample:
+        if self._current_sample == sample:
+            return
+
+        _source: str = sample.get_path()
+        if _source and self._analyzers_cache.check(_source):
+            self._analyzer = self._analyzers_cache.get(_source)
+        else:
             self._analyzer = Analyzer(sample.get_data())
+            if _source:
+                # fingerprinted as the samples cache is, an analysis outlives its sample's entry once it's evicted.
+                self._analyzers_cache.add(_source, self._analyzer, source=_source,
+                                          depends_on=((self._samples_cache, _source),) if self._samples_cache else ())
+
+        self._current_sample = sample
 
     def analyze(self,
                 sample: Sample,
@@ -75,10 +114,41 @@ class AnalysisPanel(ctk.CTkFrame, Observer):
         """
         Analyze the given [sample], triggered by an outside signal from [MainPanel].
         """
+        self._overlay_job += 1
         self._update_analyzer(sample)
         self._draw_graphs(sample, save_obj, graph_type)
         self._write(sample, graph_type)
 
+    def overlay(self, paths: list[str], save_obj: SaveObject, sample: Sample) -> None:
+        """
+        Overlays the cumulative curves of the samples at [paths] in one graph, triggered by an outside signal from [MainPanel]; the data is the [sample]'s, the last of the selection.
+        - the samples are read and analyzed in a background thread, left out of the caches, the graph is drawn once they all are.
+        """
+        self._overlay_job += 1
+        _job: int = self._overlay_job
+        self._update_analyzer(sample)
+        self._write(sample, None)
+
+        _result: queue.Queue[CurveOverlay|None] = queue.Queue(maxsize=1)
+        threading.Thread(target=lambda: _result.put(load_overlay(paths, lambda: _job != self._overlay_job)),
+                         daemon=True).start()
+        self._poll_overlay(_job, _result, save_obj.get('color'))
+
+    def _poll_overlay(self, job: int, result: queue.Queue, graph_color: str) -> None:
+        """
+        Draws the overlay once loaded, re-schedules itself until then, unless a later analysis made it moot.
+        """
+        if job != self._overlay_job:
+            return
+        try:
+            _overlay: CurveOverlay|None = result.get_nowait()
+        except queue.Empty:
+            self.after(OVERLAY_POLL_MS, self._poll_overlay, job, result, graph_color)
+            return
+
+        if _overlay is not None:
+            self._graph_panel.draw_overlay(_overlay, graph_color)
+
     def _draw_graphs(self, sample: Sample, save_obj: SaveObject,
                      graph_type: GraphType|None) -> None:
         """
@@ -86,7 +156,7 @@ class AnalysisPanel(ctk.CTkFrame, Observer):
         """
         #? is this the best place for this? NO, actually it might
         self._graph_panel.draw_graphs(
-            self._analyzer, sample.get_name(), save_obj.get('color'), graph_type)      
+            self._analyzer, sample.get_name(), save_obj.get('color'), graph_type, sample.get_path())
 
     def _write(self, sample: Sample, graph_type: GraphType|None) -> None:
         """
@@ -107,8 +177,24 @@ class GraphPanel(ctk.CTkFrame, CanPlot, HasToolTip):
         """
         super().__init__(master, height=height)
 
-        # Cache:
-        self._graphs_cache: Cache = Cache()
+        # Templates, a graph per type, created once then rendered off screen, as an image, for every sample:
+        self._templates: dict[GraphType, FigureTemplate] = {}
+        self._graphs: dict[GraphType, ctk.CTkLabel] = {}
+        self._graph_data: dict[GraphType, tuple[PlotData, str, str]] = {} # (plot data, title, color)
+        self._graph_ids: dict[GraphType, tuple[str, str]] = {} # (cache id, without the color and size, source path)
+        self._rendered: dict[GraphType, str] = {} # what the template holds, as (cache id, without the color), to recolor.
+        self._shown_graphs: list[ctk.CTkLabel] = []
+        self._refresh_job: str = ''
+
+        # Overlay, a selection's cumulative curves in one graph, re-rendered at every refresh, never cached:
+        self._overlay: CurveOverlay|None = None
+        self._overlay_color: str = GRAPH_COLOR_DEFAULT
+        self._overlay_envelopes: bool = True
+        self._overlay_graph: ctk.CTkLabel|None = None
+        self._overlay_figure: Figure|None = None
+
+        # Cache, the rendered images as pngs, the widgets are only the ones above:
+        self._graphs_cache: Cache = Cache(GRAPHS_CACHE_LIMIT, name='graphs')
 
         self._graph_params: GraphParameters = GraphParameters()
         self._graph_is_expanded: bool = False
@@ -118,6 +204,7 @@ class GraphPanel(ctk.CTkFrame, CanPlot, HasToolTip):
         self._graph_frame.columnconfigure(0, weight=1, uniform='a')
         self._graph_frame.columnconfigure(1, weight=1, uniform='a')
         self._graph_frame.rowconfigure(0, weight=1, uniform='a')
+        self._graph_frame.bind('<Configure>', lambda _: self._schedule_refresh())
 
         self._label = ctk.CTkLabel(self, text='Graphs:', font=STATS_NOTE_FONT)
         
@@ -125,36 +212,188 @@ class GraphPanel(ctk.CTkFrame, CanPlot, HasToolTip):
         self._graph_frame.pack(fill='both', expand=1, padx=5, pady=5)
 
         self.cust_bar = CustomizationBar(self, 
-                        self._graph_params, self.update_graphs, *CUST_BAR_PARAMS)
+                        self._graph_params, self.recolor_graphs, *CUST_BAR_PARAMS)
 
     def _generate_graph(self, 
                        plot_data: PlotData, sample_name: str,
-                       graph_type: GraphType, color: str) -> tk.Canvas:
+                       graph_type: GraphType, color: str, source: str = '') -> ctk.CTkLabel:
+        """
+        Generates the graph/plot as a layout ready widget, the [graph_type] widget and template are created only on first use; the image is rendered, or taken from the cache, once laid out, see [_refresh_graphs].
+        - source: the sample's source path, cached images go stale once it changes.
+        """
+        if graph_type not in self._graphs:
+            self._templates[graph_type] = FigureTemplate(graph_type)
+
+            _graph = ctk.CTkLabel(self._graph_frame, text='')
+            _graph.bind('<Button-1>', lambda _: self._expand_graph(_graph))
+            _graph.bind('<Leave>', lambda _: self._revert_layout(self._shown_graphs))
+            self.htt_tip(_graph, f'{self._graph_names[graph_type].lower()}\nclick to expand/shrink')
+            self._graphs[graph_type] = _graph
+
+        _title: str = f"{self._graph_names[graph_type]}\n{sample_name}"
+        self._graph_data[graph_type] = (plot_data, _title, color)
+        self._graph_ids[graph_type] = (f'{source or sample_name}|{graph_type.name}', source)
+
+        return self._graphs[graph_type]
+
+    def _get_image(self, graph_type: GraphType, size: tuple[int, int]) -> Image.Image:
+        """
+        The [graph_type] graph at [size] pixels, from the cache, otherwise rendered at the screen resolution, [GRAPH_DPI], then cached as a png; the full resolution is only rendered when exporting.
+        """
+        _base_id, _source = self._graph_ids[graph_type]
+        _id: str = f'{_base_id}|{self._graph_data[graph_type][2]}|{size[0]}x{size[1]}'
+
+        if self._graphs_cache.check(_id):
+            return Image.open(io.BytesIO(self._graphs_cache.get(_id)))
+
+        _image: Image.Image = self._render_graph(graph_type, size)
+
+        _buffer = io.BytesIO()
+        _image.save(_buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+        self._graphs_cache.add(_id, _buffer.getvalue(), source=_source)
+
+        return _image
+
+    def _render_graph(self, graph_type: GraphType, size: tuple[int, int]) -> Image.Image:
+        """
+        Renders the [graph_type] template at [size] pixels, at the screen resolution, [GRAPH_DPI]; the full resolution is only rendered when exporting.
+        """
+        _template: FigureTemplate = self._templates[graph_type]
+        _template.update(*self._graph_data[graph_type])
+        self._rendered[graph_type] = f'{self._graph_ids[graph_type][0]}|{size[0]}x{size[1]}'
+
+        return _template.render_image(size, GRAPH_DPI)
+
+    def _get_cell_size(self) -> tuple[int, int]:
+        """
+        The size, in pixels, a graph takes in the current layout, the default figure size before the frame is laid out.
+        """
+        _width, _height = self._graph_frame.winfo_width(), self._graph_frame.winfo_height()
+        if _width <= 1 or _height <= 1:
+            return DEFAULT_GRAPH_SIZE
+
+        _n_cols: int = 1 if (self._graph_is_expanded or len(self._shown_graphs) == 1) else len(GraphType)
+        return (max(1, _width//_n_cols-GRAPH_MARGIN), max(1, _height-GRAPH_MARGIN))
+
+    def _refresh_graphs(self) -> None:
+        """
+        Renders the shown graphs at their size in the current layout.
+        """
+        self._refresh_job = ''
+        _size: tuple[int, int] = self._get_cell_size()
+        _scaling: float = self._get_widget_scaling()
+
+        for _type, _graph in self._graphs.items():
+            if _graph in self._shown_graphs and _graph.winfo_manager():
+                _image: Image.Image = self._get_image(_type, _size)
+                _graph.configure(image=ctk.CTkImage(_image, _image, size=(int(_size[0]/_scaling), int(_size[1]/_scaling))))
+
+        if self._overlay_graph in self._shown_graphs and self._overlay_graph.winfo_manager(): #type: ignore
+            _image = self._render_overlay(_size)
+            self._overlay_graph.configure( #type: ignore
+                    image=ctk.CTkImage(_image, _image, size=(int(_size[0]/_scaling), int(_size[1]/_scaling))))
+
+    def _render_overlay(self, size: tuple[int, int]) -> Image.Image:
+        """
+        Renders the overlay at [size] pixels, the curves decimated to the width in pixels, [OVERLAY_POINTS] at most, on one figure reused across renders.
+        """
+        if self._overlay_figure is None:
+            self._overlay_figure = Figure(layout='constrained')
+            FigureCanvasAgg(self._overlay_figure)
+        _overlay: CurveOverlay = self._overlay #type: ignore
+        _fig: Figure = self._overlay_figure
+        _fig.clear()
+        _ax: Axes = _fig.add_subplot()
+
+        _n_points: int = min(OVERLAY_POINTS, size[0])
+        _grid, _curves = _overlay.resample(_n_points)
+        _envelopes = _overlay.get_envelopes(_n_points) if self._overlay_envelopes else None
+        self.cp_plot_overlay(_grid, _curves, _ax, self._overlay_color, _envelopes)
+
+        _skipped: str = f', {len(_overlay.skipped)} without a curve' if _overlay.skipped else ''
+        _ax.set_title(f'{OVERLAY_TITLE}\n{len(_overlay)} samples{_skipped}')
+
+        _fig.set_dpi(GRAPH_DPI)
+        _fig.set_size_inches(size[0]/GRAPH_DPI, size[1]/GRAPH_DPI)
+        _canvas: FigureCanvasAgg = _fig.canvas #type: ignore
+        _canvas.draw()
+
+        return Image.frombuffer('RGBA', _canvas.get_width_height(), _canvas.buffer_rgba()).copy() #type: ignore
+
+    def _toggle_envelopes(self) -> None:
+        """
+        Shows, or hides, the overlay's percentile envelopes.
+        """
+        self._overlay_envelopes = not self._overlay_envelopes
+        self._refresh_graphs()
+
+    def draw_overlay(self, overlay: CurveOverlay, graph_color: str) -> None:
+        """
+        Lays out the [overlay] alone, in place of the graphs.
+        """
+        if self._overlay_graph is None:
+            self._overlay_graph = ctk.CTkLabel(self._graph_frame, text='')
+            self._overlay_graph.bind('<Button-3>', lambda _: self._toggle_envelopes())
+            self.htt_tip(self._overlay_graph, '[right click]: to show/hide the percentile envelopes, 5-95% and 25-75%')
+
+        self._clear_layout()
+        self._graph_is_expanded = False
+        self._overlay, self._overlay_color = overlay, graph_color
+        self._shown_graphs = [self._overlay_graph]
+        self._overlay_graph.grid(column=0, row=0, columnspan=2, rowspan=1, sticky='nsew')
+
+        self._refresh_graphs()
+        self.cust_bar.enable()
+
+    def preview_color(self, color: str) -> None:
         """
-        Generates the graph/plot as a layout ready widget.
+        Recolors the shown graphs in place, for the color sliders; later renders still use the picked color.
+        - only the colored artists are redrawn, blitted on the template's last render; no figure, nor cache entry, is created.
         """
-        _fig, _ax = plt.subplots()
-        _fig.set_layout_engine('constrained')
-        _canvas = FigureCanvasTkAgg(_fig, self._graph_frame) 
-        _graph_name = self._graph_names[graph_type]
+        _size: tuple[int, int] = self._get_cell_size()
+        _scaling: float = self._get_widget_scaling()
 
-        _title: str = f"{_graph_name}\n{sample_name}"
+        for _type, _graph in self._graphs.items():
+            if not (_graph in self._shown_graphs and _graph.winfo_manager()):
+                continue
+            # the shown image may come from the cache, the template then holds another sample, or size.
+            if self._rendered.get(_type) != f'{self._graph_ids[_type][0]}|{_size[0]}x{_size[1]}':
+                self._render_graph(_type, _size)
 
-        self.cp_plot(*plot_data, _ax, graph_type, color)
-                     
-        _ax.set_title(_title)
-        plt.close()
+            _image: Image.Image|None = self._templates[_type].recolor(color)
+            if _image is not None:
+                _graph.configure(image=ctk.CTkImage(_image, _image, size=(int(_size[0]/_scaling), int(_size[1]/_scaling))))
 
-        return _canvas.get_tk_widget()
+    def recolor_graphs(self, color: str) -> None:
+        """
+        Sets [color] as the graphs color, then recolors the shown graphs in place, see [preview_color].
+        """
+        for _type, (_plot_data, _title, _) in self._graph_data.items():
+            self._graph_data[_type] = (_plot_data, _title, color)
+        self._overlay_color = color
+
+        self.preview_color(color)
+        # the overlay's curves are the bulk of it, it's only re-rendered once the color is picked.
+        if self._overlay_graph in self._shown_graphs:
+            self._refresh_graphs()
+
+    def _schedule_refresh(self) -> None:
+        """
+        Refreshes the graphs once the layout settles, resizing fires many events.
+        """
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+        self._refresh_job = self.after(REFRESH_DELAY_MS, self._refresh_graphs)
 
     def _set_graph_params(self, analyzer: Analyzer, sample_name: str,
-                          graph_color: str, graph_type: GraphType|None = None) -> None:
+                          graph_color: str, graph_type: GraphType|None = None,
+                          source: str = '') -> None:
         """
         Saves the current params used to produce the graph as a GraphParameters object.
         """
         self._graph_params.update(
                 analyzer=analyzer, sample_name=sample_name,
-                graph_type=graph_type, graph_color=graph_color)
+                graph_type=graph_type, graph_color=graph_color, source=source)
 
     def update_graphs(self, graph_params: GraphParameters) -> None:
         """
@@ -165,51 +404,44 @@ class GraphPanel(ctk.CTkFrame, CanPlot, HasToolTip):
 
     def draw_graphs(self,
                     analyzer: Analyzer, sample_name: str,
-                    graph_color:str, graph_type: GraphType|None = None) -> None:
+                    graph_color:str, graph_type: GraphType|None = None,
+                    source: str = '') -> None:
         """
         Layout the graphs:
         - `graph_type` = None -> layout all the graphs in enums.GraphType.
+        - `source`: the sample's source path.
         """
-        _color_id = str(int(graph_color[1:],16))
-        _graphs_list: list[tk.Canvas] = []
-
-        def _get_canvas_obj(id_, type_) -> tk.Canvas:
+        def _get_graph_obj(type_: GraphType) -> ctk.CTkLabel:
             """
-            Using the given [id_] and [type_], creates or retrieves from cache then returns the tk.Canvas obj to plot.
+            Sets the [type_] graph to the sample, then returns the widget to plot.
             """
-            _in_cache: bool = self._graphs_cache.check(id_)
-            if _in_cache:
-                _graph: tk.Canvas = self._graphs_cache.get(id_)
-            else:
-                _graph = self._generate_graph(analyzer.get_plot_data(type_), sample_name, type_, graph_color)
-                self._graphs_cache.add(id_, _graph)
-
-            _graphs_list.append(_graph)
-
-            _graph.bind('<Button-1>', lambda _: self._expand_graph(_graph))
-            _graph.bind('<Leave>', lambda _: self._revert_layout(_graphs_list))
-            self.htt_tip(_graph, f'{self._graph_names[type_].lower()}\nclick to expand/shrink')
+            _graph: ctk.CTkLabel = self._generate_graph(analyzer.get_plot_data(type_), sample_name, type_,
+                                                        graph_color, source)
+            self._shown_graphs.append(_graph)
 
             return _graph
 
         # Resetting the layout:
         self._clear_layout()
+        self._overlay = None
+        self._shown_graphs = []
+        self._graph_is_expanded = False
         
         if graph_type:
-            _id = sample_name+f'{graph_type}'+_color_id
-            graph = _get_canvas_obj(_id,graph_type)
-            graph.grid(column=0, row=0, columnspan=2, rowspan=1)
+            graph = _get_graph_obj(graph_type)
+            graph.grid(column=0, row=0, columnspan=2, rowspan=1, sticky='nsew')
         else:
             for ind, _type in enumerate(GraphType):
-                _id = sample_name+f'{_type}'+_color_id
-                graph = _get_canvas_obj(_id,_type)
-                graph.grid(column=ind, row=0, columnspan=1, rowspan=1)
+                graph = _get_graph_obj(_type)
+                graph.grid(column=ind, row=0, columnspan=1, rowspan=1, sticky='nsew')
+
+        self._refresh_graphs()
                 
-        self._set_graph_params(analyzer, sample_name, graph_color ,graph_type)
+        self._set_graph_params(analyzer, sample_name, graph_color ,graph_type, source)
         
         self.cust_bar.enable()
 
-    def _expand_graph(self, graph: tk.Canvas) -> None:
+    def _expand_graph(self, graph: ctk.CTkLabel) -> None:
         """
         Fills the grid layout with the provided [graph].
         """
@@ -217,15 +449,19 @@ class GraphPanel(ctk.CTkFrame, CanPlot, HasToolTip):
         if not self._graph_is_expanded:
             graph.grid(column=0, row=0, columnspan=2, rowspan=1, sticky='nsew')
             self._graph_is_expanded = True
+        self._schedule_refresh()
 
-    def _revert_layout(self, graphs_list: list[tk.Canvas]) -> None:
+    def _revert_layout(self, graphs_list: list[ctk.CTkLabel]) -> None:
         """
         Reverts to the typical layout.
         """
+        _was_expanded: bool = self._graph_is_expanded
         self._clear_layout()
         for ind, graph in enumerate(graphs_list):
-            graph.grid(column=ind, row=0, columnspan=1, rowspan=1)
+            graph.grid(column=ind, row=0, columnspan=2 if len(graphs_list) == 1 else 1, rowspan=1, sticky='nsew')
         self._graph_is_expanded = False
+        if _was_expanded:
+            self._schedule_refresh()
 
     def _clear_layout(self) -> None:
         """
@@ -421,7 +657,7 @@ class CustomizationBar(ctk.CTkFrame, HasToolTip, Observer):
         Gives the ability to change the graph preview visuals.
     """
     def __init__(self, master:GraphPanel,
-                 graph_params: GraphParameters, connection_func: Callable,
+                 graph_params: GraphParameters, connection_func: Callable[[str], None],
                  width: float, height:float, anim_speed: float =.01) -> None:
         """
         CkFrame:
@@ -449,7 +685,7 @@ class CustomizationBar(ctk.CTkFrame, HasToolTip, Observer):
 
         self.in_start_pos:bool = True
 
-        self.clr_pikr: ColorPicker = ColorPicker(self)
+        self.clr_pikr: ColorPicker = ColorPicker(self, command=master.preview_color)
         self.obs_listen(Signal.COLOR, self, self.on_color_picked)
         
         self.move_btn_txt: str = 'edit'
@@ -494,7 +730,7 @@ class CustomizationBar(ctk.CTkFrame, HasToolTip, Observer):
         """
         #TODO: see for decoupling, the mangling due to the GraphsParameter, signal?!; This is justified due to the inherent coupling of [self] and [master], as this is the only [master] of [self]; for now at least!!---> Implemented a function dependency injection.
         self._graph_parms.update(graph_color=color)
-        self._con_func(self._graph_parms)
+        self._con_func(color)
 
     def enable(self) -> None:
         """
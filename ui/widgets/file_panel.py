@@ -1,17 +1,21 @@
 import os
-import time
 import numpy as np
+import pandas as pd
 import tkinter as tk
 from tkinter import ttk
-from typing import Callable, Final
+from typing import Final
 
 import customtkinter as ctk
 from PIL import Image
 
-from mixins import CanSave, Defaults, HasToolTip, Observer, Validator
-from models import Cache, Sample
+from mixins import CanExport, Defaults, ExportWorker, HasToolTip, Observer, Validator
+from mixins.defaults import JOBS_DB_PATH
+from mixins.exporter import UP_TO_DATE
+from models import Analyzer, Cache, JobQueue, Sample
 from popups import ExportScreen, ImportScreen
-from typedefs import GraphType, LogMsgType, SaveObject, Signal
+from services.job_runner import spawn_runner
+from typedefs import (ExportEvent, ExportMode, GraphType, JobState, LogMsgType,
+                      PreparedGraph, SaveObject, Signal)
 from utils import utls
 
 # Constants:
@@ -34,11 +38,19 @@ IMPORT: Final[str] = 'i'
 EXPORT: Final[str] = 'e'
 ANALYZE: Final[str] = 'a'
 
+# export polling
+EXPORT_POLL_MS: Final[int] = 50
+EXPORT_EVENTS_PER_POLL: Final[int] = 200
+PLAN_LOG_PATHS: Final[int] = 5
+
+# queue polling, the runner records its jobs once a second at most.
+QUEUE_POLL_MS: Final[int] = 1000
+
 # convention to keep:
 # file -> file_name.extension
 # sample -> Sample(file_path)
 
-class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
+class FilePanel(ctk.CTkFrame, CanExport, Defaults, HasToolTip, Observer):
     """
     CTkFrame:
     The class handling:
@@ -55,10 +67,13 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
         self._master = master
         self.__root = utls.get_root(self)
         self._crnt_sample: Sample = Sample()
+        # the current sample graphs, prepared once, previewed then exported: (sample, graphs).
+        self._prepared: tuple[Sample, dict[GraphType, PreparedGraph]]|None = None
 
         # Caching:
         self._path_cache: list[str] = []
-        self._samples_cache: Cache = Cache(50)
+        # fingerprinted by source, edited files are re-read on access.
+        self.samples_cache: Cache = Cache(50, hash_content=True, name='samples')
 
         # pass around data holder.
         self._save_obj: SaveObject = self.df_get(SaveObject)
@@ -68,6 +83,11 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
         self._valid_files: list[str] = []
         self._number_of_valid_files: int = 0
 
+        # background export:
+        self._export_worker: ExportWorker|None = None
+        # queued export: (queue, campaign), the one followed, if any.
+        self._campaign: tuple[JobQueue, str]|None = None
+
         # global keyboard shortcuts:
         self.__root.bind(f"<Control-KeyPress-{IMPORT}>",
                          lambda _: self._screen_import())
@@ -247,22 +267,24 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
         Start the analysis process via signal broadcasting.
         """
         _ids: list[int] = []
+        _paths: list[str] = []
         for sel_id in table_selection:
             _id, _file_name = self._file_viewer.get_data(sel_id)
             _ids.append(_id)
-            _file_path: str = os.path.join(self._save_obj.get('files_path'), _file_name)
-            _in_cache: bool = self._samples_cache.check(_file_path)
+            _paths.append(os.path.join(self._save_obj.get('files_path'), _file_name))
 
-            if _in_cache:
-                _sample = self._samples_cache.get(_file_path)
-            else:
-                _sample: Sample = Sample(_file_path)
-                self._samples_cache.add(_file_path, _sample)
-
-            self._crnt_sample = _sample
+        # each sample would be drawn over the previous one, only the last is analyzed, a selection is overlaid;
+        # the last is the one loaded here, the overlaid ones are loaded off the UI thread, left out of the cache.
+        if _paths:
+            self._crnt_sample = self._get_sample(_paths[-1])
 
-            self.obs_broadcast(Signal.ANALYZE, self, (_sample, self._save_obj, graph_type))
-            self.obs_broadcast(Signal.LOG, self, (f'analyzed sample [{_sample.get_name().lower()}].',))
+            if len(_paths) > 1 and graph_type != GraphType.HIST:
+                self.obs_broadcast(Signal.OVERLAY, self, (_paths, self._save_obj, self._crnt_sample))
+                self.obs_broadcast(Signal.LOG, self, (f'overlaid [{len(_paths)}] samples, '
+                                                      f'analyzed sample [{self._crnt_sample.get_name().lower()}].',))
+            else:
+                self.obs_broadcast(Signal.ANALYZE, self, (self._crnt_sample, self._save_obj, graph_type))
+                self.obs_broadcast(Signal.LOG, self, (f'analyzed sample [{self._crnt_sample.get_name().lower()}].',))
 
         self._set_interval(_ids)
 
@@ -271,6 +293,17 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
             self._save_btn.configure(state=ctk.NORMAL)
             self._update_export_btn_state(enable=True)
 
+    def _get_sample(self, path: str) -> Sample:
+        """
+        The sample at [path], from the cache if it's fresh there.
+        """
+        if self.samples_cache.check(path):
+            return self.samples_cache.get(path)
+
+        _sample: Sample = Sample(path)
+        self.samples_cache.add(path, _sample, source=path)
+        return _sample
+
     def _set_interval(self, id_list: list[int]) -> None:
         """
         Sets the [SaveObj] interval for later use by the [export_screen].
@@ -299,16 +332,36 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
         - self._crnt_sample.
         - self._save_obj.
         """
-        self.cs_save_results(self._crnt_sample, self._save_obj)
+        self.cs_save_results(self._crnt_sample, self._save_obj, prepared=self._get_prepared_graphs())
         self.obs_broadcast(Signal.LOG, self,
                 (f'saved sample [{self._crnt_sample.get_name().lower()}] to [{self._save_obj.get_results_path()}]',))
 
+    def _get_prepared_graphs(self) -> dict[GraphType, PreparedGraph]:
+        """
+        The current sample graphs, prepared once per sample, for the export previews and the single sample save.
+        """
+        if self._prepared is None or self._prepared[0] is not self._crnt_sample:
+            _graphs = self.cs_prepare_graphs(self._crnt_sample.get_name(), Analyzer(self._crnt_sample.get_data()))
+            self._prepared = (self._crnt_sample, _graphs)
+
+        return self._prepared[1]
+
+    def preview(self, color: str, transparent: bool) -> list[bytes]:
+        """
+        Low resolution pngs of the current sample graphs, as they'd be exported with [color] and [transparent], none without a sample.
+        """
+        if self._crnt_sample.get_data().empty:
+            return []
+
+        return [self.cs_render_preview(prepared, color, transparent) for prepared in self._get_prepared_graphs().values()]
+
     def _on_export_btn_pressed(self, use_global_defaults: bool = False) -> None:
         """
         Launches the save all dialogue.
         """
         self._export_popup = ExportScreen(self,
-                self._update_export_btn_state, self.save_all, self._save_obj, use_global_defaults)
+                self._update_export_btn_state, self.save_all, self._save_obj, use_global_defaults,
+                dry_run_func=self.dry_run, preview_func=self.preview, queue_func=self.enqueue)
         self._export_popup.set_limit(self._number_of_valid_files)
         
     def _update_export_btn_state(self, enable: bool = False) -> None:
@@ -326,14 +379,10 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
         """
         self._save_obj.update(color=color)
 
-    def save_all(self, save_obj: SaveObject) -> None:
+    def _get_export_paths(self, save_obj: SaveObject) -> list[str]:
         """
-        Delegated to [ExportScreen].
+        The paths of the samples within the [save_obj] interval.
         """
-        self.obs_broadcast(Signal.LOG, self, ('saving all samples...',))
-
-        _trigger_ui_update: Callable[[list[str],int],bool] = lambda list_,cap=20: len(list_) > cap
-        
         _index, _interval = save_obj.get('interval') #!config
 
         def _prep_files_list(index: int, list_: list[str], interval: list[int]) -> list[str]:
@@ -351,22 +400,186 @@ class FilePanel(ctk.CTkFrame, CanSave, Defaults, HasToolTip, Observer):
             return list_
 
         _files: list[str] = _prep_files_list(_index, self._valid_files, _interval)
-    
-        for _ind, file_ in enumerate(_files):
-            _path: str = os.path.join(self._save_obj.get('files_path'), file_)
-            _sample = Sample(_path)
-            self.cs_save_results(_sample, save_obj)
+        return [os.path.join(self._save_obj.get('files_path'), file_) for file_ in _files]
+
+    def _start_export_worker(self, save_obj: SaveObject, dry_run: bool = False) -> None:
+        """
+        Runs the export, or its dry run, on an [ExportWorker] and polls it, unless one is already running.
+        """
+        if (self._export_worker and self._export_worker.is_alive()) or self._campaign:
             self.obs_broadcast(Signal.LOG, self,
-                               (f'[{_ind}] out of [{len(_files)}] samples saved.',))
+                    ('an export is already running, wait for it or cancel it.', LogMsgType.WARNING))
+            return
 
-            #TODO: is there a better option??, queue/thread??
-            if _trigger_ui_update(_files, 0):
-                utls.get_root(self).update()
-                utls.get_root(self).update_idletasks()
-                time.sleep(.001)
+        self._export_worker = ExportWorker(self._get_export_paths(save_obj), save_obj.copy(), dry_run)
+        self._export_worker.start()
+        self._export_popup.on_export_started(self._export_worker.toggle_pause, self._export_worker.cancel)
+
+        self.after(EXPORT_POLL_MS, lambda: self._poll_export(save_obj))
+
+    def save_all(self, save_obj: SaveObject) -> None:
+        """
+        Delegated to [ExportScreen].
+        """
+        self.obs_broadcast(Signal.LOG, self, ('saving all samples...',))
+        self._start_export_worker(save_obj)
+
+    def enqueue(self, save_obj: SaveObject) -> None:
+        """
+        Delegated to [ExportScreen].
+        Queues the export, per sample, in the persistent job queue, starts a background runner, unless one is alive, and follows the campaign.
+        """
+        if ExportMode(save_obj.export_mode) != ExportMode.PER_SAMPLE:
+            self.obs_broadcast(Signal.LOG, self,
+                    (f'only [{ExportMode.PER_SAMPLE.value}] exports are queued, [{save_obj.export_mode}] writes one project file.', LogMsgType.WARNING))
+            return
+        if (self._export_worker and self._export_worker.is_alive()) or self._campaign:
+            self.obs_broadcast(Signal.LOG, self,
+                    ('an export is already running, wait for it or cancel it.', LogMsgType.WARNING))
+            return
 
+        _queue = JobQueue(JOBS_DB_PATH)
+        _paths: list[str] = self._get_export_paths(save_obj)
+        _campaign: str = _queue.submit(_paths, save_obj.copy())
+        self._campaign = (_queue, _campaign)
+        self._ensure_runner(save_obj)
         self.obs_broadcast(Signal.LOG, self,
-                           (f'saved [{len(_files)}] samples to [{save_obj.get_results_path()}]',))
+                (f'queued [{len(_paths)}] samples as [{_campaign}], they\'re exported in the background, even once the app is closed.',))
+
+        _paused: list[bool] = [False]
+
+        def _toggle_pause() -> bool:
+            _paused[0] = not _paused[0]
+            if _paused[0]:
+                _queue.pause(_campaign)
+            else:
+                _queue.resume(_campaign)
+                self._ensure_runner(save_obj)
+            return _paused[0]
+
+        self._export_popup.on_export_started(_toggle_pause, lambda: _queue.cancel(_campaign))
+        self.after(QUEUE_POLL_MS, lambda: self._poll_queue(save_obj, -1))
+
+    def _ensure_runner(self, save_obj: SaveObject) -> None:
+        """
+        Starts a background runner, with the [save_obj] workers, unless one is alive.
+        """
+        if self._campaign and not self._campaign[0].get_live_runners():
+            spawn_runner(JOBS_DB_PATH, save_obj.workers)
+
+    def _poll_queue(self, save_obj: SaveObject, last_done: int) -> None:
+        """
+        Logs the progress of the followed campaign and updates the progress bar, re-schedules itself until none of its jobs is left queued, held or running.
+        - last_done: the jobs finished at the last poll, nothing is logged unless it changed.
+        """
+        if not self._campaign:
+            return
+
+        _queue, _campaign = self._campaign
+        _counts: dict[JobState, int] = _queue.get_counts(_campaign)
+        _total: int = sum(_counts.values())
+        _done: int = _counts[JobState.DONE]+_counts[JobState.FAILED]+_counts[JobState.CANCELLED]
+
+        if _done != last_done and _total:
+            self.obs_broadcast(Signal.LOG, self, (f'[{_counts[JobState.DONE]}] out of [{_total}] queued samples saved.',))
+            self._export_popup.set_progress(_done/_total)
+
+        if _counts[JobState.QUEUED] or _counts[JobState.RUNNING] or _counts[JobState.PAUSED]:
+            # the runner may have exited, out of jobs, while these were queued.
+            if _counts[JobState.QUEUED]:
+                self._ensure_runner(save_obj)
+            self.after(QUEUE_POLL_MS, lambda: self._poll_queue(save_obj, _done))
+            return
+
+        self._campaign = None
+        _queue.close()
+        _msg: str = f'saved [{_counts[JobState.DONE]}] queued samples to [{save_obj.get_results_path()}]'
+        if _counts[JobState.FAILED] or _counts[JobState.CANCELLED]:
+            self.obs_broadcast(Signal.LOG, self,
+                    (f'{_msg}, [{_counts[JobState.FAILED]}] failed, [{_counts[JobState.CANCELLED]}] cancelled, see [auto_gsa.py queue status].', LogMsgType.WARNING))
+        else:
+            self.obs_broadcast(Signal.LOG, self, (f'{_msg}.',))
+        self.obs_broadcast(Signal.EXPORTED, self)
+
+    def dry_run(self, save_obj: SaveObject) -> None:
+        """
+        Delegated to [ExportScreen].
+        Logs what [save_all] would write, nothing is written.
+        """
+        if ExportMode(save_obj.export_mode) != ExportMode.PER_SAMPLE:
+            self.obs_broadcast(Signal.LOG, self,
+                    (f'the dry run plans [{ExportMode.PER_SAMPLE.value}] exports, [{save_obj.export_mode}] writes one project file.', LogMsgType.WARNING))
+        self.obs_broadcast(Signal.LOG, self, ('planning the export...',))
+        self._start_export_worker(save_obj, dry_run=True)
+
+    def _log_plan(self, report: pd.DataFrame, save_obj: SaveObject) -> None:
+        """
+        Logs the dry run [report], per artifact kind, with a few of the paths to be written.
+        """
+        _to_write: pd.DataFrame = report[report['status'] != UP_TO_DATE]
+        _up_to_date: int = report.shape[0]-_to_write.shape[0]
+        _to_mb = lambda n_bytes: n_bytes/2**20
+
+        self.obs_broadcast(Signal.LOG, self,
+                (f'dry run: [{_to_write.shape[0]}] files to write, ~{_to_mb(_to_write['est_bytes'].sum()):.1f}MB, '
+                 f'[{_up_to_date}] up to date, into [{save_obj.get_results_path()}].',))
+        for _kind, _group in _to_write.groupby('kind'):
+            self.obs_broadcast(Signal.LOG, self,
+                    (f'  {_kind}: [{_group.shape[0]}] files, ~{_to_mb(_group['est_bytes'].sum()):.1f}MB.',))
+        for _, _row in _to_write.head(PLAN_LOG_PATHS).iterrows():
+            self.obs_broadcast(Signal.LOG, self, (f'  {_row['status']}: {_row['path']}',))
+        if _to_write.shape[0] > PLAN_LOG_PATHS:
+            self.obs_broadcast(Signal.LOG, self, (f'  ...and [{_to_write.shape[0]-PLAN_LOG_PATHS}] more.',))
+
+    def _poll_export(self, save_obj: SaveObject) -> None:
+        """
+        Drains the [self._export_worker] events in batches, logs them and updates the progress, re-schedules itself until the export is done.
+        """
+        if not self._export_worker:
+            return
+
+        _progress: tuple[int, int] = (0, 0)
+        _done: tuple[int, int, bool]|None = None
+
+        for _event, _payload in self._export_worker.drain(EXPORT_EVENTS_PER_POLL):
+            match _event:
+                case ExportEvent.PROGRESS:
+                    _n_done, _total, _sample_name, _error = _payload
+                    _progress = (_n_done, _total)
+                    if _error:
+                        self.obs_broadcast(Signal.LOG, self,
+                                (f'sample [{_sample_name}] wasn\'t saved, {_error}', LogMsgType.ERROR))
+                case ExportEvent.LOG:
+                    self.obs_broadcast(Signal.LOG, self, _payload)
+                case ExportEvent.PLAN:
+                    self._log_plan(_payload[0], save_obj)
+                case ExportEvent.DONE:
+                    _done = _payload
+
+        # one line per batch, not per sample.
+        if _progress[1]:
+            self.obs_broadcast(Signal.LOG, self,
+                               (f'[{_progress[0]}] out of [{_progress[1]}] samples {'planned' if self._export_worker.dry_run else 'saved'}.',))
+            self._export_popup.set_progress(_progress[0]/_progress[1])
+
+        if _done is None:
+            self.after(EXPORT_POLL_MS, lambda: self._poll_export(save_obj))
+            return
+
+        _saved, _skipped, _cancelled = _done
+        _dry_run: bool = self._export_worker.dry_run
+        self._export_worker = None
+        if _dry_run:
+            if _cancelled:
+                self.obs_broadcast(Signal.LOG, self, ('dry run cancelled.', LogMsgType.WARNING))
+            self.obs_broadcast(Signal.EXPORTED, self)
+            return
+
+        _msg: str = f'saved [{_saved}] samples to [{save_obj.get_results_path()}], [{_skipped}] were already up to date.'
+        if _cancelled:
+            self.obs_broadcast(Signal.LOG, self, (f'export cancelled, {_msg}', LogMsgType.WARNING))
+        else:
+            self.obs_broadcast(Signal.LOG, self, (_msg,))
         self.obs_broadcast(Signal.EXPORTED, self)
 
     def on_exported(self) -> None:
@@ -486,7 +699,9 @@ class FileViewer(ttk.Treeview, Validator, Observer, HasToolTip):
         # screen imports are already val_samples validated!
         if not from_screen:
             _files: list[str] = os.listdir(path)
-            _valid_files = [file_ for file_ in _files if self.val_samples(path, file_)]
+            # columnar files are only unpacked when picked, see [val_handle_columnar].
+            _valid_files = [file_ for file_ in _files
+                            if self.val_samples(path, file_) and not self.val_is_columnar(file_)]
         else:
             for _file in files:
                 _valid_files +=  self.val_handle_aio(path, _file)
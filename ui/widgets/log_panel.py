@@ -6,12 +6,14 @@ from typing import Final
 import customtkinter as ctk
 
 from mixins import HasToolTip, Observer
-from typedefs import LogMsgType, Signal
+from models import dump_caches_stats, get_caches_stats
+from typedefs import CacheStats, LogMsgType, Signal
 
 # Constants:
 # names
 CNFG_DIR_NAME: Final[str] = 'auto_gsa'
 LOG_FILE_NAME: Final[str] = 'log.txt'
+CACHE_STATS_FILE_NAME: Final[str] = 'cache_stats.json'
 CNFG_DIR: Final[str|None] = os.environ.get('LOCALAPPDATA')
 assert CNFG_DIR, 'Strange!, you don\'t have an appdata dir??!!'
 
@@ -37,7 +39,8 @@ class LoggingLabel(ctk.CTkFrame, HasToolTip, Observer):
         self._text_box: ctk.CTkTextbox = ctk.CTkTextbox(self,
                     state=ctk.DISABLED, corner_radius=0, activate_scrollbars=False)
         self._label.bind('<Double-Button-1>', lambda _: self._expand())
-        self.htt_tip(self._label, 'double click to expand/shrink')
+        self._label.bind('<Button-3>', lambda _: self._write_cache_stats())
+        self.htt_tip(self._label, 'double click to expand/shrink\nright click: show the caches stats')
 
         self._label.pack(side='left', padx=5)
         self._text_box.pack(side='left', fill='both', expand=True)
@@ -87,6 +90,18 @@ class LoggingLabel(ctk.CTkFrame, HasToolTip, Observer):
 
         self._log_to_file(_text)
     
+    def _write_cache_stats(self) -> None:
+        """
+        Writes the stats of every cache into the text box, on demand.
+        """
+        _to_mb: float = 1/(1024**2)
+        _stats: list[CacheStats] = get_caches_stats()
+
+        for _stat in sorted(_stats, key=lambda x: x.name):
+            self.write(f'cache [{_stat.name}]: {_stat.entries}/{_stat.limit} entries, '
+                       f'hit rate {_stat.hit_rate:.1%} ({_stat.hits} hits, {_stat.misses} misses), '
+                       f'{_stat.evictions} evictions, ~{_stat.est_bytes*_to_mb:.2f} MB.')
+
     def _expand(self) -> None:
         """
         Expands the logging widget.
@@ -104,4 +119,5 @@ class LoggingLabel(ctk.CTkFrame, HasToolTip, Observer):
         """
         Runs on application closure.
         """
-        self._log_to_file(f'\nsession terminated [{dt.datetime.now().ctime()}].\n--------------<>-------------\n')
\ No newline at end of file
+        self._log_to_file(f'\nsession terminated [{dt.datetime.now().ctime()}].\n--------------<>-------------\n')
+        dump_caches_stats(os.path.join(self._cnfg_path, CACHE_STATS_FILE_NAME))
\ No newline at end of file
@@ -26,7 +26,7 @@ class MainPanel(ctk.CTkFrame, Observer):
         self.rowconfigure(1, weight=1, uniform='b')
 
         self.file_panel: FilePanel = FilePanel(self)
-        self.analysis_panel: AnalysisPanel = AnalysisPanel(self)
+        self.analysis_panel: AnalysisPanel = AnalysisPanel(self, self.file_panel.samples_cache)
         self.logging_label: LoggingLabel = LoggingLabel(self)
 
         self._layout()
@@ -36,6 +36,7 @@ class MainPanel(ctk.CTkFrame, Observer):
         self.obs_listen(Signal.EXPORTED, self, self.exported)
         self.obs_listen(Signal.EXPAND, self, self.expand_log)
         self.obs_listen(Signal.COLOR, self, self.update_color)
+        self.obs_listen(Signal.OVERLAY, self, self.overlay)
 
     def _layout(self) -> None:
         """
@@ -60,6 +61,12 @@ class MainPanel(ctk.CTkFrame, Observer):
         """
         self.analysis_panel.analyze(sample, save_obj, graph_type)
 
+    def overlay(self, paths: list, save_obj: SaveObject, sample: Sample) -> None:
+        """
+        Tells the analysis widget to overlay the samples at [paths], showing the [sample]'s data; signal triggered.
+        """
+        self.analysis_panel.overlay(paths, save_obj, sample)
+
     def exported(self) -> None:
         """
         Tells the export screen; signal triggered. 
@@ -5,22 +5,27 @@ Consider a theme/styles module down the line.
 - `import_from_path`: intended for data validation.
 - `get_root`: a wrapper for ._root().
 """
-from tkinter import BaseWidget, Toplevel
-from tkinter.commondialog import Dialog
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-import customtkinter as ctk
 import pandas as pd
-import pywinstyles
+
+# the gui libraries are only needed by the gui helpers, [import_form_path] runs headless too.
+if TYPE_CHECKING:
+	from tkinter import BaseWidget, Toplevel
+	from tkinter.commondialog import Dialog
+
+	import customtkinter as ctk
 
 # Constants:
 # color:
 TRANSPARENT_COLOR = '#000001'
 
-def bg_transparent(widgets: ctk.CTkBaseClass|list[ctk.CTkBaseClass]) -> None:
+def bg_transparent(widgets: 'ctk.CTkBaseClass|list[ctk.CTkBaseClass]') -> None:
 	"""
 	Makes the [widget] background transparent.
 	"""
+	import pywinstyles
+
 	if not isinstance(widgets, list):
 		widgets  = [widgets]
 
@@ -49,7 +54,7 @@ def import_form_path(full_path: str, format_: str) -> pd.DataFrame:
 	return _data
 
 # this is only here because I dislike the type: ignore, as it's necessary in this case!
-def get_root(widget: BaseWidget|Dialog) -> Toplevel:
+def get_root(widget: 'BaseWidget|Dialog') -> 'Toplevel':
 	"""
 	Returns the [widget]'s true root using [widget]._root().
 	"""